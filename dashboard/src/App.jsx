@@ -9,7 +9,9 @@ import {
   freshnessToDays,
   parseReleaseDate,
   statusBadgeClass,
+  healthBadge,
 } from './readinessUtils';
+import { REPORT_FORMAT, loadReportContent } from './reportSections';
 import { auth, db } from './firebase';
 import {
   signInWithEmailAndPassword,
@@ -78,7 +80,7 @@ function App() {
   const [syncStatus, setSyncStatus] = useState('Initializing...');
   const [lastRun, setLastRun] = useState(null);
   const [showManualInject, setShowManualInject] = useState(false);
-  const [manualData, setManualData] = useState({ source: '', content: '' });
+  const [manualData, setManualData] = useState({ source: '', content: '', priority: 'Medium' });
   const [viewMode, setViewMode] = useState('Technical'); // Technical vs Customer
 
   useEffect(() => {
@@ -291,10 +293,11 @@ function App() {
       await addDoc(collection(db, "manual_injections"), {
         source: manualData.source,
         content: manualData.content,
+        priority: manualData.priority,
         status: "Pending",
         timestamp: new Date()
       });
-      setManualData({ source: '', content: '' });
+      setManualData({ source: '', content: '', priority: 'Medium' });
       setShowManualInject(false);
       alert("Content injected manually! It will be analyzed in the next Intelligence Cycle.");
     } catch (error) {
@@ -486,9 +489,18 @@ function App() {
     }
   };
 
-  const openReport = (report) => {
+  const openReport = async (report) => {
     setSelectedReport(report);
     setShowPdfViewer(true);
+    // Report bodies are stored as compressed section documents and only fetched when viewed
+    if (report.format === REPORT_FORMAT && report.content === undefined) {
+      try {
+        const loaded = await loadReportContent(db, report);
+        setSelectedReport((current) => (current?.id === report.id ? { ...report, ...loaded } : current));
+      } catch (e) {
+        console.error("Failed to load report sections", e);
+      }
+    }
   };
 
   const parseReportMarkdown = (markdown) => {
@@ -785,6 +797,7 @@ function App() {
                 <th>Category</th>
                 <th>Endpoint URL</th>
                 <th>Status</th>
+                <th>Health</th>
                 <th>Actions</th>
               </tr>
             </thead>
@@ -807,7 +820,7 @@ function App() {
                     style={{ cursor: 'pointer', background: 'rgba(255,255,255,0.02)' }} 
                     onClick={() => toggleIntegration(integrationName)}
                   >
-                    <td colSpan="5" style={{ fontWeight: 'bold', borderBottom: '1px solid var(--border-color)' }}>
+                    <td colSpan="6" style={{ fontWeight: 'bold', borderBottom: '1px solid var(--border-color)' }}>
                       {expandedIntegrations[integrationName] ? '▼' : '▶'} Integration: {integrationName}
                       <span className="badge" style={{ marginLeft: '1rem', background: 'rgba(255,255,255,0.05)' }}>
                         {groupedUrls[integrationName].length} Sources
@@ -820,6 +833,12 @@ function App() {
                       <td><span className="badge" style={{ background: 'rgba(255,255,255,0.05)', color: 'var(--accent-cyan)' }}>{s.category}</span></td>
                       <td style={{ color: 'var(--text-secondary)', fontSize: '0.75rem' }}>{s.url}</td>
                       <td><span className={statusBadgeClass(s.last_status || 'Monitoring')}>{s.last_status || 'Monitoring'}</span></td>
+                      <td>
+                        {(() => {
+                          const badge = healthBadge(s.health);
+                          return <span className={badge.className} title={badge.title}>{badge.label}</span>;
+                        })()}
+                      </td>
                       <td>
                         <div style={{ display: 'flex', gap: '0.5rem' }}>
                           <button
@@ -844,7 +863,7 @@ function App() {
               )})}
               {monitoredUrls.length === 0 && (
                 <tr>
-                  <td colSpan="5" style={{ textAlign: 'center', padding: '3rem', color: 'var(--text-secondary)' }}>
+                  <td colSpan="6" style={{ textAlign: 'center', padding: '3rem', color: 'var(--text-secondary)' }}>
                     <div style={{ marginBottom: '1rem' }}>No sources found in your database.</div>
                     <button className="btn btn-primary" onClick={seedIndustrySources}>
                       Import Official Integration Sources
@@ -1478,6 +1497,18 @@ function App() {
                   required
                 />
               </div>
+              <div style={{ marginBottom: '1rem' }}>
+                <label style={{ display: 'block', fontSize: '0.875rem', marginBottom: '0.5rem' }}>Priority</label>
+                <select
+                  className="input-field"
+                  value={manualData.priority}
+                  onChange={e => setManualData({ ...manualData, priority: e.target.value })}
+                >
+                  <option value="High">High - analyze before monitored sources</option>
+                  <option value="Medium">Medium</option>
+                  <option value="Low">Low - may wait a cycle when the LLM budget is tight</option>
+                </select>
+              </div>
               <div style={{ marginBottom: '1.5rem' }}>
                 <label style={{ display: 'block', fontSize: '0.875rem', marginBottom: '0.5rem' }}>Paste Content Here</label>
                 <textarea
@@ -68,3 +68,20 @@ export function statusBadgeClass(status) {
   if (status === 'Needs Review') return 'badge badge-yellow';
   return 'badge badge-green';
 }
+
+/** Badge for the fetch health the monitor stores on each source (`health` field). */
+export function healthBadge(health) {
+  if (!health || !health.state) {
+    return { className: 'badge', label: 'Unchecked', title: 'Not fetched since health tracking started' };
+  }
+  const latency = health.latency_ms || {};
+  const details = [
+    latency.p50 != null ? `p50 ${latency.p50} ms, p95 ${latency.p95} ms` : null,
+    health.consecutive_failures ? `${health.consecutive_failures} consecutive failures (${health.last_error})` : null,
+    health.quarantined_until ? `Re-probe after ${health.quarantined_until}` : null,
+    health.last_checked ? `Last checked ${health.last_checked}` : null,
+  ].filter(Boolean).join(' · ');
+  if (health.state === 'quarantined') return { className: 'badge badge-red', label: 'Quarantined', title: details };
+  if (health.state === 'degraded') return { className: 'badge badge-yellow', label: 'Degraded', title: details };
+  return { className: 'badge badge-green', label: 'Healthy', title: details };
+}
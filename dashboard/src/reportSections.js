@@ -0,0 +1,47 @@
+import { collection, documentId, getDocs, orderBy, query } from "firebase/firestore";
+
+export const REPORT_FORMAT = 'chunked-zlib';
+
+// Section payloads are zlib streams (Python zlib.compress), i.e. the "deflate" format
+async function inflate(bytes) {
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+  return new Response(stream).text();
+}
+
+function concatBytes(chunks) {
+  const total = chunks.reduce((size, chunk) => size + chunk.length, 0);
+  const joined = new Uint8Array(total);
+  let offset = 0;
+  chunks.forEach((chunk) => {
+    joined.set(chunk, offset);
+    offset += chunk.length;
+  });
+  return joined;
+}
+
+// Fetches and decompresses a sectioned report's bodies on demand.
+// Legacy reports keep content/customer_content on the header and are returned unchanged.
+export async function loadReportContent(db, report) {
+  if (report?.format !== REPORT_FORMAT) {
+    return { content: report?.content || '', customer_content: report?.customer_content || '' };
+  }
+
+  const snapshot = await getDocs(query(collection(db, "intel_reports", report.id, "sections"), orderBy(documentId())));
+  const grouped = new Map();
+  snapshot.forEach((sectionDoc) => {
+    const section = sectionDoc.data();
+    if (!grouped.has(section.index)) grouped.set(section.index, { kind: section.kind, parts: [] });
+    grouped.get(section.index).parts.push(section.data.toUint8Array());
+  });
+
+  const sections = await Promise.all(
+    [...grouped.entries()]
+      .sort(([a], [b]) => a - b)
+      .map(async ([, section]) => ({ kind: section.kind, text: await inflate(concatBytes(section.parts)) }))
+  );
+
+  return {
+    content: (report.title || '') + sections.filter((s) => s.kind === 'alert').map((s) => s.text).join(''),
+    customer_content: sections.find((s) => s.kind === 'customer')?.text || '',
+  };
+}
@@ -1,9 +1,14 @@
+import argparse
+import itertools
 import logging
+import threading
 import time
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 import yaml
 import schedule
-import urllib.parse
 from dotenv import load_dotenv
 from src.date_utils import freshness_to_days, is_within_review_window, resolve_release_date
 from src.status_utils import (
@@ -13,11 +18,31 @@ from src.status_utils import (
     should_send_slack_alert,
 )
 from src.source_loader import load_default_sources
-from src.fetcher import Fetcher
+from src.report_utils import (
+    build_customer_sections,
+    build_report_header,
+    build_report_sections,
+    format_alert_section,
+    format_report_title,
+)
+from src.fetcher import Fetcher, PageShare
 from src.llm_analyzer import LLMAnalyzer
 from src.notifications import Notifier
 from src.internal_reporter import InternalReporter
-from src.firebase_manager import FirebaseManager
+from src.storage import create_storage
+from src.pipeline import Stage, StagedPipeline
+from src.checkpoint import content_hash, create_checkpoint
+from src.scheduling import create_scheduler, next_impact_rate
+from src.deadline import Deadline, create_deadline
+from src.profiles import DEFAULT_PROFILE, AnalysisCache, load_profiles
+from src.post_processing import create_post_queue
+from src.ingestion import create_ingestion_service
+from src.bulk_import import RESUMABLE_STATUSES, ImportProgress, batched, iter_injections
+from src.backfill import entry_update, walk_pages
+from src.source_health import create_source_health
+from src.relevance import create_relevance_gate
+from src.daemon import CLIENT_CONFIG_KEYS, IntelligenceDaemon
+from src.sharding import default_run_id, encode_shard_result, merge_shard_results, parse_shard, select_shard
 
 # Setup Logging
 logging.basicConfig(
@@ -34,18 +59,930 @@ def load_config():
     with open("config.yaml", "r") as f:
         return yaml.safe_load(f)
 
-def job():
+def build_client(config, kind):
+    """Builds one of the cycle's clients (see src.daemon.CLIENT_CONFIG_KEYS)."""
+    if kind == "storage":
+        return create_storage(config)
+    if kind == "fetcher":
+        return Fetcher()
+    if kind == "analyzer":
+        return LLMAnalyzer(config)
+    if kind == "notifier":
+        return Notifier(config)
+    raise ValueError(f"Unknown client: {kind}")
+
+def run_job(config, clients, default_sources=None, is_manual=None, shard=None, run_id=None, deadline=None):
     logger.info("Starting Intelligence Cycle...")
+    firebase = clients["storage"]
+    # Customer notes, digest and Slack run on background workers; the report is saved first.
+    # Jobs a previous run left queued are resumed by unsharded runs and the merge step only.
+    post_queue = start_post_processing(
+        config, firebase, clients["analyzer"], clients["notifier"], restore=shard is None,
+    )
+    try:
+        run_cycle(
+            config, firebase, clients["fetcher"], clients["analyzer"], clients["notifier"],
+            default_sources=default_sources, is_manual=is_manual, shard=shard, run_id=run_id,
+            deadline=deadline, post_queue=post_queue,
+        )
+    finally:
+        # Write-behind buffer: status/hash/injection updates land even if the cycle fails
+        firebase.flush()
+        if post_queue:
+            finish_post_processing(config, post_queue, deadline)
+            firebase.flush()
+
+def start_post_processing(config, firebase, analyzer, notifier, restore=True):
+    """The post-processing queue with its handlers registered and workers running, or None when disabled."""
+    post_queue = create_post_queue(config, firebase, restore=restore)
+    if post_queue is None:
+        return None
+    notifiers = profile_notifiers(config, load_profiles(config), notifier)
+
+    def notifier_for(payload):
+        return notifiers.get(payload.get('profile') or DEFAULT_PROFILE, notifier)
+
+    def customer_notes(payload):
+        notes = analyzer.generate_customer_notes(payload['content'])
+        sections = build_customer_sections(notes, payload['section_index'])
+        if firebase.update_report(payload['report_id'], {"status": "Ready"}, sections=sections) is False:
+            raise RuntimeError(f"Could not add customer notes to report {payload['report_id']}")
+
+    # The notifier logs and swallows delivery errors; False (not None, which means
+    # the channel is disabled) is raised here so the queue retries with backoff
+    def digest(payload):
+        if notifier_for(payload).send_digest_email(payload['alerts']) is False:
+            raise RuntimeError(f"Could not send the digest email ({len(payload['alerts'])} alerts)")
+
+    def slack(payload):
+        if notifier_for(payload).send_slack_alert(payload['alert']) is False:
+            raise RuntimeError(f"Could not send the Slack alert for {payload['alert'].get('source')}")
+
+    post_queue.register("customer_notes", customer_notes)
+    post_queue.register("digest", digest)
+    post_queue.register("slack", slack)
+    return post_queue.start()
+
+def finish_post_processing(config, post_queue, deadline=None):
+    """Waits for queued jobs within config 'drain_seconds' and the cycle deadline; the rest wait for the next run."""
+    timeout = (config.get('post_processing') or {}).get('drain_seconds', 600)
+    remaining = deadline.remaining(final=True) if deadline else None
+    if remaining is not None:
+        timeout = max(min(timeout, remaining), 0.0)
+    outstanding = post_queue.drain(timeout)
+    if outstanding:
+        logger.warning(f"{outstanding} post-processing jobs still queued; they resume on the next run.")
+    post_queue.log_summary()
+    post_queue.close()
+
+def job(shard=None, run_id=None):
     config = load_config()
     
     # Initialize Modules
-    firebase = FirebaseManager()
-    fetcher = Fetcher()
-    analyzer = LLMAnalyzer(config)
-    notifier = Notifier(config)
-    
-    # 0. Check System Config (Pause/Frequency)
-    sys_config = firebase.get_system_config()
+    clients = {kind: build_client(config, kind) for kind in CLIENT_CONFIG_KEYS}
+    # A CI timeout or cancel (SIGTERM) stops new work; partial results are still flushed
+    deadline = create_deadline(config)
+    with deadline.cancel_on_signals():
+        run_job(config, clients, shard=shard, run_id=run_id, deadline=deadline)
+
+def merge_job(shard_count, run_id):
+    logger.info(f"Merging shard results of run {run_id}...")
+    config = load_config()
+    firebase = build_client(config, "storage")
+    analyzer = build_client(config, "analyzer")
+    notifier = build_client(config, "notifier")
+    post_queue = start_post_processing(config, firebase, analyzer, notifier)
+    try:
+        notifiers = profile_notifiers(config, load_profiles(config), notifier)
+        merge_shards(firebase, analyzer, notifier, shard_count, run_id, notifiers=notifiers, post_queue=post_queue)
+    finally:
+        firebase.flush()
+        if post_queue:
+            finish_post_processing(config, post_queue)
+            firebase.flush()
+
+def run_daemon():
+    """Long-running mode: warm clients, mtime-based config reload and a local control endpoint."""
+    daemon = IntelligenceDaemon(run_job, build_client)
+    config, _ = daemon.refresh()
+    daemon_config = config.get('daemon') or {}
+    daemon.start_control_server(
+        host=daemon_config.get('control_host', '127.0.0.1'),
+        port=int(daemon_config.get('control_port', 8765)),
+        token=os.getenv("INTEL_CONTROL_TOKEN"),
+    )
+
+    def ingest(injection):
+        # Warm clients and the current config; runs beside (not inside) any scheduled cycle
+        config, _ = daemon.refresh()
+        return ingest_injection(config, dict(daemon.clients), injection)
+
+    # Priority lane: injections posted here are analyzed now instead of at the next cycle
+    ingestion = create_ingestion_service(config, ingest, token=os.getenv("INTEL_CONTROL_TOKEN"))
+    if ingestion:
+        # Nothing is being ingested yet, so every Ingesting injection was left by a previous daemon
+        recover_ingestions(config, daemon.clients["storage"], stale_only=False)
+        ingestion_config = config.get('ingestion') or {}
+        ingestion.start(
+            host=ingestion_config.get('host', '127.0.0.1'),
+            port=int(ingestion_config.get('port', 8766)),
+        )
+
+    schedule.every().day.at("09:00").do(daemon.trigger)
+    schedule.every().friday.at("16:00").do(run_internal_reporter)
+    logger.info("Logiwa Intelligence daemon started. Clients are warm; waiting for schedule or control requests...")
+    try:
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
+    finally:
+        if ingestion:
+            ingestion.stop()
+        daemon.stop()
+
+def ingest_injection(config, clients, injection):
+    """
+    Runs one manual injection right away through the cycle's scope, analysis, status
+    and notification path. It is stored as Ingesting so a concurrent cycle leaves it
+    alone; a failed, deferred or crashed analysis puts it back to Pending for the next
+    cycle (see recover_ingestions for a daemon that died). Alerts are published as a
+    report (and digest) of their own, as an import's are. Returns the analysis (and
+    alert, if any) per profile.
+    """
+    firebase = clients["storage"]
+    injection_id = firebase.add_manual_injection(
+        injection['source'], injection['content'], injection.get('priority'), status="Ingesting",
+    )
+    try:
+        processor = build_processor(
+            config, firebase, clients["analyzer"], clients["notifier"], firebase.get_system_config(), is_manual=True,
+        )
+        # A single submission: the bounded ingestion pool, not a per-update sleep, limits the call rate
+        processor.rate_limit_seconds = 0
+        result = analyze_injection(processor, firebase, {**injection, "id": injection_id})
+    except Exception:
+        if injection_id:
+            # Flushed first, so a buffered Processed from a half-done run cannot win
+            firebase.flush()
+            firebase.set_manual_injection_status(injection_id, "Pending")
+        raise
+    finally:
+        firebase.flush()
+    # Outside the try: the injection is Processed and alerted by now, so it must not be requeued
+    publish_alerts(
+        clients, processor, format_report_title(heading=f"Ingested Injection: {injection['source']}"),
+        prefix=f"Ingested {injection['source']}",
+    )
+    return result
+
+def recover_ingestions(config, firebase, stale_only=True):
+    """
+    Sets injections left Ingesting (by a daemon that died mid-analysis) back to Pending
+    so a cycle picks them up. stale_only limits this to those created more than
+    config 'ingestion.stale_minutes' ago, which no live ingestion can still hold.
+    """
+    older_than = None
+    if stale_only:
+        minutes = (config.get('ingestion') or {}).get('stale_minutes', 30)
+        older_than = datetime.now(timezone.utc) - timedelta(minutes=minutes)
+    requeued = firebase.requeue_manual_injections("Ingesting", older_than=older_than)
+    if requeued:
+        logger.warning(f"Requeued {requeued} manual injections left Ingesting by an interrupted ingestion.")
+    return requeued
+
+def analyze_injection(processor, firebase, injection):
+    """
+    Prefilter, analyze, persist and notify one stored injection outside a cycle.
+    Failed or deferred analyses are set back to Pending so the next cycle retries them.
+    """
+    return complete_injection(processor, firebase, injection, injection_entry(processor, injection))
+
+def injection_entry(processor, injection):
+    """Prefilters and analyzes one stored injection: the entry for persist(), or None when deferred."""
+    update = next(iter_manual_updates([injection]))
+    candidate = processor.prefilter(update)
+    return processor.analyze(candidate) if candidate else None
+
+def complete_injection(processor, firebase, injection, entry):
+    """Persists and notifies an analyzed injection (see analyze_injection); one caller at a time, in input order."""
+    injection_id = injection['id']
+    if entry is None:
+        if injection_id:
+            firebase.set_manual_injection_status(injection_id, "Pending")
+        return {"id": injection_id, "status": "Pending", "results": []}
+
+    persisted = processor.persist(entry)
+    processor.notify(persisted)
+    results = persisted if isinstance(processor, ProfileFanout) else [(processor, persisted)]
+    failed = any(analysis.get('type') == "Error" for _, (_, analysis, _) in results)
+    if failed and injection_id:
+        # Error analyses are not marked Processed; the next cycle retries them
+        firebase.set_manual_injection_status(injection_id, "Pending")
+    return {
+        "id": injection_id,
+        "status": "Pending" if failed else "Processed",
+        "results": [
+            {"profile": p.profile_name, "analysis": analysis, "alert": alert}
+            for p, (_, analysis, alert) in results
+        ],
+    }
+
+def import_injections(config, clients, path, fmt=None, analyze=True):
+    """
+    Bulk-loads manual injections from a JSONL or CSV file (source, content, priority).
+    Rows are deduplicated by content hash, which is also the document id, and written
+    in batches. With analyze they are stored as Importing (so cycles leave them alone)
+    and analyzed concurrently through the cycle's path, then persisted and reported in
+    file order as a cycle does; otherwise they are left Pending for the next cycle. Re-running the same file resumes: Processed rows are skipped
+    and unfinished ones analyzed. Returns the ImportProgress counters.
+    """
+    import_config = config.get('bulk_import') or {}
+    firebase = clients["storage"]
+    progress = ImportProgress(log_every=import_config.get('progress_every', 10))
+    workers = import_config.get('workers', 4)
+    processor = None
+    if analyze:
+        processor = build_processor(
+            config, firebase, clients["analyzer"], clients["notifier"], firebase.get_system_config(), is_manual=False,
+        )
+        processor.rate_limit_seconds = import_config.get('rate_limit_seconds', 2)
+
+    def complete(injection, future):
+        try:
+            result = complete_injection(processor, firebase, injection, future.result())
+        except Exception as e:
+            # Stays Importing, so the next run of the same file retries it
+            logger.error(f"Import analysis of {injection['source']} failed: {e}")
+            progress.add("failed")
+            return
+        progress.add("alerts", sum(1 for entry in result["results"] if entry["alert"]))
+        progress.add("analyzed" if result["status"] == "Processed" else "failed")
+
+    # Injections are analyzed concurrently; alerts are built and reported in file order.
+    # Bounded in-flight analyses, so the file is streamed rather than read up front.
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import") as executor:
+        for batch in batched(iter_injections(path, fmt, stats=progress), import_config.get('batch_size', 100)):
+            statuses = firebase.get_manual_injection_statuses([injection['id'] for injection in batch])
+            new = [injection for injection in batch if injection['id'] not in statuses]
+            resumed = [injection for injection in batch if statuses.get(injection['id']) in RESUMABLE_STATUSES]
+            progress.add("duplicates", len(batch) - len(new) - len(resumed))
+            progress.add("written", firebase.add_manual_injections(new, status="Importing" if analyze else "Pending"))
+            progress.add("resumed", len(resumed))
+            if not analyze:
+                for injection in resumed:
+                    if statuses[injection['id']] == "Importing":
+                        firebase.set_manual_injection_status(injection['id'], "Pending")
+                continue
+            for injection in new + resumed:
+                in_flight.append((injection, executor.submit(injection_entry, processor, injection)))
+                if len(in_flight) >= workers * 2:
+                    complete(*in_flight.popleft())
+        while in_flight:
+            complete(*in_flight.popleft())
+    firebase.flush()
+    progress.log(final=True)
+
+    if processor:
+        # One report for the import's alerts, per profile, like a cycle's
+        publish_alerts(clients, processor, format_report_title())
+    return progress
+
+def import_job(path, fmt=None, analyze=True):
+    logger.info(f"Importing manual injections from {path}...")
+    config = load_config()
+    clients = {kind: build_client(config, kind) for kind in ("storage", "analyzer", "notifier")}
+    firebase = clients["storage"]
+    clients["post_queue"] = start_post_processing(config, firebase, clients["analyzer"], clients["notifier"])
+    try:
+        import_injections(config, clients, path, fmt=fmt, analyze=analyze)
+    finally:
+        firebase.flush()
+        if clients["post_queue"]:
+            finish_post_processing(config, clients["post_queue"])
+            firebase.flush()
+
+def backfill_sources(config, clients, names=None, deadline=None):
+    """
+    Backfills the history of sources named in names (default: every source without a
+    last_hash, i.e. never fetched by a cycle) under the config 'backfill' budget.
+    Sources run one after another; once the budget or deadline is spent the rest wait
+    for the next run. Returns {source name: True when its backfill completed}.
+    """
+    backfill_config = config.get('backfill') or {}
+    firebase = clients["storage"]
+    sources = firebase.get_monitored_urls() or load_default_sources()
+    if names:
+        wanted = {name.lower() for name in names}
+        sources = [source for source in sources if source['name'].lower() in wanted]
+        unknown = wanted - {source['name'].lower() for source in sources}
+        if unknown:
+            logger.warning(f"No monitored source named: {', '.join(sorted(unknown))}")
+    else:
+        sources = [source for source in sources if not source.get('last_hash')]
+    if not sources:
+        logger.info("No sources to backfill.")
+        return {}
+
+    # Historical entries need a wide review window for the alert history to start complete
+    sys_config = {
+        **firebase.get_system_config(),
+        "intelligence_freshness": backfill_config.get('freshness', '1 Year'),
+    }
+    scheduler = create_scheduler({"cycle_budget": backfill_config.get('budget')})
+    deadline = deadline or Deadline()
+    completed = {}
+    for source in sources:
+        completed[source['name']] = backfill_source(config, clients, source, sys_config, scheduler, deadline)
+        if deadline.expired() or (scheduler and scheduler.budget.exhausted_by):
+            logger.warning("Backfill budget spent; the remaining sources wait for the next backfill run.")
+            break
+    if scheduler:
+        scheduler.log_summary()
+    firebase.flush()
+    return completed
+
+def backfill_source(config, clients, source, sys_config, scheduler=None, deadline=None):
+    """
+    Walks one source's changelog (every pagination page), segments it into entries
+    and analyzes them concurrently, each with its sub-detail pages. Analyses and
+    alerts are checkpointed per source, so an interrupted or budget-limited backfill
+    resumes where it stopped. Once every entry is analyzed, the source's status,
+    impact rate and page hash are written and the alerts published as a report.
+    Returns True when the backfill completed.
+    """
+    backfill_config = config.get('backfill') or {}
+    firebase, fetcher, analyzer = clients["storage"], clients["fetcher"], clients["analyzer"]
+    pages = list(walk_pages(
+        fetcher, source, max_pages=backfill_config.get('max_pages', 20),
+        max_chars=backfill_config.get('entry_chars', 4000),
+    ))
+    if not pages:
+        logger.warning(f"Backfill of {source['name']}: the page could not be fetched.")
+        return False
+    entries = [(url, entry) for url, _, page_entries in pages for entry in page_entries]
+    max_entries = backfill_config.get('max_entries', 200)
+    if len(entries) > max_entries:
+        logger.info(f"Backfill of {source['name']}: keeping the newest {max_entries} of {len(entries)} entries.")
+        entries = entries[:max_entries]
+
+    # Always journaled (config 'checkpoint' only picks the store): resuming is the point
+    checkpoint = create_checkpoint(
+        {"checkpoint": {**(config.get('checkpoint') or {}), "enabled": True}}, firebase,
+        name=f"backfill-{fetcher.get_content_hash(source['url'])[:12]}",
+    )
+    report_title = format_report_title(heading=f"Backfill Report: {source['name']}")
+    if checkpoint.begin(report_title):
+        report_title = checkpoint.report_title or report_title
+    processor = build_processor(
+        config, firebase, analyzer, clients["notifier"], sys_config, is_manual=False, checkpoint=checkpoint,
+        scheduler=scheduler, deadline=deadline, post_queue=clients.get("post_queue"),
+    )
+    processor.rate_limit_seconds = backfill_config.get('rate_limit_seconds', 2)
+    for p in processor.processors:
+        p.slack_alerts = backfill_config.get('slack_alerts', False)
+    if checkpoint.resumed:
+        for entry in checkpoint.pending_notifications():
+            processor.resume_notification(entry)
+
+    def analyze(item):
+        page_url, entry = item
+        update = entry_update(
+            fetcher, source, page_url, entry, max_detail_links=backfill_config.get('max_detail_links', 2),
+            detail_chars=backfill_config.get('detail_chars', 1000),
+        )
+        candidate = processor.prefilter(update)
+        return processor.analyze(candidate) if candidate else None
+
+    history = []
+    with ThreadPoolExecutor(max_workers=backfill_config.get('workers', 4), thread_name_prefix="backfill") as executor:
+        # Entries are analyzed concurrently; alerts are built and reported in page order
+        for result in executor.map(analyze, entries):
+            if result is None:
+                continue
+            # Per-entry ids are not source ids: the source's state is written once, below
+            persisted = processor.persist(result, write_state=False)
+            processor.notify(persisted)
+            history.append(persisted[0][1] if isinstance(processor, ProfileFanout) else persisted)
+
+    failed = sum(1 for _, analysis, _ in history if analysis.get('type') == "Error")
+    if processor.deferred or failed:
+        logger.warning(
+            f"Backfill of {source['name']} incomplete: {len(processor.deferred)} of {len(entries)} entries deferred, "
+            f"{failed} failed. Run the backfill again to resume."
+        )
+        return False
+
+    if source.get('id'):
+        firebase.update_url_status(source['id'], backfill_status(source, history))
+        # The page as a cycle hashes it, so the next cycle only picks up changes made after the backfill
+        firebase.update_url_hash(source['id'], fetcher.get_content_hash(pages[0][1][:5000]))
+    for p in processor.processors:
+        if not p.alerts:
+            continue
+        report_id = f"backfill-{checkpoint.cycle_id}" + (f"-{p.profile_tag}" if p.profile_tag else "")
+        publish_report(
+            firebase, analyzer, p.notifier, p.alerts, p.alert_sections, report_title, checkpoint=checkpoint,
+            report_id=report_id, profile=p.profile_tag, post_queue=clients.get("post_queue"),
+            name=report_name(p.profile_tag, prefix=f"Backfill {source['name']}"),
+        )
+    checkpoint.complete()
+    logger.info(
+        f"Backfill of {source['name']} completed: {len(history)} entries analyzed, {len(processor.alerts)} alerts."
+    )
+    return True
+
+def backfill_status(source, history):
+    """
+    Source status after a backfill: the impact rate folded over the history oldest
+    first and the status of the newest alert. history is in page order, newest first.
+    """
+    status = {}
+    rate = source.get('impact_rate')
+    for _, analysis, _ in reversed(history):
+        rate = next_impact_rate(rate, analysis)
+    if rate is not None:
+        status["impact_rate"] = rate
+    latest = next(((analysis, alert) for _, analysis, alert in history if alert is not None), None)
+    if latest:
+        status.update(alert_status(*latest))
+    return status
+
+def backfill_job(names=None):
+    logger.info(f"Backfilling source history: {', '.join(names) if names else 'sources never fetched'}...")
+    config = load_config()
+    clients = {kind: build_client(config, kind) for kind in CLIENT_CONFIG_KEYS}
+    firebase = clients["storage"]
+    clients["post_queue"] = start_post_processing(config, firebase, clients["analyzer"], clients["notifier"])
+    # No cycle deadline: the backfill budget bounds it; a cancel (SIGTERM) stops it resumably
+    deadline = Deadline()
+    try:
+        with deadline.cancel_on_signals(), deadline.bound_to(clients["fetcher"], clients["analyzer"]):
+            backfill_sources(config, clients, names=names, deadline=deadline)
+    finally:
+        firebase.flush()
+        if clients["post_queue"]:
+            finish_post_processing(config, clients["post_queue"])
+            firebase.flush()
+
+def iter_manual_updates(entries):
+    for entry in entries:
+        logger.info(f"Picked up manual injection: {entry['source']}")
+        yield {
+            "id": entry['id'],
+            "source": entry['source'],
+            "url": "Manual Injection",
+            "content": entry['content'],
+            "priority": entry.get('priority'),
+            "is_manual_injection": True
+        }
+
+def resolve_scopes(update):
+    scopes = update.get('scopes')
+    if scopes:
+        return scopes
+    category = update.get('category', 'General')
+    # If no explicit scopes, apply category-specific strict scope rules.
+    # These map to the exact API areas Logiwa's integration team cares about.
+    if category in ('Marketplaces', 'Marketplace', 'ERPs'):
+        # Focus: core WMS-facing commerce endpoints
+        return [
+            'Orders API', 'Create Order', 'Update Order', 'Cancel Order',
+            'Products API', 'Product listing', 'Variant', 'SKU',
+            'Inventory API', 'Stock update', 'Fulfillment', 'Shipment notification',
+            'Receipt', 'Purchase Order', 'Receiving'
+        ]
+    if category == 'Carriers':
+        # Focus: shipping label lifecycle endpoints
+        return [
+            'Create Label', 'Void Label', 'Refund Label',
+            'Get Rate', 'Rate Shop', 'Tracking', 'Pickup',
+            'Manifest', 'End of Day', 'Address Validation'
+        ]
+    if category == 'General':
+        # Focus: authentication, webhooks, API versioning — infra-level changes
+        return [
+            'Authentication', 'OAuth', 'API Key', 'Webhook',
+            'Rate Limit', 'API versioning', 'Deprecation', 'Breaking change'
+        ]
+    return scopes
+
+class UpdateProcessor:
+    """
+    Per-update steps of the intelligence cycle. The serial loop and the staged
+    pipeline call the same methods, so both produce the same writes, alerts and report.
+    persist() and notify() must see updates in input order.
+    """
+
+    def __init__(self, firebase, analyzer, notifier, freshness_days, is_manual, rate_limit_seconds=10, checkpoint=None,
+                 scheduler=None, deadline=None, profile=None, analysis_cache=None, post_queue=None, relevance_gate=None):
+        self.firebase = firebase
+        self.analyzer = analyzer
+        self.notifier = notifier
+        self.freshness_days = freshness_days
+        self.is_manual = is_manual
+        self.rate_limit_seconds = rate_limit_seconds
+        self.checkpoint = checkpoint
+        self.scheduler = scheduler
+        self.deadline = deadline or Deadline()
+        # Multi-profile cycles only (see ProfileFanout); None keeps the classic single-profile cycle
+        self.profile = profile
+        self.analysis_cache = analysis_cache
+        # Durable post-processing queue: Slack alerts are sent by its workers when set
+        self.post_queue = post_queue
+        # Local classifier: skips confident negatives before the LLM and learns from its verdicts
+        self.relevance_gate = relevance_gate
+        # Off for backfills: historical findings go to the report without pinging Slack
+        self.slack_alerts = True
+        self.analyzed = 0
+        self.deferred = []
+        self.alerts = []
+        self.alert_sections = []
+        self._lock = threading.Lock()
+        if checkpoint and checkpoint.resumed:
+            # Alerts notified before the interruption; their updates may not show up again
+            self.alerts, self.alert_sections = checkpoint.completed_notifications(self.profile_tag)
+
+    @property
+    def profile_tag(self):
+        """Profile name stamped on updates and checkpoint entries; None in a single-profile cycle."""
+        return self.profile.name if self.profile else None
+
+    @property
+    def profile_name(self):
+        return self.profile_tag or DEFAULT_PROFILE
+
+    @property
+    def processors(self):
+        return [self]
+
+    def prefilter(self, update):
+        """Drops updates with nothing to analyze (or outside the profile) and resolves their scopes."""
+        if not update or not (update.get('content') or '').strip():
+            return None
+        if self.profile is None:
+            return {**update, "scopes": resolve_scopes(update)}
+        if not self.profile.applies_to(update):
+            return None
+        return {**update, "scopes": self.profile.scopes or resolve_scopes(update), "profile": self.profile.name}
+
+    def cache_key(self, update):
+        return AnalysisCache.key(content_hash(update), update['scopes'], self.freshness_days)
+
+    def needs_llm(self, update):
+        """False when the checkpoint or the shared analysis cache already answers this update."""
+        if self.checkpoint and self.checkpoint.cached_analysis(update) is not None:
+            return False
+        if self.relevance_gate and self.relevance_gate.would_skip(update):
+            return False
+        return self.analysis_cache is None or self.cache_key(update) not in self.analysis_cache
+
+    def analyze(self, update):
+        """(update, analysis), or None when the cycle budget or deadline defers the update to the next cycle."""
+        cached = self.checkpoint.cached_analysis(update) if self.checkpoint else None
+        if cached is not None:
+            logger.info(f"Reusing checkpointed analysis for: {update['source']}")
+            if self.analysis_cache is not None:
+                self.analysis_cache.put(self.cache_key(update), cached)
+        elif self.analysis_cache is not None:
+            cached = self.analysis_cache.get(self.cache_key(update))
+            if cached is not None:
+                logger.info(f"Reusing the analysis shared with another profile for: {update['source']}")
+        if cached is None and self.relevance_gate:
+            # Confident negatives cost no LLM call (and no budget); the hash is persisted as usual
+            cached = self.relevance_gate.screen(update)
+        if cached is not None:
+            with self._lock:
+                self.analyzed += 1
+            return update, cached
+        if self.deadline.expired():
+            return self.defer(update, "cycle deadline reached")
+        if self.scheduler and not self.scheduler.admit(update):
+            return self.defer(update, "cycle budget exhausted")
+
+        logger.info(f"Analyzing update from: {update['source']} (Category: {update.get('category', 'General')})")
+        analysis = self.analyzer.analyze(
+            update['content'],
+            update['url'],
+            freshness=self.freshness_days,
+            scopes=update['scopes']
+        )
+        if analysis.get('type') == "Error" and self.deadline.expired():
+            # Cut short by the deadline rather than a real failure; retried next cycle
+            return self.defer(update, "cycle deadline reached during analysis")
+        with self._lock:
+            self.analyzed += 1
+        # Failed analyses are not checkpointed or shared, so they are retried
+        if self.checkpoint and analysis.get('type') != "Error":
+            self.checkpoint.record_analysis(update, analysis)
+        if self.analysis_cache is not None and analysis.get('type') != "Error":
+            self.analysis_cache.put(self.cache_key(update), analysis)
+        if self.relevance_gate:
+            self.relevance_gate.record(update, analysis)
+        logger.info(f"Sleeping {self.rate_limit_seconds}s to respect Rate Limits...")
+        self.deadline.sleep(self.rate_limit_seconds)
+        return update, analysis
+
+    def defer(self, update, reason):
+        """Skips an update without persisting it: the unchanged hash (or Pending injection) brings it back."""
+        logger.info(f"Deferring {update['source']} to the next cycle: {reason}.")
+        with self._lock:
+            self.deferred.append(update['source'])
+        return None
+
+    def persist(self, entry, write_state=True):
+        """
+        Builds the alert and writes the update's hash, injection state and source status.
+        With write_state=False (the other profiles of a multi-profile cycle) the alert is
+        only journaled; the update's first profile does the writes.
+        """
+        update, analysis = entry
+        firebase = self.firebase
+        alert = self.build_alert(update, analysis)
+        # Journaled before the hash lands: once it does, the update is never fetched again
+        if alert is not None and self.checkpoint:
+            self.checkpoint.record_pending(update, analysis, alert)
+        if not write_state:
+            return update, analysis, alert
+
+        # Always persist hash after analysis so irrelevant/stale items are not re-analyzed forever
+        if firebase and update.get('new_hash'):
+            firebase.update_url_hash(update['id'], update['new_hash'])
+        # Injections leave the FIFO queue once analyzed, relevant or not; failed analyses stay Pending
+        if firebase and update.get('is_manual_injection') and analysis.get('type') != "Error":
+            firebase.mark_manual_injection_processed(update['id'])
+
+        # Sync Status back to Firestore if we have a source_id
+        source_id = update.get('id')
+        if not (firebase and source_id) or update.get('is_manual_injection') or analysis.get('type') == "Error":
+            return update, analysis, alert
+        # Historical impact rate, used by the cycle scheduler to rank this source's next changes
+        status_data = {"impact_rate": next_impact_rate(update.get('impact_rate'), analysis)}
+        if alert is not None:
+            status_data.update(alert_status(analysis, alert))
+            logger.info(f"Updating Firestore status for {update['source']}...")
+        firebase.update_url_status(source_id, status_data)
+        return update, analysis, alert
+
+    def build_alert(self, update, analysis):
+        """The alert for a relevant finding inside the review window, else None."""
+        if not analysis.get('is_relevant'):
+            return None
+        resolved_release_date = resolve_release_date(analysis)
+        impact_level = normalize_impact_level(analysis.get("impact_level"))
+        in_window = is_within_review_window(resolved_release_date, self.freshness_days)
+
+        if not in_window:
+            logger.info(
+                f"Update from {update['source']} ({resolved_release_date}) is outside "
+                f"{self.freshness_days}-day window."
+            )
+            # Manual runs still notify Slack for High/Medium findings (test / deep scan)
+            if not (self.is_manual and impact_level in ("High", "Medium")):
+                return None
+
+        return {
+            "source": update['source'],
+            "url": analysis.get('source_url') or update['url'],
+            "summary": analysis['summary'],
+            "details": analysis.get('details', []),
+            "logiwa_impact": analysis.get('logiwa_impact', 'N/A'),
+            "action_required": analysis.get('action_required', 'N/A'),
+            "impact_level": analysis['impact_level'],
+            "type": analysis['type'],
+            "release_date": resolved_release_date,
+            "exact_quote": analysis.get('exact_quote', ''),
+            "resolved_status": resolve_integration_status(analysis, self.freshness_days),
+        }
+
+    def notify(self, entry, slack_targets=None):
+        """
+        Records the alert for the report and sends (or queues) its Slack alert. slack_targets
+        collects the Slack channels this update was already sent to (see ProfileFanout).
+        """
+        update, analysis, alert = entry
+        if alert is None:
+            return None
+        if self.checkpoint and self.checkpoint.notified(update):
+            # Already alerted (and restored into the report) before the interruption
+            return alert
+        self.alerts.append(alert)
+        # Format for the detailed report content
+        section = format_alert_section(alert)
+        self.alert_sections.append(section)
+
+        # Immediate Slack for LLM High/Medium impact
+        if not self.slack_alerts:
+            logger.info(f"Slack alerts are off for this run; {update['source']} goes to the report only.")
+        elif slack_targets is not None and slack_target(self.notifier) in slack_targets:
+            logger.info(f"Slack alert for {update['source']} already sent to this channel for another profile.")
+        elif should_send_slack_alert(analysis):
+            impact_level = normalize_impact_level(analysis.get("impact_level"))
+            if slack_targets is not None:
+                slack_targets.add(slack_target(self.notifier))
+            if self.post_queue:
+                logger.info(f"{impact_level} impact for {update['source']}. Queueing Slack alert...")
+                self.post_queue.enqueue("slack", {"alert": alert, "profile": self.profile_tag})
+            else:
+                logger.info(f"{impact_level} impact for {update['source']}. Sending Slack alert...")
+                self.notifier.send_slack_alert(alert)
+        else:
+            logger.info(f"Impact '{analysis.get('impact_level')}' below Slack threshold. Skipping.")
+        if self.checkpoint:
+            self.checkpoint.record_notified(update, alert, section)
+        return alert
+
+    def resume_notification(self, entry):
+        """Sends a notification journaled as pending before an interruption."""
+        return self.notify(entry)
+
+def alert_status(analysis, alert):
+    """Source status fields (dashboard) for the source's latest alert."""
+    return {
+        "last_status": alert['resolved_status'],
+        "last_impact": analysis['type'],
+        "last_impact_level": normalize_impact_level(analysis.get("impact_level")),
+        "next_action": analysis.get('action_required', "Monitoring"),
+        "last_date": alert['release_date'],
+    }
+
+class ProfileFanout:
+    """
+    Multi-profile cycle: every update fans out to one UpdateProcessor per profile
+    that follows it. Profiles asking the same question (content, scopes, freshness)
+    share one LLM call through the AnalysisCache. Budget and deadline apply per
+    update, so it is analyzed for all of its profiles or deferred for all, and its
+    hash is written once, after every profile has journaled its alert.
+    Exposes the UpdateProcessor stage methods, so the pipeline and serial loop drive it unchanged.
+    """
+
+    def __init__(self, processors, scheduler=None, deadline=None, analysis_cache=None):
+        self.processors = processors
+        self.scheduler = scheduler
+        self.deadline = deadline or Deadline()
+        self.analysis_cache = analysis_cache
+        self.deferred = []
+        self._lock = threading.Lock()
+
+    @property
+    def analyzed(self):
+        return sum(processor.analyzed for processor in self.processors)
+
+    @property
+    def alerts(self):
+        return [alert for processor in self.processors for alert in processor.alerts]
+
+    @property
+    def rate_limit_seconds(self):
+        return self.processors[0].rate_limit_seconds
+
+    @rate_limit_seconds.setter
+    def rate_limit_seconds(self, seconds):
+        for processor in self.processors:
+            processor.rate_limit_seconds = seconds
+
+    def prefilter(self, update):
+        # Profile filters and scopes are applied per profile in analyze()
+        if not update or not (update.get('content') or '').strip():
+            return None
+        return update
+
+    def analyze(self, update):
+        entries = [(processor, processor.prefilter(update)) for processor in self.processors]
+        entries = [(processor, entry) for processor, entry in entries if entry is not None]
+        if not entries:
+            logger.info(f"No profile follows {update['source']}; skipping.")
+            return None
+        calls = len({processor.cache_key(entry) for processor, entry in entries if processor.needs_llm(entry)})
+        if calls and self.deadline.expired():
+            return self.defer(update, "cycle deadline reached")
+        if calls and self.scheduler and not self.scheduler.admit(update, calls=calls):
+            return self.defer(update, "cycle budget exhausted")
+
+        results = []
+        for processor, entry in entries:
+            result = processor.analyze(entry)
+            if result is None:
+                return self.defer(update, "cycle deadline reached during analysis")
+            results.append((processor, result))
+        return update, results
+
+    def defer(self, update, reason):
+        logger.info(f"Deferring {update['source']} to the next cycle for all profiles: {reason}.")
+        with self._lock:
+            self.deferred.append(update['source'])
+        return None
+
+    def persist(self, entry, write_state=True):
+        update, results = entry
+        # The other profiles journal their alerts before the first one writes the hash
+        persisted = [(processor, processor.persist(result, write_state=False)) for processor, result in results[1:]]
+        first, result = results[0]
+        return [(first, first.persist(result, write_state=write_state))] + persisted
+
+    def notify(self, entries):
+        # Profiles without a notification override share the notifier: one Slack alert per channel
+        slack_targets = set()
+        alerts = [processor.notify(entry, slack_targets=slack_targets) for processor, entry in entries]
+        return [alert for alert in alerts if alert is not None] or None
+
+    def resume_notification(self, entry):
+        profile = entry[0].get('profile')
+        for processor in self.processors:
+            if processor.profile_tag == profile:
+                return processor.notify(entry)
+        logger.warning(f"Dropping a pending notification of unknown profile '{profile}'.")
+        return None
+
+def slack_target(notifier):
+    """The Slack channel a notifier posts to: its webhook, or the notifier itself when it has none."""
+    return getattr(notifier, "slack_webhook", None) or id(notifier)
+
+def profile_notifiers(config, profiles, notifier):
+    """Notifier per profile name: the shared one unless the profile overrides its notification targets."""
+    return {
+        profile.name: Notifier(profile.notifier_config(config)) if profile.notifications else notifier
+        for profile in profiles
+    }
+
+def build_processor(config, firebase, analyzer, notifier, sys_config, is_manual, checkpoint=None,
+                    scheduler=None, deadline=None, post_queue=None, relevance_gate=None):
+    """The cycle's UpdateProcessor, or a ProfileFanout when config 'profiles' defines team profiles."""
+    profiles = load_profiles(config)
+    if len(profiles) == 1 and profiles[0].name == DEFAULT_PROFILE:
+        freshness_days = freshness_to_days(profiles[0].freshness_for(sys_config, is_manual))
+        return UpdateProcessor(
+            firebase, analyzer, notifier, freshness_days, is_manual, checkpoint=checkpoint,
+            scheduler=scheduler, deadline=deadline, post_queue=post_queue, relevance_gate=relevance_gate,
+        )
+
+    analysis_cache = AnalysisCache()
+    notifiers = profile_notifiers(config, profiles, notifier)
+    processors = [
+        UpdateProcessor(
+            firebase, analyzer, notifiers[profile.name], freshness_to_days(profile.freshness_for(sys_config, is_manual)),
+            is_manual, checkpoint=checkpoint, deadline=deadline, profile=profile, analysis_cache=analysis_cache,
+            post_queue=post_queue, relevance_gate=relevance_gate,
+        )
+        for profile in profiles
+    ]
+    logger.info(f"Multi-profile cycle: {', '.join(profile.name for profile in profiles)}.")
+    return ProfileFanout(processors, scheduler=scheduler, deadline=deadline, analysis_cache=analysis_cache)
+
+CYCLE_STAGES = ("fetch", "prefilter", "analyze", "persist", "notify")
+
+def build_cycle_pipeline(fetcher, processor, pipeline_config, force=False, stage_names=CYCLE_STAGES, pages=None,
+                         health=None):
+    """
+    Staged variant of the cycle loop. Fetch, pre-filter and analysis run on worker
+    pools; persist and notify are ordered stages, so writes, Slack alerts and report
+    sections follow input order exactly as in the serial loop. stage_names selects
+    a contiguous part of the cycle (the scheduler splits it around its priority queue).
+    """
+    workers = pipeline_config.get('workers') or {}
+    processor.rate_limit_seconds = pipeline_config.get('rate_limit_seconds', processor.rate_limit_seconds)
+
+    def fetch(item):
+        # Manual injections arrive with their content; monitored sources are fetched here
+        if item.get('is_manual_injection'):
+            return item
+        return fetcher.check_source(item, force=force, pages=pages, health=health)
+
+    stages = {
+        "fetch": Stage("fetch", fetch, workers=workers.get('fetch', 4)),
+        "prefilter": Stage("prefilter", processor.prefilter, workers=workers.get('prefilter', 1)),
+        "analyze": Stage("analyze", processor.analyze, workers=workers.get('analyze', 1)),
+        "persist": Stage("persist", processor.persist, ordered=True),
+        "notify": Stage("notify", processor.notify, ordered=True),
+    }
+    return StagedPipeline([stages[name] for name in stage_names], queue_size=pipeline_config.get('queue_size', 8))
+
+def run_cycle(config, firebase, fetcher, analyzer, notifier, default_sources=None, is_manual=None,
+              shard=None, run_id=None, deadline=None, post_queue=None):
+    """
+    One intelligence cycle. With shard=(i, N) only the sources and manual injections
+    owned by shard i are processed and the alerts are stored under run_id for
+    merge_shards, which publishes the single report and digest.
+    The deadline (config 'cycle_deadline' unless given) bounds fetch and LLM timeouts
+    and rate-limit sleeps; once it passes, remaining updates are deferred and the
+    partial results are published. With a post_queue (see start_post_processing) the
+    report is saved as soon as the analysis loop ends; notes, digest and Slack follow.
+    """
+    deadline = deadline or create_deadline(config)
+    with deadline.bound_to(fetcher, analyzer):
+        _run_cycle(config, firebase, fetcher, analyzer, notifier, default_sources, is_manual, shard, run_id, deadline,
+                   post_queue)
+
+def _run_cycle(config, firebase, fetcher, analyzer, notifier, default_sources, is_manual, shard, run_id, deadline,
+               post_queue):
+    # 0. Check System Config (Pause/Frequency) — one concurrent bootstrap read
+    injection_config = config.get('manual_injections') or {}
+    recover_ingestions(config, firebase)
+    bootstrap = firebase.bootstrap_cycle(
+        injection_page_size=injection_config.get('page_size', 20),
+        max_injections=injection_config.get('max_per_cycle', 50),
+    )
+    sys_config = bootstrap["system_config"]
     if sys_config.get('is_paused'):
         logger.info("Workflow is PAUSED via dashboard. Skipping cycle.")
         return
@@ -59,7 +996,10 @@ def job():
         if pipeline_source in ("web", "api", "trigger") or os.getenv("INTELLIGENCE_CYCLE") == "true"
         else "local"
     )
-    is_manual = event_name == "workflow_dispatch"
+    if is_manual is None:
+        is_manual = event_name == "workflow_dispatch"
+    elif is_manual:
+        event_name = "control_endpoint"
     
     # Select freshness based on run type
     if is_manual:
@@ -90,177 +1030,246 @@ def job():
             return
 
     # 1. Fetch URLs (Prioritize Firestore)
-    sources = firebase.get_monitored_urls()
+    sources = bootstrap["monitored_urls"]
     if not sources:
         logger.info("No URLs found in Firestore, falling back to sources.yaml")
-        sources = load_default_sources()
+        sources = default_sources if default_sources is not None else load_default_sources()
     
     if not sources:
         logger.warning("No sources to monitor. Exiting.")
         return
 
-    # 2. Fetch Updates
-    updates = fetcher.check_sources(sources, force=is_manual)
-    
-    # 2.1 Fetch Manual Injections from Firestore (Custom Scraper Hooks)
-    manual_entries = firebase.get_manual_injections()
-    for entry in manual_entries:
-        logger.info(f"Picked up manual injection: {entry['source']}")
-        updates.append({
-            "id": entry['id'],
-            "source": entry['source'],
-            "url": "Manual Injection",
-            "content": entry['content'],
-            "is_manual_injection": True
-        })
-    
-    if not updates:
+    manual_entries = bootstrap["manual_injections"]
+    if shard:
+        shard_index, shard_count = shard
+        sources = list(select_shard(sources, shard_index, shard_count))
+        manual_entries = select_shard(manual_entries, shard_index, shard_count, key=lambda entry: str(entry['id']))
+        logger.info(f"Shard {shard_index}/{shard_count} of run {run_id}: {len(sources)} sources assigned.")
+    # Sources that keep failing are quarantined instead of burning a fetch timeout every cycle
+    health = create_source_health(config)
+    if health:
+        sources = health.admit(sources)
+
+    # 2-4. Fetch -> pre-filter -> analyze -> persist -> notify
+    # Manual Injections from Firestore (Custom Scraper Hooks) are streamed page by page
+    # so only one page of pasted content is held at a time
+    report_title = format_report_title()
+    # Resumes an interrupted cycle: completed analyses and notifications are not repeated
+    checkpoint = create_checkpoint(config, firebase, name=f"shard-{shard[0]}-of-{shard[1]}" if shard else "current")
+    if checkpoint and checkpoint.begin(report_title):
+        report_title = checkpoint.report_title or report_title
+    # Cycle budget: candidates are analyzed highest priority first; overflow waits for the next cycle
+    scheduler = create_scheduler(config)
+    relevance_gate = create_relevance_gate(config, firebase)
+    # Team profiles share one fetch per page and one LLM call per distinct question
+    processor = build_processor(
+        config, firebase, analyzer, notifier, sys_config, is_manual, checkpoint=checkpoint,
+        scheduler=scheduler, deadline=deadline, post_queue=post_queue, relevance_gate=relevance_gate,
+    )
+    if checkpoint and checkpoint.resumed:
+        # Alerts built before the interruption whose notification never went out
+        for entry in checkpoint.pending_notifications():
+            processor.resume_notification(entry)
+    manual_updates = iter_manual_updates(manual_entries)
+    pages = PageShare(sources)
+    pipeline_config = config.get('pipeline') or {}
+    if pipeline_config.get('enabled') and scheduler:
+        # Prioritizing needs every candidate first, so the pipeline is split around the queue
+        intake = build_cycle_pipeline(fetcher, processor, pipeline_config, force=is_manual,
+                                      stage_names=CYCLE_STAGES[:2], pages=pages, health=health)
+        candidates = intake.run(itertools.chain(sources, manual_updates))
+        intake.log_stats()
+        pipeline = build_cycle_pipeline(fetcher, processor, pipeline_config, force=is_manual,
+                                        stage_names=CYCLE_STAGES[2:])
+        pipeline.run(scheduler.order(candidates))
+        pipeline.log_stats()
+    elif pipeline_config.get('enabled'):
+        pipeline = build_cycle_pipeline(fetcher, processor, pipeline_config, force=is_manual, pages=pages,
+                                        health=health)
+        pipeline.run(itertools.chain(sources, manual_updates))
+        pipeline.log_stats()
+    else:
+        updates = fetcher.check_sources(sources, force=is_manual, pages=pages, health=health)
+        candidates = filter(None, map(processor.prefilter, itertools.chain(updates, manual_updates)))
+        if scheduler:
+            candidates = scheduler.order(candidates)
+        for entry in candidates:
+            entry = processor.analyze(entry)
+            if entry is not None:
+                processor.notify(processor.persist(entry))
+    if scheduler:
+        scheduler.log_summary()
+    if processor.deferred:
+        logger.warning(
+            f"Deferred {len(processor.deferred)} updates to the next cycle: {', '.join(processor.deferred)}"
+        )
+    if deadline.expired():
+        logger.warning("Cycle deadline reached; publishing the results gathered so far.")
+    if pages.hits:
+        logger.info(f"Shared {pages.hits} page fetches between sources pointing at the same page.")
+    if health:
+        health.log_summary()
+        health.flush(firebase)
+    if relevance_gate:
+        relevance_gate.log_summary()
+    if isinstance(processor, ProfileFanout):
+        processor.analysis_cache.log_stats()
+
+    if shard:
+        # Even an empty result is stored, so the merge step can tell the shard finished
+        firebase.save_shard_result(run_id, shard[0], encode_shard_result(shard[0], shard[1], {
+            p.profile_name: (p.alerts, p.alert_sections) for p in processor.processors
+        }))
+        logger.info(f"Shard {shard[0]}/{shard[1]} stored {len(processor.alerts)} alerts for merging.")
+        log_analyzer_stats(analyzer)
+        if checkpoint:
+            checkpoint.complete()
+        return
+
+    if not processor.analyzed and not processor.alerts:
         logger.info("No new content changes detected.")
         firebase.record_cycle_run()
+        if checkpoint:
+            checkpoint.complete()
         return
 
-    # 3. Analyze Updates
-    alerts = []
-    report_content = "# Intelligence Discovery Report\n\n"
-    report_content += f"**Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-    
-    for update in updates:
-        category = update.get('category', 'General')
-        scopes = update.get('scopes')
-        
-        # If no explicit scopes, apply category-specific strict scope rules.
-        # These map to the exact API areas Logiwa's integration team cares about.
-        if not scopes:
-            if category in ('Marketplaces', 'Marketplace', 'ERPs'):
-                # Focus: core WMS-facing commerce endpoints
-                scopes = [
-                    'Orders API', 'Create Order', 'Update Order', 'Cancel Order',
-                    'Products API', 'Product listing', 'Variant', 'SKU',
-                    'Inventory API', 'Stock update', 'Fulfillment', 'Shipment notification',
-                    'Receipt', 'Purchase Order', 'Receiving'
-                ]
-            elif category == 'Carriers':
-                # Focus: shipping label lifecycle endpoints
-                scopes = [
-                    'Create Label', 'Void Label', 'Refund Label',
-                    'Get Rate', 'Rate Shop', 'Tracking', 'Pickup',
-                    'Manifest', 'End of Day', 'Address Validation'
-                ]
-            elif category == 'General':
-                # Focus: authentication, webhooks, API versioning — infra-level changes
-                scopes = [
-                    'Authentication', 'OAuth', 'API Key', 'Webhook',
-                    'Rate Limit', 'API versioning', 'Deprecation', 'Breaking change'
-                ]
-        logger.info(f"Analyzing update from: {update['source']} (Category: {category})")
-        freshness_days = freshness_to_days(freshness)
-        analysis = analyzer.analyze(
-            update['content'],
-            update['url'],
-            freshness=freshness_days,
-            scopes=scopes
+    # 5. Persistence (Save to Firestore) — one report and digest per profile
+    if processor.alerts:
+        for p in processor.processors:
+            if not p.alerts:
+                continue
+            report_id = checkpoint.cycle_id if checkpoint else None
+            if report_id and p.profile_tag:
+                report_id = f"{report_id}-{p.profile_tag}"
+            publish_report(
+                firebase, analyzer, p.notifier, p.alerts, p.alert_sections, report_title,
+                checkpoint=checkpoint, report_id=report_id, profile=p.profile_tag, post_queue=post_queue,
+            )
+    else:
+        logger.info("No alerts generated this cycle.")
+
+    log_analyzer_stats(analyzer)
+    firebase.record_cycle_run()
+    if checkpoint:
+        checkpoint.complete()
+    logger.info("Intelligence Cycle Completed.")
+
+def publish_report(firebase, analyzer, notifier, alerts, alert_sections, report_title, checkpoint=None, report_id=None,
+                   profile=None, post_queue=None, name=None):
+    """Customer notes, the stored report and the digest email for a cycle's (or one profile's) alerts."""
+    if post_queue:
+        queue_report(
+            firebase, post_queue, alerts, alert_sections, report_title, report_id=report_id, profile=profile, name=name,
         )
+        return
+    # Generate Customer Facing Notes from the aggregate technical content
+    logger.info("Generating professional customer-facing release notes...")
+    notes_key, digest_key = ("customer_notes", "digest_sent") if not profile else (
+        f"customer_notes:{profile}", f"digest_sent:{profile}"
+    )
+    report_content = report_title + "".join(alert_sections)
+    customer_notes = checkpoint.get(notes_key) if checkpoint else None
+    if customer_notes is None:
+        customer_notes = analyzer.generate_customer_notes(report_content)
+        if checkpoint:
+            checkpoint.set(notes_key, customer_notes)
 
-        # Always persist hash after analysis so irrelevant/stale items are not re-analyzed forever
-        if firebase and update.get('new_hash'):
-            firebase.update_url_hash(update['id'], update['new_hash'])
+    # Small header for the dashboard list; compressed per-alert sections (and the
+    # customer notes for the Export Center) are loaded lazily from the subcollection.
+    # A fixed report_id (checkpointed cycle, merged run) makes re-saving overwrite.
+    firebase.save_report(
+        build_report_header(name or report_name(profile), alerts, title=report_title, profile=profile),
+        report_id=report_id,
+        sections=build_report_sections(alert_sections, customer_notes, alerts),
+    )
+    digest_alerts = [alert for alert in alerts if should_include_in_digest(alert.get("resolved_status"))]
+    if digest_alerts and checkpoint and checkpoint.get(digest_key):
+        logger.info("Digest email already sent before the interruption; skipping.")
+    elif digest_alerts:
+        notifier.send_digest_email(digest_alerts)
+        if checkpoint:
+            checkpoint.set(digest_key, True)
+    else:
+        logger.info("Alerts found but none are Action Required / Needs Review; skipping digest email.")
 
-        if analysis.get('is_relevant'):
-            resolved_release_date = resolve_release_date(analysis)
-            impact_level = normalize_impact_level(analysis.get("impact_level"))
-            in_window = is_within_review_window(resolved_release_date, freshness_days)
-
-            if not in_window:
-                logger.info(
-                    f"Update from {update['source']} ({resolved_release_date}) is outside "
-                    f"{freshness_days}-day window."
-                )
-                # Manual runs still notify Slack for High/Medium findings (test / deep scan)
-                if not (is_manual and impact_level in ("High", "Medium")):
-                    continue
-
-            resolved_status = resolve_integration_status(analysis, freshness_days)
-            alert = {
-                "source": update['source'],
-                "url": analysis.get('source_url', update['url']),
-                "summary": analysis['summary'],
-                "details": analysis.get('details', []),
-                "logiwa_impact": analysis.get('logiwa_impact', 'N/A'),
-                "action_required": analysis.get('action_required', 'N/A'),
-                "impact_level": analysis['impact_level'],
-                "type": analysis['type'],
-                "release_date": resolved_release_date,
-                "exact_quote": analysis.get('exact_quote', ''),
-                "resolved_status": resolved_status,
-            }
-            alerts.append(alert)
-            
-            # Sync Status back to Firestore if we have a source_id
-            source_id = update.get('id')
-            if firebase and source_id:
-                impact_level = normalize_impact_level(analysis.get("impact_level"))
-                status_data = {
-                    "last_status": resolved_status,
-                    "last_impact": analysis['type'],
-                    "last_impact_level": impact_level,
-                    "next_action": analysis.get('action_required', "Monitoring"),
-                    "last_date": resolved_release_date,
-                }
-                logger.info(f"Updating Firestore status for {update['source']}...")
-                if update.get('is_manual_injection'):
-                    firebase.mark_manual_injection_processed(source_id)
-                else:
-                    firebase.update_url_status(source_id, status_data)
-
-            # Format for the detailed report content
-            
-            deep_link = alert['url']
-            if alert.get('exact_quote'):
-                deep_link = f"{alert['url']}#:~:text={urllib.parse.quote(alert['exact_quote'])}"
-            
-            report_content += f"## {update['source']}\n"
-            report_content += f"**Release Date:** {resolved_release_date} | **Type:** {analysis['type']} | **Impact:** {analysis['impact_level']}\n"
-            report_content += f"**Source:** [View Documentation]({deep_link})\n\n"
-            report_content += f"### Summary\n{analysis['summary']}\n\n"
-            report_content += "### Technical Details\n"
-            for detail in analysis.get('details', []):
-                report_content += f"- {detail}\n"
-            report_content += f"\n### Logiwa Impact\n{analysis.get('logiwa_impact')}\n\n"
-            report_content += f"### ✅ Recommended Action\n> {analysis.get('action_required')}\n\n"
-            report_content += "---\n\n"
-
-            # 4. Immediate Slack for LLM High/Medium impact
-            if should_send_slack_alert(analysis):
-                logger.info(f"{impact_level} impact for {update['source']}. Sending Slack alert...")
-                notifier.send_slack_alert(alert)
-            else:
-                logger.info(f"Impact '{analysis.get('impact_level')}' below Slack threshold. Skipping.")
+def queue_report(firebase, post_queue, alerts, alert_sections, report_title, report_id=None, profile=None, name=None):
+    """
+    Saves the technical report right away (status Processing) and queues the customer
+    notes, which patch it to Ready, and the digest. Jobs are keyed by report id, so a
+    resumed cycle re-saving the same report does not repeat them.
+    """
+    notes_done = bool(report_id) and post_queue.status(f"customer_notes:{report_id}") == "done"
+    report_id = firebase.save_report(
+        build_report_header(
+            name or report_name(profile), alerts, title=report_title, status="Ready" if notes_done else "Processing",
+            profile=profile,
+        ),
+        report_id=report_id,
+        sections=build_report_sections(alert_sections, alerts=alerts),
+    )
+    if report_id:
+        post_queue.enqueue("customer_notes", {
+            "report_id": report_id,
+            "content": report_title + "".join(alert_sections),
+            "section_index": len(alert_sections),
+        }, key=f"customer_notes:{report_id}")
+    digest_alerts = [alert for alert in alerts if should_include_in_digest(alert.get("resolved_status"))]
+    if digest_alerts:
+        post_queue.enqueue(
+            "digest", {"alerts": digest_alerts, "profile": profile}, key=f"digest:{report_id}" if report_id else None,
+        )
+    else:
+        logger.info("Alerts found but none are Action Required / Needs Review; skipping digest email.")
+    logger.info("Technical report saved; customer notes and digest queued for post-processing.")
 
-        logger.info("Sleeping 10s to respect Rate Limits...")
-        time.sleep(10)
+def publish_alerts(clients, processor, report_title, prefix="Intel Report"):
+    """Publishes a run's alerts outside a cycle (import, ingestion): one report and digest per profile."""
+    for p in processor.processors:
+        if p.alerts:
+            publish_report(
+                clients["storage"], clients["analyzer"], p.notifier, p.alerts, p.alert_sections, report_title,
+                profile=p.profile_tag, post_queue=clients.get("post_queue"), name=report_name(p.profile_tag, prefix),
+            )
 
-    # 5. Persistence (Save to Firestore)
-    if alerts:
-        # Generate Customer Facing Notes from the aggregate technical content
-        logger.info("Generating professional customer-facing release notes...")
-        customer_notes = analyzer.generate_customer_notes(report_content)
+def report_name(profile=None, prefix="Intel Report"):
+    return f"{prefix} - {time.strftime('%b %d, %Y')}" + (f" ({profile})" if profile else "")
 
-        firebase.save_report({
-            "name": f"Intel Report - {time.strftime('%b %d, %Y')}",
-            "content": report_content,
-            "customer_content": customer_notes, # New field for Export Center
-            "status": "Ready",
-            "alert_count": len(alerts)
-        })
-        digest_alerts = [alert for alert in alerts if should_include_in_digest(alert.get("resolved_status"))]
-        if digest_alerts:
-            notifier.send_digest_email(digest_alerts)
-        elif alerts:
-            logger.info("Alerts found but none are Action Required / Needs Review; skipping digest email.")
-        else:
-            logger.info("No alerts generated this cycle.")
+def log_analyzer_stats(analyzer):
+    analyzer.log_parse_stats()
+    if analyzer.cascade_enabled:
+        analyzer.log_cascade_stats()
+    if analyzer.hedging_enabled:
+        analyzer.log_hedge_stats()
 
+def merge_shards(firebase, analyzer, notifier, shard_count, run_id, notifiers=None, post_queue=None):
+    """
+    Combines the alert sets of every shard of run_id into one report and one digest
+    per profile; notifiers maps profile names to their notifier (default: notifier).
+    """
+    results = firebase.load_shard_results(run_id)
+    if not results:
+        logger.warning(f"No shard results stored for run {run_id}; nothing to merge.")
+        return
+    profiles, missing = merge_shard_results(results, shard_count)
+    if missing:
+        logger.warning(f"Shards {missing} of run {run_id} stored no results; merging the other shards.")
+    total = sum(len(alerts) for alerts, _ in profiles.values())
+    logger.info(f"Merging {total} alerts from {shard_count - len(missing)}/{shard_count} shards of run {run_id}.")
+
+    report_title = format_report_title()
+    for name, (alerts, alert_sections) in profiles.items():
+        if not alerts:
+            continue
+        profile = None if name == DEFAULT_PROFILE else name
+        publish_report(
+            firebase, analyzer, (notifiers or {}).get(name, notifier), alerts, alert_sections, report_title,
+            report_id=f"run-{run_id}-{profile}" if profile else f"run-{run_id}", profile=profile,
+            post_queue=post_queue,
+        )
+    if not total:
+        logger.info("No alerts generated this cycle.")
     firebase.record_cycle_run()
+    firebase.clear_shard_results(run_id)
     logger.info("Intelligence Cycle Completed.")
 
 def run_internal_reporter():
@@ -272,10 +1281,8 @@ def run_internal_reporter():
     # For now, we assume a 'notes.txt' exists in the data directory.
     notes_path = "data/weekly_notes.txt"
     if os.path.exists(notes_path):
-        with open(notes_path, "r", encoding="utf-8") as f:
-            raw_notes = f.read()
-        
-        report_html = reporter.generate_report(raw_notes)
+        # Streamed in bounded chunks so large notes files never sit in memory at once
+        report_html = reporter.generate_report_from_file(notes_path)
         notifier = Notifier(config)
         notifier.send_internal_report_email(report_html)
         
@@ -291,8 +1298,32 @@ if __name__ == "__main__":
     if not os.getenv("OPENAI_API_KEY") and not os.getenv("GOOGLE_API_KEY"):
         logger.warning("No LLM API Key found! Analysis will be failing.")
 
+    parser = argparse.ArgumentParser(description="Logiwa Intelligence monitor")
+    parser.add_argument("--daemon", action="store_true", help="Keep clients warm and serve the local control endpoint")
+    parser.add_argument("--shard", type=parse_shard, help="Process only shard i of N (0 <= i < N), e.g. 0/4")
+    parser.add_argument("--merge", type=int, metavar="N", help="Merge the results of N shards into one report and digest")
+    parser.add_argument("--run-id", default=None, help="Id shared by the shard and merge jobs of one cycle")
+    parser.add_argument("--import-injections", metavar="PATH", help="Bulk-import manual injections from a JSONL or CSV file")
+    parser.add_argument("--import-format", choices=("jsonl", "csv"), help="Import file format (default: by extension)")
+    parser.add_argument("--no-analyze", action="store_true", help="Import only; leave injections Pending for the next cycle")
+    parser.add_argument("--backfill", nargs="*", metavar="NAME",
+                        help="Analyze the full history of the named sources (default: sources never fetched)")
+    args = parser.parse_args()
+    run_id = args.run_id or default_run_id()
+
     # Check if running in CI (GitHub Actions or GitLab CI) — single run, no scheduler
-    if os.getenv("GITHUB_ACTIONS") == "true" or os.getenv("GITLAB_CI") == "true":
+    if args.daemon:
+        run_daemon()
+    elif args.backfill is not None:
+        backfill_job(args.backfill)
+    elif args.import_injections:
+        import_job(args.import_injections, fmt=args.import_format, analyze=not args.no_analyze)
+    elif args.merge:
+        merge_job(args.merge, run_id)
+    elif args.shard:
+        logger.info(f"Running shard {args.shard[0]}/{args.shard[1]} of run {run_id}...")
+        job(shard=args.shard, run_id=run_id)
+    elif os.getenv("GITHUB_ACTIONS") == "true" or os.getenv("GITLAB_CI") == "true":
         logger.info("Detected CI environment. Running one-time cycle...")
         job()
         # Optional: Run reporter if it's Friday in UTC? 
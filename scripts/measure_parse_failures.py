@@ -0,0 +1,53 @@
+"""
+Compare the JSON parse-failure rate of free-text vs schema-constrained LLM output.
+Fetches the default sources once and analyzes each page in both modes.
+Usage: python scripts/measure_parse_failures.py [--limit 5]
+"""
+import argparse
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import yaml
+
+from src.fetcher import Fetcher
+from src.llm_analyzer import LLMAnalyzer
+from src.source_loader import load_default_sources
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=5, help="Number of sources to sample")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING)
+    with open(os.path.join(ROOT, "config.yaml"), "r", encoding="utf-8") as handle:
+        config = yaml.safe_load(handle)
+
+    fetcher = Fetcher()
+    pages = []
+    for source in load_default_sources()[:args.limit]:
+        content, _ = fetcher.fetch_url(source["url"], source.get("selector"))
+        if content:
+            pages.append((source, content))
+    print(f"Fetched {len(pages)} pages.")
+
+    for structured in (False, True):
+        analyzer = LLMAnalyzer({**config, "llm_structured_output": structured})
+        for source, content in pages:
+            analyzer.analyze(content, source["url"], scopes=source.get("scopes"))
+        label = "schema-constrained" if structured else "free-text"
+        for mode, stats in sorted(analyzer.parse_stats.items()):
+            rate = stats["failures"] / stats["responses"] if stats["responses"] else 0.0
+            print(f"[{label}] {mode}: {stats['failures']}/{stats['responses']} parse failures ({rate:.1%})")
+
+
+if __name__ == "__main__":
+    main()
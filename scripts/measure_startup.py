@@ -0,0 +1,85 @@
+"""
+Measure the cold-start cost of a one-shot CI run.
+Runs `python -X importtime -c "import monitor_agent"` in a fresh interpreter, prints the
+total import time and the slowest modules, and optionally times building the clients up
+to the first fetch. Exits non-zero when the import exceeds --max-ms.
+Usage: python scripts/measure_startup.py [--runs 3] [--top 15] [--max-ms 600] [--first-fetch]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+FIRST_FETCH = """
+import os
+import time
+import yaml
+ROOT = os.environ["PYTHONPATH"]
+started = time.perf_counter()
+import monitor_agent
+imported = time.perf_counter()
+with open(os.path.join(ROOT, "config.yaml"), "r") as handle:
+    config = yaml.safe_load(handle)
+clients = {kind: monitor_agent.build_client(config, kind) for kind in ("storage", "fetcher", "analyzer", "notifier")}
+built = time.perf_counter()
+source = monitor_agent.load_default_sources()[0]
+clients["fetcher"].fetch_url(source["url"], source.get("selector"))
+fetched = time.perf_counter()
+print(f"{(imported - started) * 1000:.0f} {(built - imported) * 1000:.0f} {(fetched - built) * 1000:.0f}")
+"""
+
+
+def _run(code, capture_stderr=False):
+    # A scratch cwd keeps the bot's log file out of the repository
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    with tempfile.TemporaryDirectory() as cwd:
+        args = [sys.executable] + (["-X", "importtime"] if capture_stderr else []) + ["-c", code]
+        result = subprocess.run(args, cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return result.stderr if capture_stderr else result.stdout
+
+
+def parse_importtime(output):
+    """{module: (self_us, cumulative_us)} from -X importtime output."""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3, help="Import runs; the fastest is reported")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    parser.add_argument("--max-ms", type=float, help="Fail when importing monitor_agent takes longer")
+    parser.add_argument("--first-fetch", action="store_true", help="Also time client setup and the first fetch")
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(max(args.runs, 1)):
+        modules = parse_importtime(_run("import monitor_agent", capture_stderr=True))
+        if best is None or modules["monitor_agent"][1] < best["monitor_agent"][1]:
+            best = modules
+
+    total_ms = best["monitor_agent"][1] / 1000
+    print(f"import monitor_agent: {total_ms:.0f} ms (fastest of {max(args.runs, 1)})")
+    print("Slowest modules (self time):")
+    for name, (self_us, cumulative_us) in sorted(best.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {self_us / 1000:7.1f} ms self  {cumulative_us / 1000:7.1f} ms total  {name}")
+
+    if args.first_fetch:
+        imported, built, fetched = _run(FIRST_FETCH).split()[-3:]
+        print(f"Time to first fetch: import {imported} ms, clients {built} ms, fetch {fetched} ms")
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"Startup regression: {total_ms:.0f} ms exceeds the {args.max_ms:.0f} ms budget.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Train and evaluate the local relevance model on the LLM verdicts stored by cycles
+(config relevance_model.collect_samples). Training calibrates the skip threshold on
+held-out samples and prints its precision and recall.
+Usage: python scripts/train_relevance_model.py train [--target-recall 0.98] [--output PATH]
+       python scripts/train_relevance_model.py evaluate [--all]
+"""
+import argparse
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import yaml
+
+from src.relevance import DEFAULT_MODEL_PATH, RelevanceModel, evaluate_model, in_validation, train_model
+from src.storage import create_storage
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def print_metrics(label, metrics):
+    print(
+        f"{label:<24} n={metrics['samples']:<5} threshold={metrics['threshold']:.3f} "
+        f"precision={metrics['precision']:.3f} recall={metrics['recall']:.3f} "
+        f"skip_rate={metrics['skip_rate']:.3f} missed_relevant={metrics['missed_relevant']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("train", "evaluate"))
+    parser.add_argument("--target-recall", type=float, help="Share of relevant updates that must reach the LLM")
+    parser.add_argument("--output", help="Model path (default: config relevance_model.path)")
+    parser.add_argument("--all", action="store_true", help="Evaluate on every sample, not just the held-out split")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING)
+    with open(os.path.join(ROOT, "config.yaml"), "r", encoding="utf-8") as handle:
+        config = yaml.safe_load(handle)
+    relevance_config = config.get('relevance_model') or {}
+    path = args.output or relevance_config.get('path') or DEFAULT_MODEL_PATH
+    fraction = relevance_config.get('validation_fraction', 0.25)
+
+    samples = create_storage(config).load_relevance_samples()
+    relevant = sum(1 for sample in samples if sample.get('is_relevant'))
+    print(f"Loaded {len(samples)} samples ({relevant} relevant).")
+
+    if args.command == "train":
+        try:
+            model = train_model(
+                samples,
+                validation_fraction=fraction,
+                target_recall=args.target_recall or relevance_config.get('target_recall', 0.98),
+                max_threshold=relevance_config.get('max_threshold', 0.5),
+                min_samples=relevance_config.get('min_samples', 40),
+            )
+        except ValueError as e:
+            print(f"Not training: {e}")
+            sys.exit(1)
+        print_metrics("held-out (calibration)", model.metrics)
+        model.save(path)
+        print(f"Saved model to {path} ({model.metrics['train_samples']} training samples).")
+        return
+
+    model = RelevanceModel.load(path)
+    if not args.all:
+        samples = [sample for sample in samples if in_validation(sample, fraction)]
+    print(f"Model trained {model.trained_at}; evaluating on {len(samples)} {'' if args.all else 'held-out '}samples.")
+    for label, metrics in evaluate_model(model, samples).items():
+        print_metrics(label, metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+from src.status_utils import normalize_impact_level
+
+IMPACT_LEVELS = ["High", "Medium", "Low"]
+
+# JSON-schema subset describing one update analysis. "default" is used to fill
+# missing or invalid optional fields so downstream code can rely on every key being
+# present; a required field without one (the verdict itself) makes the reply unusable.
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "details": {"type": "array", "items": {"type": "string"}, "default": []},
+        "logiwa_impact": {"type": "string", "default": "N/A"},
+        "action_required": {"type": "string", "default": "Monitoring"},
+        "impact_level": {"type": "string", "enum": IMPACT_LEVELS, "default": "Low"},
+        "type": {"type": "string", "default": "Info"},
+        "release_date": {"type": "string", "default": "N/A"},
+        "is_relevant": {"type": "boolean"},
+        "exact_quote": {"type": "string", "default": ""},
+        "source_url": {"type": "string", "default": ""},
+    },
+    "required": ["summary", "impact_level", "type", "is_relevant"],
+}
+
+# Tiny first-pass verdict produced by the cheap triage model in the cascade.
+TRIAGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "is_relevant": {"type": "boolean", "default": True},
+        "impact_level": {"type": "string", "enum": IMPACT_LEVELS, "default": "Low"},
+        "confidence": {"type": "number", "default": 0.0},
+    },
+    "required": ["is_relevant", "impact_level", "confidence"],
+}
+
+
+def _coerce_string(value):
+    if isinstance(value, str):
+        return value, True
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value), True
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return "; ".join(value), True
+    return None, False
+
+
+def _coerce_boolean(value):
+    if isinstance(value, bool):
+        return value, True
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ("true", "yes", "1"):
+            return True, True
+        if text in ("false", "no", "0"):
+            return False, True
+    if isinstance(value, (int, float)):
+        return bool(value), True
+    return None, False
+
+
+def _coerce_string_array(value):
+    if isinstance(value, list):
+        items = []
+        for item in value:
+            coerced, ok = _coerce_string(item)
+            if ok and coerced.strip():
+                items.append(coerced)
+        return items, True
+    if isinstance(value, str):
+        return ([value] if value.strip() else []), True
+    return None, False
+
+
+def _coerce_number(value):
+    if isinstance(value, bool):
+        return None, False
+    if isinstance(value, (int, float)):
+        return float(value), True
+    if isinstance(value, str):
+        try:
+            return float(value.strip().rstrip("%")) / (100.0 if value.strip().endswith("%") else 1.0), True
+        except ValueError:
+            return None, False
+    return None, False
+
+
+_COERCERS = {
+    "string": _coerce_string,
+    "boolean": _coerce_boolean,
+    "number": _coerce_number,
+    "array": _coerce_string_array,
+}
+
+
+def _compile_enum(options):
+    lookup = [(option.lower(), option) for option in options]
+
+    def check(value):
+        text = value.strip().lower()
+        for lowered, option in lookup:
+            if text == lowered or text.startswith(lowered):
+                return option, True
+        return None, False
+
+    return check
+
+
+def compile_schema(schema: dict):
+    """
+    Compile a flat object schema into a validator function.
+    The validator returns (normalized_dict, errors); fields are coerced to the
+    declared type where unambiguous and otherwise replaced by their default. A
+    missing or invalid required field without a default returns (None, errors).
+    """
+    required = set(schema.get("required", []))
+    fields = []
+    for name, spec in schema.get("properties", {}).items():
+        coerce = _COERCERS[spec["type"]]
+        enum_check = _compile_enum(spec["enum"]) if "enum" in spec else None
+        fields.append((name, coerce, enum_check, spec.get("default"), name in required, "default" in spec))
+
+    def validate(data):
+        if not isinstance(data, dict):
+            return None, ["result is not a JSON object"]
+
+        result = dict(data)
+        errors = []
+        usable = True
+        for name, coerce, enum_check, default, is_required, has_default in fields:
+            if name not in data or data[name] is None:
+                if is_required:
+                    errors.append(f"missing required field '{name}'")
+                    usable = usable and has_default
+                result[name] = list(default) if isinstance(default, list) else default
+                continue
+
+            value, ok = coerce(data[name])
+            if ok and enum_check:
+                value, ok = enum_check(value)
+            if not ok:
+                errors.append(f"invalid value for '{name}': {str(data[name])[:50]}")
+                usable = usable and (has_default or not is_required)
+                value = list(default) if isinstance(default, list) else default
+            result[name] = value
+        return (result if usable else None), errors
+
+    return validate
+
+
+_validate_analysis = compile_schema(ANALYSIS_SCHEMA)
+
+
+def validate_analysis(data):
+    """Validate an LLM analysis dict; impact wording like 'Breaking' maps onto the enum first."""
+    if isinstance(data, dict) and isinstance(data.get("impact_level"), str):
+        data = {**data, "impact_level": normalize_impact_level(data["impact_level"])}
+    return _validate_analysis(data)
+
+
+_validate_triage = compile_schema(TRIAGE_SCHEMA)
+
+
+def validate_triage(data):
+    """Validate a triage verdict; confidence is clamped to 0-1."""
+    if isinstance(data, dict) and isinstance(data.get("impact_level"), str):
+        data = {**data, "impact_level": normalize_impact_level(data["impact_level"])}
+    result, errors = _validate_triage(data)
+    if result is not None:
+        result["confidence"] = min(max(result["confidence"], 0.0), 1.0)
+    return result, errors
+
+
+def _strip_annotations(spec: dict) -> dict:
+    """Copy of a schema without the local-only 'default' annotations."""
+    cleaned = {key: value for key, value in spec.items() if key != "default"}
+    if "properties" in cleaned:
+        cleaned["properties"] = {
+            name: _strip_annotations(child) for name, child in cleaned["properties"].items()
+        }
+    if "items" in cleaned:
+        cleaned["items"] = _strip_annotations(cleaned["items"])
+    return cleaned
+
+
+def gemini_response_schema(schema: dict) -> dict:
+    """Schema in the OpenAPI subset accepted by Gemini's response_schema."""
+    return _strip_annotations(schema)
+
+
+def openai_response_format(schema: dict, name: str) -> dict:
+    """
+    response_format payload for OpenAI structured outputs. Strict mode requires every
+    property to be listed as required and additional properties to be disallowed.
+    """
+    strict_schema = _strip_annotations(schema)
+    strict_schema["required"] = list(strict_schema.get("properties", {}))
+    strict_schema["additionalProperties"] = False
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "schema": strict_schema, "strict": True},
+    }
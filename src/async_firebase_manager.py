@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import threading
+
+from firebase_admin import firestore, firestore_async
+
+from src.firebase_manager import (
+    MAX_BATCH_WRITES,
+    MONITORED_URL_FIELDS,
+    SERVER_TIMESTAMP,
+    FirebaseManager,
+    initialize_firebase_app,
+)
+from src.report_utils import section_document_id
+
+logger = logging.getLogger("AsyncFirebaseManager")
+
+
+class AsyncFirebaseManager:
+    """
+    asyncio variant of the cycle's hot-path FirebaseManager methods (the bootstrap
+    reads and the BACKGROUND_WRITES), built on the Firestore AsyncClient. Same method
+    names as FirebaseManager, as coroutines. Write errors are raised (not swallowed)
+    so callers can report them once the awaited work completes.
+    """
+
+    def __init__(self):
+        self.db = None
+
+    async def connect(self):
+        # The AsyncClient binds to the running event loop, so it is created from inside it
+        if self.db is None and initialize_firebase_app():
+            self.db = firestore_async.client()
+        return self.db is not None
+
+    async def get_monitored_urls(self):
+        if not self.db:
+            return []
+        query = self.db.collection("monitored_urls").select(MONITORED_URL_FIELDS)
+        return [FirebaseManager._url_from_doc(doc.id, doc.to_dict()) async for doc in query.stream()]
+
+    async def get_system_config(self):
+        if not self.db:
+            return {}
+        doc = await self.db.collection("config").document("system").get()
+        return doc.to_dict() if doc.exists else {}
+
+    async def get_manual_injections(self, limit=None):
+        if not self.db:
+            return []
+        # Oldest first, same FIFO order as FirebaseManager.iter_manual_injections
+        query = self.db.collection("manual_injections").where("status", "==", "Pending").order_by("timestamp")
+        if limit is not None:
+            query = query.limit(limit)
+        results = []
+        async for doc in query.stream():
+            data = doc.to_dict()
+            results.append({
+                "id": doc.id,
+                "source": data.get("source"),
+                "content": data.get("content"),
+                "priority": data.get("priority"),
+            })
+        return results
+
+    async def bootstrap_cycle(self):
+        system_config, monitored_urls, manual_injections = await asyncio.gather(
+            self.get_system_config(), self.get_monitored_urls(), self.get_manual_injections()
+        )
+        return {
+            "system_config": system_config,
+            "monitored_urls": monitored_urls,
+            "manual_injections": manual_injections,
+        }
+
+    async def update_system_config(self, config_data):
+        if self.db:
+            await self.db.collection("config").document("system").set(config_data, merge=True)
+
+    async def update_url_status(self, url_id, status_data):
+        if self.db:
+            await self.db.collection("monitored_urls").document(url_id).update(status_data)
+
+    async def update_url_hash(self, url_id, content_hash):
+        if self.db:
+            await self.db.collection("monitored_urls").document(url_id).update({"last_hash": content_hash})
+
+    async def mark_manual_injection_processed(self, injection_id):
+        if self.db:
+            await self.db.collection("manual_injections").document(injection_id).update({
+                "status": "Processed",
+                "processed_at": firestore.SERVER_TIMESTAMP
+            })
+
+    async def record_cycle_run(self):
+        await self.update_system_config({"last_run": firestore.SERVER_TIMESTAMP})
+
+    async def save_report(self, report_data, report_id=None, sections=None):
+        if not self.db:
+            return None
+        report_ref = self.db.collection("intel_reports").document(report_id)
+        # Sections first, header in the last batch, as in FirebaseManager.save_report
+        writes = [
+            (report_ref.collection("sections").document(section_document_id(section)), section)
+            for section in sections or []
+        ]
+        writes.append((report_ref, {**report_data, "timestamp": firestore.SERVER_TIMESTAMP}))
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for ref, data in writes[start:start + MAX_BATCH_WRITES]:
+                batch.set(ref, data)
+            await batch.commit()
+        return report_ref.id
+
+    async def update_report(self, report_id, header_data, sections=None):
+        if not self.db:
+            return False
+        report_ref = self.db.collection("intel_reports").document(report_id)
+        writes = [
+            (report_ref.collection("sections").document(section_document_id(section)), section, False)
+            for section in sections or []
+        ]
+        writes.append((report_ref, header_data, True))
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for ref, data, merge in writes[start:start + MAX_BATCH_WRITES]:
+                batch.set(ref, data, merge=merge)
+            await batch.commit()
+        return True
+
+
+# Writes BackgroundFirebaseManager runs on the AsyncClient; every other call is synchronous
+BACKGROUND_WRITES = (
+    "update_url_status", "update_url_hash", "mark_manual_injection_processed", "update_system_config",
+    "record_cycle_run", "save_report", "update_report",
+)
+
+
+class BackgroundFirebaseManager:
+    """
+    Synchronous facade used by the cycle: writes are scheduled on an AsyncFirebaseManager
+    running in a background event loop and return immediately, so persistence overlaps
+    with the next update's fetch and analysis. Writes to the same document complete in
+    submission order; flush() waits for everything and reports failures at cycle end.
+    Failed document updates are handed to the reader's write-behind buffer and its
+    journal, so they are retried at flush and replayed by the next run, as with
+    write_behind; a failed report write is only logged.
+
+    Only BACKGROUND_WRITES run in the background. Reads (including paginated
+    streams), injection status changes, checkpoint events, post-processing jobs,
+    shard results and relevance samples are delegated to the wrapped synchronous
+    manager and block: they are either reads or writes that must be durable before
+    the caller moves on.
+    """
+
+    def __init__(self, reader, writer=None):
+        self.reader = reader
+        self.db = reader.db
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="firestore-async", daemon=True)
+        self._thread.start()
+        self._async = writer or AsyncFirebaseManager()
+        self._operations = []
+        self._tails = {}
+        self._lock = threading.Lock()
+        if writer is None and not asyncio.run_coroutine_threadsafe(self._async.connect(), self._loop).result():
+            logger.warning("Async Firestore client unavailable; background writes will be no-ops.")
+        if self.reader.db and self.reader.journal_path:
+            # Background writes that failed in an earlier run
+            self.reader._replay_journal()
+
+    def __getattr__(self, name):
+        return getattr(self.reader, name)
+
+    def _schedule(self, label, key, method, *args, track=True, update=None):
+        """
+        Schedules a write; track=False leaves reporting its outcome to the caller instead
+        of flush(). update is the write as a document update (its data), journaled if it fails.
+        """
+        async def ordered():
+            # Tasks start in submission order, so each one chains behind the previous
+            # write to the same document before its first await.
+            current = asyncio.current_task()
+            previous = self._tails.get(key)
+            self._tails[key] = current
+            try:
+                if previous is not None:
+                    # Only ordering matters here; the previous write reports its own error
+                    await asyncio.gather(previous, return_exceptions=True)
+                return await method(*args)
+            finally:
+                # The last write to a document drops its entry, so daemon runs do not accumulate keys
+                if self._tails.get(key) is current:
+                    del self._tails[key]
+
+        future = asyncio.run_coroutine_threadsafe(ordered(), self._loop)
+        if track:
+            with self._lock:
+                self._operations.append((label, key, update, future))
+        return future
+
+    def update_url_status(self, url_id, status_data):
+        self._schedule(
+            f"status {url_id}", ("monitored_urls", url_id), self._async.update_url_status, url_id, status_data,
+            update=status_data,
+        )
+
+    def update_url_hash(self, url_id, content_hash):
+        self._schedule(
+            f"hash {url_id}", ("monitored_urls", url_id), self._async.update_url_hash, url_id, content_hash,
+            update={"last_hash": content_hash},
+        )
+
+    def mark_manual_injection_processed(self, injection_id):
+        self._schedule(
+            f"injection {injection_id}", ("manual_injections", injection_id),
+            self._async.mark_manual_injection_processed, injection_id,
+            update={"status": "Processed", "processed_at": SERVER_TIMESTAMP},
+        )
+
+    def update_system_config(self, config_data):
+        self._schedule("system config", ("config", "system"), self._async.update_system_config, config_data)
+
+    def record_cycle_run(self):
+        self._schedule("cycle run", ("config", "system"), self._async.record_cycle_run)
+
+    def save_report(self, report_data, report_id=None, sections=None):
+        if not self.db:
+            return None
+        # The id is allocated locally so callers get it back without waiting for the write
+        report_id = report_id or self.reader.db.collection("intel_reports").document().id
+        self._schedule(
+            f"report {report_id}", ("intel_reports", report_id),
+            self._async.save_report, report_data, report_id, sections,
+        )
+        return report_id
+
+    def update_report(self, report_id, header_data, sections=None):
+        """
+        Waits for the patch and returns whether it landed (False on failure), like the
+        synchronous managers; it runs on post-processing workers, which retry on False.
+        """
+        # Same key as save_report, so the patch lands after the report it amends
+        future = self._schedule(
+            f"report update {report_id}", ("intel_reports", report_id),
+            self._async.update_report, report_id, header_data, sections, track=False,
+        )
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Error updating report {report_id} in Firestore: {e}")
+            return False
+
+    def flush(self):
+        """
+        Wait for all scheduled writes in submission order and log any failures. Failed
+        document updates are buffered and journaled on the reader, then retried with its flush.
+        """
+        with self._lock:
+            operations, self._operations = self._operations, []
+        failures = 0
+        for label, (collection, doc_id), update, future in operations:
+            try:
+                future.result()
+            except Exception as e:
+                failures += 1
+                logger.error(f"Background Firestore write failed ({label}): {e}")
+                if update is not None:
+                    self.reader._buffer_update(collection, doc_id, update)
+        if operations:
+            logger.info(f"Background persistence completed: {len(operations) - failures}/{len(operations)} writes succeeded.")
+        self.reader.flush()
+        return failures
@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import re
+from collections import Counter
+from urllib.parse import urldefrag, urljoin, urlparse
+
+logger = logging.getLogger("Backfill")
+
+ENTRY_HEADINGS = ("h1", "h2", "h3", "h4")
+NEXT_PAGE_PATTERN = re.compile(r"^(next|older|older posts|older entries|previous entries|load more)\b|^[»›]$", re.I)
+SKIPPED_LINK_SCHEMES = ("mailto:", "javascript:", "tel:")
+
+
+def entry_id(text: str) -> str:
+    """Id of a history entry (also its checkpoint key): hash of its whitespace-normalized text."""
+    normalized = " ".join(text.split())
+    return "bf-" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+def find_next_page(soup, url):
+    """Absolute URL of the page holding older entries (rel="next" or a Next/Older link), or None."""
+    link = soup.find(["a", "link"], rel="next", href=True)
+    if link is None:
+        for anchor in soup.find_all("a", href=True):
+            label = anchor.get_text(" ", strip=True) or anchor.get("aria-label") or ""
+            if NEXT_PAGE_PATTERN.match(label.strip()):
+                link = anchor
+                break
+    if link is None:
+        return None
+    next_url = urldefrag(urljoin(url, link["href"]))[0]
+    return next_url if next_url != urldefrag(url)[0] else None
+
+
+def segment_entries(soup, selector=None, max_chars=4000):
+    """
+    Splits a changelog page into entries at its most frequent heading level: each entry
+    is a heading with the text and links up to the next one. Pages without repeated
+    headings are cut into blocks of whole lines. Entries longer than max_chars are split.
+    """
+    from bs4 import Comment, NavigableString, Tag
+
+    roots = (soup.select(selector) if selector else None) or [soup.body or soup]
+    counts = Counter(tag.name for root in roots for tag in root.find_all(ENTRY_HEADINGS))
+    levels = [name for name in ENTRY_HEADINGS if counts[name] >= 2]
+    # Most frequent level wins; on a tie the higher level (listed first) does
+    level = max(levels, key=lambda name: counts[name]) if levels else None
+
+    entries = []
+    if level:
+        current = None
+        for root in roots:
+            for node in root.descendants:
+                if isinstance(node, Tag):
+                    if node.name == level:
+                        current = {"title": node.get_text(" ", strip=True), "lines": [], "links": []}
+                        entries.append(current)
+                    elif node.name == "a" and node.get("href") and current is not None:
+                        current["links"].append(node["href"])
+                elif isinstance(node, NavigableString) and not isinstance(node, Comment) and current is not None:
+                    text = node.strip()
+                    if text:
+                        current["lines"].append(text)
+    else:
+        lines = [line for root in roots for line in root.get_text("\n", strip=True).splitlines()]
+        links = [anchor["href"] for root in roots for anchor in root.find_all("a", href=True)]
+        entries.append({"title": "", "lines": lines, "links": links})
+
+    segmented = []
+    for entry in entries:
+        for part, text in enumerate(chunk_lines(entry["lines"], max_chars)):
+            title = entry["title"] if part == 0 else f"{entry['title']} (part {part + 1})".strip()
+            segmented.append({
+                "title": title,
+                # The first part starts with the heading itself; later parts repeat it
+                "text": text if part == 0 or not entry["title"] else f"{title}\n{text}",
+                "links": entry["links"] if part == 0 else [],
+            })
+    return segmented
+
+
+def chunk_lines(lines, max_chars):
+    """Joins lines into blocks of at most max_chars (a single longer line is cut)."""
+    block, size = [], 0
+    for line in lines:
+        line = line[:max_chars]
+        if block and size + len(line) + 1 > max_chars:
+            yield "\n".join(block)
+            block, size = [], 0
+        block.append(line)
+        size += len(line) + 1
+    if block:
+        yield "\n".join(block)
+
+
+def detail_links(entry, page_url, limit=2):
+    """Up to limit absolute links of an entry pointing at other pages (its sub-details)."""
+    links = []
+    page = urldefrag(page_url)[0]
+    for href in entry["links"]:
+        if href.startswith("#") or href.lower().startswith(SKIPPED_LINK_SCHEMES):
+            continue
+        link = urldefrag(urljoin(page_url, href))[0]
+        if urlparse(link).scheme not in ("http", "https") or link == page or link in links:
+            continue
+        links.append(link)
+        if len(links) >= limit:
+            break
+    return links
+
+
+def walk_pages(fetcher, source, max_pages=20, max_chars=4000):
+    """
+    Yields (url, text, entries) for a source's page and the older pages its pagination
+    links to, newest first, stopping at max_pages or a page already seen. text is what
+    a cycle hashes for the page.
+    """
+    url, seen = source['url'], set()
+    while url and url not in seen and len(seen) < max_pages:
+        seen.add(url)
+        soup = fetcher.fetch_soup(url)
+        if soup is None:
+            return
+        # Pagination usually lives in the navigation that page_text strips
+        next_url = find_next_page(soup, url)
+        text = fetcher.page_text(soup, source.get('selector'))
+        entries = segment_entries(soup, source.get('selector'), max_chars=max_chars)
+        logger.info(f"Backfill of {source['name']}: page {len(seen)} ({url}) has {len(entries)} entries.")
+        yield url, text, entries
+        url = next_url
+
+
+def entry_update(fetcher, source, page_url, entry, max_detail_links=2, detail_chars=1000):
+    """The update dict for one history entry, with the text of its sub-detail pages appended."""
+    content = entry["text"]
+    links = detail_links(entry, page_url, limit=max_detail_links)
+    for link in links:
+        text, _ = fetcher.fetch_url(link)
+        if text:
+            content += f"\n--- SUB-DETAIL FROM {link} ---\n{text[:detail_chars]}\n"
+    return {
+        # Unique per entry, so checkpointed analyses and alerts resume entry by entry
+        "id": entry_id(entry["text"]),
+        "source": source['name'],
+        "url": links[0] if links else page_url,
+        "content": content,
+        "category": source.get("category", "General"),
+        "scopes": source.get("scopes", []),
+        "impact_rate": source.get("impact_rate"),
+    }
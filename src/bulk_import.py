@@ -0,0 +1,115 @@
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+from src.ingestion import validate_injection
+
+logger = logging.getLogger("BulkImport")
+
+# Statuses an imported injection can be resumed from; Processed ones are duplicates
+RESUMABLE_STATUSES = ("Importing", "Pending")
+
+
+def injection_id(content: str) -> str:
+    """Document id of an imported injection: hash of its whitespace-normalized content."""
+    normalized = " ".join(content.split())
+    return "imp-" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+def read_records(path, fmt=None):
+    """Streams (line number, record) pairs from a JSONL or CSV file (source, content, priority columns)."""
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, "r", encoding="utf-8", newline="") as handle:
+        if fmt == "csv":
+            reader = csv.DictReader(handle)
+            # line_num is the record's last line when quoted content spans several
+            for record in reader:
+                yield reader.line_num, record
+            return
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, ValueError(f"invalid JSON: {e}")
+
+
+def iter_injections(path, fmt=None, default_priority="Low", stats=None):
+    """
+    Valid injections of an import file with their content-hash ids. Invalid rows are
+    logged and counted; repeated content within the file is dropped.
+    """
+    seen = set()
+    for line_number, record in read_records(path, fmt):
+        where = f"line {line_number}"
+        _bump(stats, "read")
+        if isinstance(record, Exception):
+            logger.warning(f"Skipping {where} of {path}: {record}")
+            _bump(stats, "invalid")
+            continue
+        injection, error = validate_injection(record, default_priority=default_priority)
+        if error:
+            logger.warning(f"Skipping {where} of {path}: {error}")
+            _bump(stats, "invalid")
+            continue
+        doc_id = injection_id(injection['content'])
+        if doc_id in seen:
+            _bump(stats, "duplicates")
+            continue
+        seen.add(doc_id)
+        yield {**injection, "id": doc_id, "imported_from": os.path.basename(path)}
+
+
+def _bump(stats, name):
+    if stats is not None:
+        stats.add(name)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class ImportProgress:
+    """Thread-safe counters for a bulk import, logged every few analyses and at the end."""
+
+    def __init__(self, log_every=10, clock=time.monotonic):
+        self.log_every = log_every
+        self.clock = clock
+        self.started = clock()
+        self.counts = {
+            "read": 0, "invalid": 0, "duplicates": 0, "written": 0, "resumed": 0,
+            "analyzed": 0, "alerts": 0, "failed": 0,
+        }
+        self._lock = threading.Lock()
+
+    def add(self, name, amount=1):
+        with self._lock:
+            self.counts[name] += amount
+            due = name in ("analyzed", "failed") and (self.counts["analyzed"] + self.counts["failed"]) % self.log_every == 0
+        if due:
+            self.log()
+
+    def log(self, final=False):
+        with self._lock:
+            counts = dict(self.counts)
+        elapsed = self.clock() - self.started
+        queued = counts["written"] + counts["resumed"]
+        done = counts["analyzed"] + counts["failed"]
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = f", ETA {(queued - done) / rate:.0f}s" if rate and queued > done and not final else ""
+        logger.info(
+            f"Import {'finished' if final else 'progress'}: {done}/{queued} analyzed ({counts['alerts']} alerts, "
+            f"{counts['failed']} failed); {counts['written']} new, {counts['resumed']} resumed, "
+            f"{counts['duplicates']} duplicates, {counts['invalid']} invalid; {rate:.2f}/s{eta}"
+        )
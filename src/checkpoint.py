@@ -0,0 +1,233 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+
+logger = logging.getLogger("Checkpoint")
+
+DEFAULT_CHECKPOINT_PATH = os.path.join("data", "cycle_checkpoint.jsonl")
+
+
+class LocalCheckpointStore:
+    """Append-only JSONL event log on local disk; each event is fsynced before the cycle moves on."""
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as handle:
+            data = handle.read()
+        intact = data.rfind(b"\n") + 1
+        if intact < len(data):
+            # A torn last line from a crash mid-write; everything before it is intact.
+            # It is cut off, or the next append would land on the unterminated line.
+            logger.warning("Dropping a truncated checkpoint entry.")
+            with open(self.path, "r+b") as handle:
+                handle.truncate(intact)
+        events = []
+        for line in data[:intact].splitlines():
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning("Ignoring an unreadable checkpoint entry.")
+        return events
+
+    def append(self, sequence, event):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(event) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class StorageCheckpointStore:
+    """Event log kept in the configured storage backend (Firestore or SQLite), so it survives a lost CI container."""
+
+    def __init__(self, storage, name="current"):
+        self.storage = storage
+        self.name = name
+
+    def load(self):
+        return self.storage.load_checkpoint_events(self.name)
+
+    def append(self, sequence, event):
+        self.storage.append_checkpoint_event(sequence, event, self.name)
+
+    def clear(self):
+        self.storage.clear_checkpoint_events(self.name)
+
+
+def update_key(update):
+    # Multi-profile cycles analyze and notify each update once per profile
+    prefix = f"{update['profile']}/" if update.get('profile') else ""
+    if update.get('is_manual_injection'):
+        return f"{prefix}injection:{update.get('id')}"
+    return f"{prefix}url:{update.get('id') or update.get('url')}"
+
+
+def content_hash(update):
+    """The fetched content hash; manual injections (which carry none) are hashed here."""
+    return update.get('new_hash') or hashlib.md5((update.get('content') or "").encode("utf-8")).hexdigest()
+
+
+class CycleCheckpoint:
+    """
+    Journal of one intelligence cycle: completed analyses (keyed by update and content
+    hash), pending and sent notifications with their alerts and report sections,
+    customer notes and the digest. An interrupted cycle leaves the journal open; the
+    next run resumes it, reusing analyses instead of calling the LLM again and not
+    re-sending notifications. The journal is cleared once the cycle completes.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.cycle_id = None
+        self.report_title = None
+        self.resumed = False
+        self._analyses = {}
+        self._pending = {}
+        self._notified = {}
+        self._notified_profile = {}
+        self._values = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def begin(self, report_title):
+        """Opens a new cycle, or resumes the interrupted one. Returns True when resuming."""
+        try:
+            events = self.store.load()
+        except Exception as e:
+            logger.error(f"Could not read cycle checkpoint, starting fresh: {e}")
+            events = []
+
+        if events and events[0].get("event") == "begin":
+            for event in events:
+                self._apply(event)
+            self._sequence = len(events)
+            self.resumed = True
+            logger.info(
+                f"Resuming interrupted cycle {self.cycle_id}: {len(self._analyses)} analyses and "
+                f"{len(self._notified)} of {len(self._pending)} notifications already completed."
+            )
+            return True
+
+        self._clear()
+        self._record({"event": "begin", "cycle_id": uuid.uuid4().hex[:20], "report_title": report_title})
+        return False
+
+    def _apply(self, event):
+        kind = event.get("event")
+        if kind == "begin":
+            self.cycle_id = event["cycle_id"]
+            self.report_title = event.get("report_title")
+        elif kind == "analysis":
+            self._analyses[(event["key"], event["hash"])] = event["analysis"]
+        elif kind == "pending":
+            self._pending[event["key"]] = (event["update"], event["analysis"], event["alert"])
+        elif kind == "notified":
+            self._notified[event["key"]] = (event["alert"], event["section"])
+            self._notified_profile[event["key"]] = event.get("profile")
+        elif kind == "value":
+            self._values[event["name"]] = event["value"]
+
+    def _record(self, event):
+        with self._lock:
+            try:
+                self.store.append(self._sequence, event)
+                self._sequence += 1
+            except Exception as e:
+                # Losing a checkpoint entry only costs a repeated step on resume
+                logger.error(f"Could not write cycle checkpoint ({event.get('event')}): {e}")
+            self._apply(event)
+
+    def _clear(self):
+        try:
+            self.store.clear()
+        except Exception as e:
+            logger.error(f"Could not clear cycle checkpoint: {e}")
+        self._sequence = 0
+
+    def cached_analysis(self, update):
+        with self._lock:
+            return self._analyses.get((update_key(update), content_hash(update)))
+
+    def record_analysis(self, update, analysis):
+        self._record({
+            "event": "analysis",
+            "key": update_key(update),
+            "hash": content_hash(update),
+            "analysis": analysis,
+        })
+
+    def record_pending(self, update, analysis, alert):
+        """Journals an alert before its update's hash is persisted, so it is not lost if notify never runs."""
+        fields = ("id", "source", "url", "category", "new_hash", "is_manual_injection", "profile")
+        self._record({
+            "event": "pending",
+            "key": update_key(update),
+            "update": {field: update[field] for field in fields if field in update},
+            "analysis": analysis,
+            "alert": alert,
+        })
+
+    def pending_notifications(self):
+        """(update, analysis, alert) entries whose notification had not gone out, in original order."""
+        with self._lock:
+            return [entry for key, entry in self._pending.items() if key not in self._notified]
+
+    def notified(self, update):
+        """(alert, section) if this update's notification already went out, else None."""
+        with self._lock:
+            return self._notified.get(update_key(update))
+
+    def record_notified(self, update, alert, section):
+        self._record({
+            "event": "notified",
+            "key": update_key(update),
+            "profile": update.get('profile'),
+            "alert": alert,
+            "section": section,
+        })
+
+    def completed_notifications(self, profile=None):
+        """Alerts and report sections of profile notified before an interruption, in their original order."""
+        with self._lock:
+            entries = [entry for key, entry in self._notified.items() if self._notified_profile.get(key) == profile]
+        return [alert for alert, _ in entries], [section for _, section in entries]
+
+    def get(self, name):
+        with self._lock:
+            return self._values.get(name)
+
+    def set(self, name, value):
+        self._record({"event": "value", "name": name, "value": value})
+
+    def complete(self):
+        self._clear()
+        self._analyses, self._pending, self._notified, self._values = {}, {}, {}, {}
+        self._notified_profile = {}
+
+
+def create_checkpoint(config, storage, name="current"):
+    """
+    The cycle checkpoint described by config 'checkpoint', or None when disabled.
+    Concurrent cycles (e.g. shards) need distinct names.
+    """
+    checkpoint_config = (config or {}).get('checkpoint') or {}
+    if not checkpoint_config.get('enabled'):
+        return None
+    if checkpoint_config.get('store', 'storage') == 'local':
+        path = checkpoint_config.get('path') or DEFAULT_CHECKPOINT_PATH
+        if name != "current":
+            root, extension = os.path.splitext(path)
+            path = f"{root}.{name}{extension}"
+        return CycleCheckpoint(LocalCheckpointStore(path))
+    return CycleCheckpoint(StorageCheckpointStore(storage, name))
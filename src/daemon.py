@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import yaml
+
+from src.source_loader import DEFAULT_SOURCES_PATH, load_default_sources
+
+logger = logging.getLogger("Daemon")
+
+# Config keys each warm client is built from; a client is rebuilt only when these change.
+# Storage and the fetcher's HTTP session live for the whole process.
+CLIENT_CONFIG_KEYS = {
+    "storage": (),
+    "fetcher": (),
+    "analyzer": ("llm_provider", "llm_model", "allow_pollinations_fallback", "llm_structured_output",
+                 "llm_cascade", "llm_hedging", "llm_timeout_seconds"),
+    "notifier": ("notifications",),
+}
+
+
+class WatchedFile:
+    """Caches a parsed file and re-reads it only when its mtime changes."""
+
+    def __init__(self, path, loader):
+        self.path = path
+        self.loader = loader
+        self.mtime = None
+        self.value = None
+        self.version = 0
+
+    def get(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            if self.value is None:
+                raise
+            logger.error(f"Cannot stat {self.path}, keeping the last loaded version: {e}")
+            return self.value
+        if mtime != self.mtime:
+            try:
+                self.value = self.loader(self.path)
+            except Exception as e:
+                if self.value is None:
+                    raise
+                # A half-saved or invalid edit must not take a running daemon down
+                logger.error(f"Reload of {self.path} failed, keeping the last loaded version: {e}")
+                return self.value
+            if self.mtime is not None:
+                logger.info(f"Reloaded {self.path}.")
+            self.mtime = mtime
+            self.version += 1
+        return self.value
+
+
+def _load_yaml(path):
+    with open(path, "r", encoding="utf-8") as handle:
+        return yaml.safe_load(handle) or {}
+
+
+class IntelligenceDaemon:
+    """
+    Long-running process that keeps storage, HTTP session, LLM and notifier clients
+    warm across cycles. config.yaml and sources.yaml are re-read only when their mtime
+    changes, and a client is rebuilt only when its own config blocks changed. Cycles
+    run one at a time, from the schedule or the local control endpoint.
+    """
+
+    def __init__(self, cycle_fn, build_clients, config_path="config.yaml", sources_path=DEFAULT_SOURCES_PATH):
+        # cycle_fn(config, clients, default_sources, is_manual); build_clients(config, kind) -> client
+        self.cycle_fn = cycle_fn
+        self.build_clients = build_clients
+        self.config_file = WatchedFile(config_path, _load_yaml)
+        self.sources_file = WatchedFile(sources_path, load_default_sources)
+        self.clients = {}
+        self._client_config = {}
+        self._cycle_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self.status = {
+            "running": False,
+            "cycles": 0,
+            "last_started": None,
+            "last_finished": None,
+            "last_duration_seconds": None,
+            "last_error": None,
+        }
+        self.server = None
+
+    def refresh(self):
+        """Reloads changed files and rebuilds only the clients whose config changed."""
+        with self._refresh_lock:
+            config = self.config_file.get()
+            for kind, keys in CLIENT_CONFIG_KEYS.items():
+                relevant = {key: config.get(key) for key in keys}
+                if kind not in self.clients or self._client_config.get(kind) != relevant:
+                    if kind in self.clients:
+                        logger.info(f"Configuration for {kind} changed; rebuilding client.")
+                    self.clients[kind] = self.build_clients(config, kind)
+                    self._client_config[kind] = relevant
+            return config, self.sources_file.get()
+
+    def run_cycle(self, is_manual=None):
+        """Runs one cycle unless one is already in progress; returns False if skipped."""
+        if not self._cycle_lock.acquire(blocking=False):
+            logger.info("A cycle is already running; trigger ignored.")
+            return False
+        started = time.time()
+        with self._state_lock:
+            self.status.update(running=True, last_started=started)
+        error = None
+        try:
+            config, sources = self.refresh()
+            self.cycle_fn(config, dict(self.clients), sources, is_manual)
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Intelligence cycle failed: {e}")
+        finally:
+            finished = time.time()
+            with self._state_lock:
+                self.status.update(
+                    running=False,
+                    cycles=self.status["cycles"] + 1,
+                    last_finished=finished,
+                    last_duration_seconds=round(finished - started, 3),
+                    last_error=error,
+                )
+            self._cycle_lock.release()
+        return True
+
+    def trigger(self, is_manual=None, wait=False):
+        """Starts a cycle in the background (or inline when wait); False if one is already running."""
+        if wait:
+            return self.run_cycle(is_manual)
+        if self._cycle_lock.locked():
+            return False
+        threading.Thread(target=self.run_cycle, args=(is_manual,), name="intel-cycle", daemon=True).start()
+        return True
+
+    def snapshot(self):
+        with self._state_lock:
+            return {
+                **self.status,
+                "config_version": self.config_file.version,
+                "sources_version": self.sources_file.version,
+            }
+
+    def start_control_server(self, host="127.0.0.1", port=8765, token=None):
+        """Serves the local control endpoint in a background thread."""
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self, token))
+        threading.Thread(target=self.server.serve_forever, name="intel-control", daemon=True).start()
+        logger.info(f"Control endpoint listening on http://{host}:{self.server.server_address[1]}")
+        return self.server
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def _make_handler(daemon, token):
+    class ControlHandler(BaseHTTPRequestHandler):
+        """GET /status, POST /cycle[?manual=1&wait=1], POST /reload."""
+
+        def _reply(self, code, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _authorized(self):
+            if token and self.headers.get("X-Control-Token") != token:
+                self._reply(401, {"error": "unauthorized"})
+                return False
+            return True
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            if urlparse(self.path).path == "/status":
+                self._reply(200, daemon.snapshot())
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+
+            def flag(name):
+                return params.get(name, ["0"])[0].lower() in ("1", "true", "yes")
+
+            if url.path == "/cycle":
+                is_manual = flag("manual") or None
+                if flag("wait"):
+                    started = daemon.trigger(is_manual=is_manual, wait=True)
+                    self._reply(200 if started else 409, daemon.snapshot())
+                elif daemon.trigger(is_manual=is_manual):
+                    self._reply(202, {"accepted": True})
+                else:
+                    self._reply(409, {"accepted": False, "error": "cycle already running"})
+            elif url.path == "/reload":
+                try:
+                    daemon.refresh()
+                    self._reply(200, daemon.snapshot())
+                except Exception as e:
+                    self._reply(500, {"error": str(e)})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def log_message(self, format, *args):
+            logger.info("Control request: " + format % args)
+
+    return ControlHandler
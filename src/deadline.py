@@ -0,0 +1,104 @@
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("Deadline")
+
+
+class Deadline:
+    """
+    Wall-clock limit for one cycle. Work (fetches, LLM calls, rate-limit sleeps) stops
+    reserve_seconds before the hard end, which is kept for flushing partial results:
+    the report, hashes and digest. cancel() ends the work phase early (e.g. on SIGTERM).
+    Without seconds the deadline never expires unless cancelled.
+    """
+
+    def __init__(self, seconds=None, reserve_seconds=0.0, clock=time.monotonic):
+        self.clock = clock
+        self.end = None if seconds is None else clock() + float(seconds)
+        self.reserve_seconds = float(reserve_seconds)
+        self._cancelled = threading.Event()
+
+    def remaining(self, final=False):
+        """Seconds left for work (or until the hard end when final); None when unlimited."""
+        if self.end is None:
+            return None
+        return self.end - self.clock() - (0.0 if final else self.reserve_seconds)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return self.cancelled or (remaining is not None and remaining <= 0)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def timeout(self, default, final=False, minimum=1.0):
+        """A request timeout: default, shortened to the time left (never below minimum)."""
+        remaining = self.remaining(final)
+        if remaining is None:
+            return default
+        return max(min(default, remaining), minimum)
+
+    def sleep(self, seconds) -> bool:
+        """Sleeps up to seconds, waking early on expiry or cancel; False if the deadline expired."""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, max(remaining, 0.0))
+        if seconds > 0:
+            self._cancelled.wait(seconds)
+        return not self.expired()
+
+    @contextmanager
+    def bound_to(self, *clients):
+        """Sets this deadline on clients (fetcher, analyzer) for the duration of a cycle."""
+        previous = [getattr(client, "deadline", None) for client in clients]
+        for client in clients:
+            client.deadline = self
+        try:
+            yield self
+        finally:
+            for client, deadline in zip(clients, previous):
+                client.deadline = deadline
+
+    @contextmanager
+    def cancel_on_signals(self, signals=(signal.SIGTERM, signal.SIGINT)):
+        """
+        Turns SIGTERM/SIGINT (CI timeout or cancel) into a cooperative cancel, so the
+        cycle stops starting new work and still flushes what it has. Main thread only.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            yield self
+            return
+
+        def handle(signum, frame):
+            if self.cancelled:
+                # Second signal: give up on the graceful path
+                raise KeyboardInterrupt
+            logger.warning(f"Received signal {signum}; cancelling remaining work and flushing partial results.")
+            self.cancel()
+
+        previous = {signum: signal.signal(signum, handle) for signum in signals}
+        try:
+            yield self
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+
+def create_deadline(config):
+    """
+    The cycle deadline from config 'cycle_deadline'; INTEL_CYCLE_DEADLINE_SECONDS
+    overrides max_seconds. Unlimited when neither is set.
+    """
+    deadline_config = (config or {}).get('cycle_deadline') or {}
+    seconds = os.getenv("INTEL_CYCLE_DEADLINE_SECONDS") or deadline_config.get('max_seconds')
+    if not seconds:
+        return Deadline()
+    return Deadline(float(seconds), reserve_seconds=deadline_config.get('reserve_seconds', 0))
@@ -1,47 +1,123 @@
 import requests
-from bs4 import BeautifulSoup
 import logging
 import hashlib
 
 import json
 import os
+import threading
+import time
+from collections import Counter
+
+from src.deadline import Deadline
+from src.source_health import classify_error
 
 logger = logging.getLogger("Fetcher")
 
+
+def page_key(source):
+    return source['url'], source.get('selector')
+
+
+class PageShare:
+    """
+    Per-cycle cache for pages that several sources point at: each distinct page is
+    fetched and fingerprinted once. An entry is dropped as soon as the last source
+    using it has been checked, and pages used by a single source are never held.
+    """
+
+    def __init__(self, sources):
+        self.remaining = Counter(page_key(source) for source in sources)
+        self.pages = {}
+        self.hits = 0
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, load):
+        with self._lock:
+            shared = self.remaining.get(key, 0) > 1 or key in self.pages
+            if shared:
+                key_lock = self._locks.setdefault(key, threading.Lock())
+        if not shared:
+            return load()
+
+        # Sources sharing a page wait for the first fetch instead of repeating it
+        with key_lock:
+            with self._lock:
+                page = self.pages.get(key)
+                if page is not None:
+                    self.hits += 1
+            if page is None:
+                page = load()
+            with self._lock:
+                self.remaining[key] -= 1
+                if self.remaining[key] > 0:
+                    self.pages[key] = page
+                else:
+                    self.pages.pop(key, None)
+                    self._locks.pop(key, None)
+        return page
+
+
 class Fetcher:
     def __init__(self):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        # One pooled session: keep-alive connections are reused across sources and cycles
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=20, pool_maxsize=20)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.timeout_seconds = 15
+        # Replaced per cycle (Deadline.bound_to): fetches stop when the cycle runs out of time
+        self.deadline = Deadline()
 
     def get_content_hash(self, content):
         return hashlib.md5(content.encode('utf-8')).hexdigest()
 
     def fetch_url(self, url, selector=None):
+        soup = self.fetch_soup(url)
+        if soup is None:
+            return None, None
+        return self.page_text(soup, selector), soup
+
+    def fetch_soup(self, url):
+        """
+        The parsed page without scripts and styles, or None on failure. Navigation is
+        kept (page_text strips it), so callers can still follow pagination links.
+        """
+        return self._fetch_soup(url)[0]
+
+    def _fetch_soup(self, url):
+        """(soup, None), or (None, error) on failure; error is None when the deadline stopped the fetch."""
+        if self.deadline.expired():
+            logger.info(f"Cycle deadline reached; not fetching {url}")
+            return None, None
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = self.session.get(url, headers=self.headers, timeout=self.deadline.timeout(self.timeout_seconds))
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "meta", "noscript", "header", "footer", "nav"]):
-                script.extract()
-
-            if selector:
-                elements = soup.select(selector)
-                if elements:
-                    text = "\n".join([el.get_text(separator=' ', strip=True) for el in elements])
-                else:
-                    text = soup.get_text(separator='\n', strip=True)
-            else:
-                text = soup.get_text(separator='\n', strip=True)
-            
-            return text, soup
-            
         except requests.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
-            return None, None
+            return None, e
+        # bs4 loads on the first fetch, keeping it off the startup path
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(response.text, 'html.parser')
+        # Remove script and style elements
+        for script in soup(["script", "style", "meta", "noscript"]):
+            script.extract()
+        return soup, None
+
+    def page_text(self, soup, selector=None):
+        """The page's text without header, footer and navigation (removed from soup)."""
+        for element in soup(["header", "footer", "nav"]):
+            element.extract()
+
+        if selector:
+            elements = soup.select(selector)
+            if elements:
+                return "\n".join([el.get_text(separator=' ', strip=True) for el in elements])
+        return soup.get_text(separator='\n', strip=True)
 
     def fetch_deep_content(self, url, base_soup):
         """
@@ -74,7 +150,7 @@ class Fetcher:
         return deep_text
 
 
-    def check_sources(self, sources_config, force=False):
+    def check_sources(self, sources_config, force=False, pages=None, health=None):
         """
         Iterates through sources and returns those that have changed using hash comparison.
         If force is True, hash comparison is bypassed.
@@ -83,38 +159,76 @@ class Fetcher:
         updates = []
         
         for source in sources_config:
-            logger.info(f"Checking source: {source['name']}")
-            content, soup = self.fetch_url(source['url'], source.get('selector'))
-            
-            if content:
-                hash_text = content[:5000] # Use a stable prefix for hashing
-                current_hash = self.get_content_hash(hash_text)
-                previous_hash = source.get('last_hash')
-                
-                if force or current_hash != previous_hash:
-                    if force:
-                        logger.info(f"Force fetch active fully for: {source['name']}")
-                    else:
-                        logger.info(f"New content detected for: {source['name']}")
-                    
-                    # For new content, we perform a deep fetch to get better context
-                    context_content = content
-                    if soup:
-                        deep_text = self.fetch_deep_content(source['url'], soup)
-                        context_content += deep_text
-
-                    updates.append({
-                        "id": source.get("id"),
-                        "source": source['name'],
-                        "url": source['url'],
-                        "content": context_content,
-                        "category": source.get("category", "General"),
-                        "scopes": source.get("scopes", []),
-                        "new_hash": current_hash # Return the new hash to be saved by the controller
-                    })
-                else:
-                    logger.info(f"No changes for: {source['name']}")
+            update = self.check_source(source, force=force, pages=pages, health=health)
+            if update:
+                updates.append(update)
             
         return updates
 
+    def _load_page(self, source):
+        """The fetched page with its timing and error class; a failed fetch is a page without content too."""
+        started = time.monotonic()
+        soup, error = self._fetch_soup(source['url'])
+        content = self.page_text(soup, source.get('selector')) if soup is not None else None
+        page = {
+            "content": content,
+            "soup": soup,
+            "hash": None,
+            "deep_text": None,
+            "lock": threading.Lock(),
+            # Health bookkeeping; a fetch skipped by the deadline says nothing about the source
+            "fetched": soup is not None or error is not None,
+            "elapsed": time.monotonic() - started,
+            "error": None if content else (classify_error(error) if error is not None else "empty"),
+            "message": str(error) if error is not None else None,
+        }
+        if content:
+            page["hash"] = self.get_content_hash(content[:5000]) # Use a stable prefix for hashing
+        return page
+
+    def check_source(self, source, force=False, pages=None, health=None):
+        """
+        Fetches one source; returns its update dict if the content changed (or force), else None.
+        With pages (a PageShare), sources pointing at the same page share one fetch.
+        With health (a SourceHealthTracker), the fetch's latency or error is recorded.
+        """
+        logger.info(f"Checking source: {source['name']}")
+        if pages is not None:
+            page = pages.get(page_key(source), lambda: self._load_page(source))
+        else:
+            page = self._load_page(source)
 
+        if health is not None and page["fetched"]:
+            health.record(source, page["elapsed"], page["error"], page["message"])
+        if not page["content"]:
+            return None
+
+        content = page["content"]
+        current_hash = page["hash"]
+        previous_hash = source.get('last_hash')
+        
+        if not (force or current_hash != previous_hash):
+            logger.info(f"No changes for: {source['name']}")
+            return None
+
+        if force:
+            logger.info(f"Force fetch active fully for: {source['name']}")
+        else:
+            logger.info(f"New content detected for: {source['name']}")
+        
+        # For new content, we perform a deep fetch to get better context (once per shared page)
+        with page["lock"]:
+            if page["deep_text"] is None:
+                page["deep_text"] = self.fetch_deep_content(source['url'], page["soup"]) if page["soup"] else ""
+        context_content = content + page["deep_text"]
+
+        return {
+            "id": source.get("id"),
+            "source": source['name'],
+            "url": source['url'],
+            "content": context_content,
+            "category": source.get("category", "General"),
+            "scopes": source.get("scopes", []),
+            "impact_rate": source.get("impact_rate"),
+            "new_hash": current_hash # Return the new hash to be saved by the controller
+        }
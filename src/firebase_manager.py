@@ -1,68 +1,295 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import atexit
+import hashlib
+import json
 import os
 import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from src.report_utils import REPORT_FORMAT, assemble_sections, section_document_id
+
 logger = logging.getLogger("FirebaseManager")
 
+# Firestore WriteBatch limit
+MAX_BATCH_WRITES = 500
+DEFAULT_WRITE_JOURNAL = os.path.join("data", "pending_writes.jsonl")
+# Fields of monitored_urls documents used by the intelligence cycle
+MONITORED_URL_FIELDS = ["name", "url", "category", "scopes", "selector", "last_hash", "impact_rate", "health"]
+DEFAULT_PAGE_SIZE = 50
+_SERVER_TIMESTAMP_MARKER = {"__server_timestamp__": True}
+
+
+class _ServerTimestamp:
+    """Backend-neutral server timestamp placeholder, resolved by each backend at write time."""
+
+    def __repr__(self):
+        return "SERVER_TIMESTAMP"
+
+
+SERVER_TIMESTAMP = _ServerTimestamp()
+
+
+def _firestore():
+    """firebase_admin.firestore, imported on first use: it loads the whole Google Cloud client stack."""
+    from firebase_admin import firestore
+    return firestore
+
+
+def _is_server_timestamp(value) -> bool:
+    if value is SERVER_TIMESTAMP:
+        return True
+    # Firestore's own sentinel can only exist once its module has been loaded
+    firestore = sys.modules.get("firebase_admin.firestore")
+    return firestore is not None and value is firestore.SERVER_TIMESTAMP
+
+
+def _to_firestore_values(data):
+    firestore = _firestore()
+    return {
+        key: firestore.SERVER_TIMESTAMP if value is SERVER_TIMESTAMP else value
+        for key, value in data.items()
+    }
+
+
+def _encode_journal_value(value):
+    if _is_server_timestamp(value):
+        return _SERVER_TIMESTAMP_MARKER
+    if isinstance(value, dict):
+        return {key: _encode_journal_value(item) for key, item in value.items()}
+    return value
+
+
+def _decode_journal_value(value):
+    if value == _SERVER_TIMESTAMP_MARKER:
+        return SERVER_TIMESTAMP
+    if isinstance(value, dict):
+        return {key: _decode_journal_value(item) for key, item in value.items()}
+    return value
+
+
+def _journal_line(collection, doc_id, data):
+    return json.dumps({
+        "collection": collection,
+        "doc_id": doc_id,
+        "data": _encode_journal_value(data),
+    }, default=str) + "\n"
+
+
+def _is_missing_document(error) -> bool:
+    # google.api_core.exceptions.NotFound, matched by name so the SDK stays a lazy import
+    return type(error).__name__ == "NotFound"
+
+
+def initialize_firebase_app() -> bool:
+    """Initializes the default firebase_admin app once per process; True when credentials exist."""
+    import firebase_admin
+    from firebase_admin import credentials
+
+    # Avoid re-initializing if already done
+    if firebase_admin._apps:
+        return True
+    try:
+        # 1. GitHub Actions: FIREBASE_SERVICE_ACCOUNT_JSON is a full JSON string
+        sa_json = os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON")
+        if sa_json:
+            sa_dict = json.loads(sa_json)
+            cred = credentials.Certificate(sa_dict)
+            firebase_admin.initialize_app(cred)
+            logger.info("Firebase initialized from JSON env variable.")
+            return True
+
+        # 2. Local dev: serviceAccountKey.json file
+        sa_path = "serviceAccountKey.json"
+        if os.path.exists(sa_path):
+            cred = credentials.Certificate(sa_path)
+            firebase_admin.initialize_app(cred)
+            logger.info("Firebase initialized from serviceAccountKey.json file.")
+            return True
+
+        logger.warning("No Firebase credentials found. Firestore features will be disabled.")
+    except Exception as e:
+        logger.error(f"Failed to initialize Firebase: {e}")
+    return False
+
+
 class FirebaseManager:
-    def __init__(self):
+    _shared_instance = None
+
+    def __init__(self, write_behind=False, max_pending_writes=200, max_write_age_seconds=30,
+                 journal_path=DEFAULT_WRITE_JOURNAL):
+        """
+        write_behind: buffer per-document updates (status, hash, injection state), merge
+        writes to the same document and flush them in WriteBatch chunks of up to 500.
+        Buffered writes are journaled locally so a crashed cycle replays them on the next start.
+        """
         self.db = None
+        self.write_behind = write_behind
+        self.max_pending_writes = max_pending_writes
+        self.max_write_age_seconds = max_write_age_seconds
+        self.journal_path = journal_path
+        self._pending = {}
+        self._pending_since = None
+        # After a flush that left updates uncommitted, size/age thresholds wait until this time
+        self._retry_after = 0.0
+        self._write_lock = threading.RLock()
+        self._url_snapshot = {}
+        self.snapshot_version = 0
         self._initialize()
 
+        if self.db and self.write_behind:
+            self._replay_journal()
+            atexit.register(self.flush)
+
     def _initialize(self):
-        # Avoid re-initializing if already done
-        if firebase_admin._apps:
-            self.db = firestore.client()
-            return
-        try:
-            # 1. GitHub Actions: FIREBASE_SERVICE_ACCOUNT_JSON is a full JSON string
-            sa_json = os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON")
-            if sa_json:
-                import json
-                sa_dict = json.loads(sa_json)
-                cred = credentials.Certificate(sa_dict)
-                firebase_admin.initialize_app(cred)
-                self.db = firestore.client()
-                logger.info("Firebase initialized from JSON env variable.")
-                return
+        if initialize_firebase_app():
+            self.db = _firestore().client()
 
-            # 2. Local dev: serviceAccountKey.json file
-            sa_path = "serviceAccountKey.json"
-            if os.path.exists(sa_path):
-                cred = credentials.Certificate(sa_path)
-                firebase_admin.initialize_app(cred)
-                self.db = firestore.client()
-                logger.info("Firebase initialized from serviceAccountKey.json file.")
-                return
+    @classmethod
+    def shared(cls, **kwargs):
+        """
+        Process-wide instance, so long-running processes keep one client and snapshot.
+        It keeps the options it was created with; later calls asking for others get a warning.
+        """
+        # Looked up on the concrete class so each backend keeps its own instance
+        if cls.__dict__.get("_shared_instance") is None:
+            cls._shared_instance = cls(**kwargs)
+            cls._shared_options = kwargs
+        elif kwargs != cls._shared_options:
+            changed = sorted(key for key in {**kwargs, **cls._shared_options}
+                             if kwargs.get(key) != cls._shared_options.get(key))
+            logger.warning(
+                f"{cls.__name__}.shared() already created; ignoring changed options {', '.join(changed)} "
+                "until the process restarts."
+            )
+        return cls._shared_instance
 
-            logger.warning("No Firebase credentials found. Firestore features will be disabled.")
-        except Exception as e:
-            logger.error(f"Failed to initialize Firebase: {e}")
+    @staticmethod
+    def _url_from_doc(doc_id, data):
+        return {
+            "id": doc_id,
+            "name": data.get("name"),
+            "url": data.get("url"),
+            "category": data.get("category", "General"),
+            "scopes": data.get("scopes", []), # Added scopes support
+            "selector": data.get("selector"),
+            "last_hash": data.get("last_hash"),
+            "impact_rate": data.get("impact_rate"),
+            "health": data.get("health"),
+        }
 
     def get_monitored_urls(self):
         if not self.db:
             return []
         
         try:
-            docs = self.db.collection("monitored_urls").stream()
-            urls = []
-            for doc in docs:
-                data = doc.to_dict()
-                urls.append({
-                    "id": doc.id,
-                    "name": data.get("name"),
-                    "url": data.get("url"),
-                    "category": data.get("category", "General"),
-                    "scopes": data.get("scopes", []), # Added scopes support
-                    "last_hash": data.get("last_hash")
-                })
-            return urls
+            return list(self.iter_monitored_urls())
         except Exception as e:
             logger.error(f"Error fetching URLs from Firestore: {e}")
             return []
 
+    def iter_monitored_urls(self, page_size=DEFAULT_PAGE_SIZE):
+        """Yields monitored URLs page by page (document id order), holding one page at a time."""
+        if not self.db:
+            return
+        # Projection: only the fields the cycle needs come over the wire
+        query = self.db.collection("monitored_urls").select(MONITORED_URL_FIELDS).order_by("__name__")
+        for doc in self._paginate(query, page_size):
+            yield self._url_from_doc(doc.id, doc.to_dict())
+
+    @staticmethod
+    def _paginate(query, page_size, limit=None, first_page=None):
+        """
+        Streams query results with limit/start_after cursors. The cursor is the last
+        document snapshot, so documents that leave the result set mid-iteration (e.g.
+        injections marked processed) do not shift later pages.
+        """
+        page_size = max(int(page_size), 1)
+        yielded = 0
+        cursor = None
+        page = first_page
+        while limit is None or yielded < limit:
+            if page is None:
+                size = page_size if limit is None else min(page_size, limit - yielded)
+                paged = query.start_after(cursor) if cursor is not None else query
+                page = list(paged.limit(size).stream())
+                requested = size
+            else:
+                requested = page_size
+            for doc in page:
+                if limit is not None and yielded >= limit:
+                    return
+                yielded += 1
+                yield doc
+            if len(page) < requested:
+                return
+            cursor = page[-1]
+            page = None
+
+    def refresh_monitored_urls(self):
+        """
+        Returns monitored URLs from a versioned local snapshot. The first call reads the
+        projected collection; later calls list only document names/update times and
+        re-read the documents that changed (or appeared) since the previous refresh.
+        """
+        if not self.db:
+            return []
+        try:
+            collection = self.db.collection("monitored_urls")
+            if not self._url_snapshot:
+                for doc in collection.select(MONITORED_URL_FIELDS).stream():
+                    self._url_snapshot[doc.id] = (doc.update_time, self._url_from_doc(doc.id, doc.to_dict()))
+                self.snapshot_version += 1
+                logger.info(f"Loaded snapshot v{self.snapshot_version} with {len(self._url_snapshot)} monitored URLs.")
+                return [entry for _, entry in self._url_snapshot.values()]
+
+            # Name-only listing: no field data is transferred
+            current = {doc.id: doc.update_time for doc in collection.select(["__name__"]).stream()}
+            removed = [doc_id for doc_id in self._url_snapshot if doc_id not in current]
+            changed = [
+                doc_id for doc_id, update_time in current.items()
+                if doc_id not in self._url_snapshot or self._url_snapshot[doc_id][0] != update_time
+            ]
+            for doc_id in removed:
+                del self._url_snapshot[doc_id]
+            if changed:
+                refs = [collection.document(doc_id) for doc_id in changed]
+                for doc in self.db.get_all(refs, field_paths=MONITORED_URL_FIELDS):
+                    if doc.exists:
+                        self._url_snapshot[doc.id] = (doc.update_time, self._url_from_doc(doc.id, doc.to_dict()))
+            if changed or removed:
+                self.snapshot_version += 1
+            logger.info(
+                f"Snapshot v{self.snapshot_version}: re-read {len(changed)} changed, "
+                f"dropped {len(removed)} removed monitored URLs."
+            )
+            return [entry for _, entry in self._url_snapshot.values()]
+        except Exception as e:
+            logger.error(f"Error refreshing URL snapshot from Firestore: {e}")
+            self._url_snapshot = {}
+            return self.get_monitored_urls()
+
+    def bootstrap_cycle(self, injection_page_size=DEFAULT_PAGE_SIZE, max_injections=None):
+        """
+        Fetches everything a cycle needs to start (system config, monitored URLs,
+        first page of pending manual injections) concurrently instead of three
+        sequential reads. "manual_injections" is a generator that continues paging
+        lazily, capped at max_injections per cycle.
+        """
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="firestore-bootstrap") as executor:
+            system_config = executor.submit(self.get_system_config)
+            monitored_urls = executor.submit(self.refresh_monitored_urls)
+            first_page = executor.submit(self._first_injection_page, injection_page_size, max_injections)
+            return {
+                "system_config": system_config.result(),
+                "monitored_urls": monitored_urls.result(),
+                "manual_injections": self.iter_manual_injections(
+                    page_size=injection_page_size, limit=max_injections, first_page=first_page.result()
+                ),
+            }
+
     def get_system_config(self):
         """Fetches the global system configuration."""
         if not self.db:
@@ -92,6 +319,10 @@ class FirebaseManager:
         if not self.db:
             return
         
+        if self.write_behind:
+            self._buffer_update("monitored_urls", url_id, status_data)
+            return
+
         try:
             self.db.collection("monitored_urls").document(url_id).update(status_data)
             logger.info(f"Updated Firestore status for {url_id}")
@@ -102,6 +333,9 @@ class FirebaseManager:
         """Updates the content hash for a specific monitored URL to detect changes."""
         if not self.db:
             return
+        if self.write_behind:
+            self._buffer_update("monitored_urls", url_id, {"last_hash": content_hash})
+            return
         try:
             self.db.collection("monitored_urls").document(url_id).update({
                 "last_hash": content_hash
@@ -110,52 +344,469 @@ class FirebaseManager:
         except Exception as e:
             logger.error(f"Error updating URL hash in Firestore: {e}")
 
-    def get_manual_injections(self):
-        """Fetches pending manual content injections that haven't been processed yet."""
+    def get_manual_injections(self, limit=None):
+        """Fetches pending manual content injections that haven't been processed yet (oldest first)."""
+        return list(self.iter_manual_injections(limit=limit))
+
+    def _pending_injections_query(self):
+        # FIFO: the dashboard stamps every injection with its creation time.
+        # Requires the (status, timestamp) composite index in firestore.indexes.json.
+        return (
+            self.db.collection("manual_injections")
+            .where("status", "==", "Pending")
+            .order_by("timestamp")
+        )
+
+    def _first_injection_page(self, page_size=DEFAULT_PAGE_SIZE, limit=None):
         if not self.db:
             return []
+        size = page_size if limit is None else min(page_size, limit)
+        if size <= 0:
+            return []
         try:
-            docs = self.db.collection("manual_injections").where("status", "==", "Pending").stream()
-            results = []
-            for doc in docs:
+            return list(self._pending_injections_query().limit(size).stream())
+        except Exception as e:
+            logger.error(f"Error fetching manual injections: {e}")
+            return []
+
+    def iter_manual_injections(self, page_size=DEFAULT_PAGE_SIZE, limit=None, first_page=None):
+        """
+        Yields pending manual injections oldest first, one page at a time, stopping after
+        limit items. Anything left over stays Pending and is picked up first next cycle.
+        """
+        if not self.db or (limit is not None and limit <= 0):
+            return
+        try:
+            pages = self._paginate(self._pending_injections_query(), page_size, limit, first_page)
+            for doc in pages:
                 data = doc.to_dict()
-                results.append({
+                yield {
                     "id": doc.id,
                     "source": data.get("source"),
-                    "content": data.get("content")
-                })
-            return results
+                    "content": data.get("content"),
+                    "priority": data.get("priority"),
+                }
         except Exception as e:
             logger.error(f"Error fetching manual injections: {e}")
-            return []
+
+    def add_manual_injection(self, source, content, priority=None, status="Pending"):
+        """Creates a manual injection (same fields as the dashboard's inject form); returns its id."""
+        if not self.db:
+            return None
+        try:
+            doc_ref = self.db.collection("manual_injections").document()
+            doc_ref.set({
+                "source": source,
+                "content": content,
+                "priority": priority,
+                "status": status,
+                "timestamp": _firestore().SERVER_TIMESTAMP,
+            })
+            return doc_ref.id
+        except Exception as e:
+            logger.error(f"Error adding manual injection: {e}")
+            return None
+
+    def add_manual_injections(self, injections, status="Pending"):
+        """
+        Batch-writes injections under their own "id" (e.g. a content hash, see
+        src.bulk_import); returns how many were written before any failure.
+        """
+        if not self.db:
+            return 0
+        written = 0
+        try:
+            collection = self.db.collection("manual_injections")
+            for start in range(0, len(injections), MAX_BATCH_WRITES):
+                chunk = injections[start:start + MAX_BATCH_WRITES]
+                batch = self.db.batch()
+                for injection in chunk:
+                    data = {key: value for key, value in injection.items() if key != "id"}
+                    batch.set(collection.document(injection["id"]), {
+                        **data, "status": status, "timestamp": _firestore().SERVER_TIMESTAMP,
+                    })
+                batch.commit()
+                written += len(chunk)
+        except Exception as e:
+            logger.error(f"Error batch-writing manual injections: {e}")
+        return written
+
+    def get_manual_injection_statuses(self, injection_ids):
+        """{id: status} for those of injection_ids that exist; one batched read."""
+        if not self.db or not injection_ids:
+            return {}
+        try:
+            refs = [self.db.collection("manual_injections").document(doc_id) for doc_id in injection_ids]
+            return {doc.id: doc.get("status") for doc in self.db.get_all(refs, field_paths=["status"]) if doc.exists}
+        except Exception as e:
+            logger.error(f"Error reading manual injection statuses: {e}")
+            return {}
+
+    def set_manual_injection_status(self, injection_id, status):
+        """Sets an injection's status right away (not write-behind), e.g. back to Pending after a failure."""
+        if not self.db:
+            return
+        try:
+            self.db.collection("manual_injections").document(injection_id).update({"status": status})
+        except Exception as e:
+            logger.error(f"Error updating manual injection status: {e}")
+
+    def requeue_manual_injections(self, status, older_than=None):
+        """
+        Sets the injections in status (e.g. Ingesting) back to Pending; with older_than
+        only those created before it. Returns how many were requeued.
+        """
+        if not self.db:
+            return 0
+        try:
+            docs = self.db.collection("manual_injections").where("status", "==", status).stream()
+            refs = [
+                doc.reference for doc in docs
+                if older_than is None or (doc.get("timestamp") is not None and doc.get("timestamp") < older_than)
+            ]
+            for start in range(0, len(refs), MAX_BATCH_WRITES):
+                batch = self.db.batch()
+                for ref in refs[start:start + MAX_BATCH_WRITES]:
+                    batch.update(ref, {"status": "Pending"})
+                batch.commit()
+            return len(refs)
+        except Exception as e:
+            logger.error(f"Error requeueing {status} manual injections: {e}")
+            return 0
 
     def mark_manual_injection_processed(self, injection_id):
         """Marks a manual injection as processed and sets a timestamp."""
         if not self.db:
             return
+        if self.write_behind:
+            self._buffer_update("manual_injections", injection_id, {
+                "status": "Processed",
+                "processed_at": SERVER_TIMESTAMP
+            })
+            return
         try:
             self.db.collection("manual_injections").document(injection_id).update({
                 "status": "Processed",
-                "processed_at": firestore.SERVER_TIMESTAMP
+                "processed_at": _firestore().SERVER_TIMESTAMP
             })
             logger.info(f"Marked manual injection {injection_id} as processed.")
         except Exception as e:
             logger.error(f"Error updating manual injection status: {e}")
 
+    def _buffer_update(self, collection, doc_id, data):
+        """Merge an update into the write-behind buffer and flush on size/age thresholds."""
+        with self._write_lock:
+            key = (collection, doc_id)
+            self._pending[key] = {**self._pending.get(key, {}), **data}
+            if self._pending_since is None:
+                self._pending_since = time.monotonic()
+            self._append_journal(collection, doc_id, data)
+
+            too_many = len(self._pending) >= self.max_pending_writes
+            too_old = time.monotonic() - self._pending_since >= self.max_write_age_seconds
+            retry_due = time.monotonic() >= self._retry_after
+        if (too_many or too_old) and retry_due:
+            self.flush()
+
+    def flush(self):
+        """
+        Commit all buffered updates in WriteBatch chunks. Safe to call repeatedly.
+        Updates that failed for any reason but a missing document are buffered again
+        and stay journaled for the next flush (or the next run).
+        """
+        with self._write_lock:
+            if not self._pending or not self.db:
+                return
+            pending = list(self._pending.items())
+            self._pending = {}
+            self._pending_since = None
+
+            written, failed = 0, []
+            for start in range(0, len(pending), MAX_BATCH_WRITES):
+                chunk = pending[start:start + MAX_BATCH_WRITES]
+                chunk_written, chunk_failed = self._commit_chunk(chunk)
+                written += chunk_written
+                failed.extend(chunk_failed)
+
+            for key, data in failed:
+                # Writes buffered since the flush started are newer and win
+                self._pending[key] = {**data, **self._pending.get(key, {})}
+            if self._pending and self._pending_since is None:
+                self._pending_since = time.monotonic()
+            # During an outage every buffered update would trigger another failing flush
+            self._retry_after = time.monotonic() + self.max_write_age_seconds if failed else 0.0
+            # The journal now holds exactly what is still uncommitted
+            self._rewrite_journal()
+            logger.info(f"Flushed {written}/{len(pending)} buffered Firestore document updates.")
+            if failed:
+                logger.warning(f"{len(failed)} document updates could not be written; kept for the next flush.")
+
+    def _commit_chunk(self, chunk):
+        """Returns (written count, [(key, data)] to retry); updates of missing documents are dropped."""
+        try:
+            batch = self.db.batch()
+            for (collection, doc_id), data in chunk:
+                batch.update(self.db.collection(collection).document(doc_id), _to_firestore_values(data))
+            batch.commit()
+            return len(chunk), []
+        except Exception as e:
+            # A single missing document fails the whole batch; retry one by one so
+            # the remaining updates still land.
+            logger.warning(f"Batch commit failed ({e}); retrying {len(chunk)} updates individually.")
+
+        written, failed = 0, []
+        for (collection, doc_id), data in chunk:
+            try:
+                self.db.collection(collection).document(doc_id).update(_to_firestore_values(data))
+                written += 1
+            except Exception as e:
+                logger.error(f"Error updating {collection}/{doc_id} in Firestore: {e}")
+                if not _is_missing_document(e):
+                    failed.append(((collection, doc_id), data))
+        return written, failed
+
+    def _append_journal(self, collection, doc_id, data):
+        if not self.journal_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as handle:
+                handle.write(_journal_line(collection, doc_id, data))
+        except OSError as e:
+            logger.warning(f"Could not journal buffered write for {collection}/{doc_id}: {e}")
+
+    def _rewrite_journal(self):
+        """Replaces the journal with the still-buffered updates (removes it when there are none)."""
+        if not self.journal_path:
+            return
+        try:
+            if not self._pending:
+                if os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
+                return
+            temporary = f"{self.journal_path}.tmp"
+            with open(temporary, "w", encoding="utf-8") as handle:
+                for (collection, doc_id), data in self._pending.items():
+                    handle.write(_journal_line(collection, doc_id, data))
+            os.replace(temporary, self.journal_path)
+        except OSError as e:
+            logger.warning(f"Could not rewrite write journal {self.journal_path}: {e}")
+
+    def _replay_journal(self):
+        """Re-buffer writes journaled by a cycle that crashed before flushing, then flush them."""
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return
+        replayed = 0
+        with self._write_lock:
+            with open(self.journal_path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a torn final line from a hard kill
+                    key = (entry["collection"], entry["doc_id"])
+                    self._pending[key] = {**self._pending.get(key, {}), **_decode_journal_value(entry["data"])}
+                    replayed += 1
+        if replayed:
+            logger.info(f"Replaying {replayed} journaled Firestore writes from an interrupted cycle.")
+            self.flush()
+
+    def _checkpoint_events(self, name):
+        return self.db.collection("cycle_checkpoints").document(name).collection("events")
+
+    def load_checkpoint_events(self, name="current"):
+        """Events of the open cycle checkpoint, in write order (raises if unreadable)."""
+        if not self.db:
+            return []
+        return [doc.to_dict() for doc in self._checkpoint_events(name).order_by("__name__").stream()]
+
+    def append_checkpoint_event(self, sequence, event, name="current"):
+        # Written synchronously (not write-behind): the entry must be durable before the cycle moves on
+        if self.db:
+            self._checkpoint_events(name).document(f"{sequence:06d}").set(event)
+
+    def clear_checkpoint_events(self, name="current"):
+        if self.db:
+            self._delete_collection(self._checkpoint_events(name))
+
+    def _delete_collection(self, collection):
+        refs = [doc.reference for doc in collection.select(["__name__"]).stream()]
+        for start in range(0, len(refs), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for ref in refs[start:start + MAX_BATCH_WRITES]:
+                batch.delete(ref)
+            batch.commit()
+
+    def _post_processing_job(self, key):
+        # Job keys contain ':' and arbitrary ids; the document id is their hash
+        return self.db.collection("post_processing_jobs").document(hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def load_post_processing_jobs(self):
+        """Jobs of the post-processing queue snapshot (see src.post_processing; raises if unreadable)."""
+        if not self.db:
+            return []
+        return [doc.to_dict() for doc in self.db.collection("post_processing_jobs").stream()]
+
+    def save_post_processing_jobs(self, jobs):
+        """Upserts queue jobs by key; written synchronously, at the end of a run."""
+        if not self.db:
+            return
+        for start in range(0, len(jobs), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for job in jobs[start:start + MAX_BATCH_WRITES]:
+                batch.set(self._post_processing_job(job["key"]), job)
+            batch.commit()
+
+    def delete_post_processing_jobs(self, keys):
+        if not self.db:
+            return
+        for start in range(0, len(keys), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for key in keys[start:start + MAX_BATCH_WRITES]:
+                batch.delete(self._post_processing_job(key))
+            batch.commit()
+
+    def save_relevance_sample(self, sample_id, sample):
+        """Stores one LLM verdict for the local relevance model (see src.relevance); the id dedupes repeats."""
+        if not self.db:
+            return
+        try:
+            self.db.collection("relevance_samples").document(sample_id).set(sample)
+        except Exception as e:
+            logger.error(f"Error saving relevance sample: {e}")
+
+    def load_relevance_samples(self):
+        if not self.db:
+            return []
+        return [doc.to_dict() for doc in self.db.collection("relevance_samples").stream()]
+
+    def _shard_results(self, run_id):
+        return self.db.collection("cycle_shards").document(run_id).collection("results")
+
+    def save_shard_result(self, run_id, shard_index, result):
+        """Stores one shard's alert set for the merge step (see src.sharding)."""
+        if self.db:
+            self._shard_results(run_id).document(f"{shard_index:04d}").set(result)
+
+    def load_shard_results(self, run_id):
+        if not self.db:
+            return []
+        return [doc.to_dict() for doc in self._shard_results(run_id).order_by("__name__").stream()]
+
+    def clear_shard_results(self, run_id):
+        if self.db:
+            self._delete_collection(self._shard_results(run_id))
+
     def record_cycle_run(self):
         """Record the latest intelligence cycle timestamp for dashboard workflow cards."""
-        self.update_system_config({"last_run": firestore.SERVER_TIMESTAMP})
+        self.update_system_config({"last_run": _firestore().SERVER_TIMESTAMP})
 
-    def save_report(self, report_data):
+    def save_report(self, report_data, report_id=None, sections=None):
+        """
+        Saves a report header and returns its id (auto-generated unless report_id is given).
+        sections (see report_utils.build_report_sections) go to the intel_reports/{id}/sections
+        subcollection and are committed before the header, so readers never see a partial report.
+        """
         if not self.db:
             return
         
         try:
-            # report_data should be a dict with name, content, timestamp, etc.
-            self.db.collection("intel_reports").add({
-                **report_data,
-                "timestamp": firestore.SERVER_TIMESTAMP
-            })
-            logger.info("Intelligence report saved to Firestore.")
+            report_ref = self.db.collection("intel_reports").document(report_id)
+            writes = [
+                (report_ref.collection("sections").document(section_document_id(section)), section)
+                for section in sections or []
+            ]
+            writes.append((report_ref, {**report_data, "timestamp": _firestore().SERVER_TIMESTAMP}))
+            for start in range(0, len(writes), MAX_BATCH_WRITES):
+                batch = self.db.batch()
+                for ref, data in writes[start:start + MAX_BATCH_WRITES]:
+                    batch.set(ref, data)
+                batch.commit()
+            logger.info(f"Intelligence report saved to Firestore ({len(writes) - 1} section documents).")
+            return report_ref.id
         except Exception as e:
             logger.error(f"Error saving report to Firestore: {e}")
+
+    def update_report(self, report_id, header_data, sections=None):
+        """
+        Patches a saved report: adds sections (e.g. customer notes produced after the
+        report was saved) and merges header_data into the header, which is written last.
+        """
+        if not self.db:
+            return None
+        try:
+            report_ref = self.db.collection("intel_reports").document(report_id)
+            writes = [
+                (report_ref.collection("sections").document(section_document_id(section)), section, False)
+                for section in sections or []
+            ]
+            writes.append((report_ref, header_data, True))
+            for start in range(0, len(writes), MAX_BATCH_WRITES):
+                batch = self.db.batch()
+                for ref, data, merge in writes[start:start + MAX_BATCH_WRITES]:
+                    batch.set(ref, data, merge=merge)
+                batch.commit()
+            logger.info(f"Report {report_id} updated ({len(writes) - 1} section documents added).")
+            return True
+        except Exception as e:
+            logger.error(f"Error updating report {report_id} in Firestore: {e}")
+            return False
+
+    def get_report(self, report_id):
+        """Fetches a report header (no section bodies)."""
+        if not self.db:
+            return None
+        try:
+            doc = self.db.collection("intel_reports").document(report_id).get()
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            logger.error(f"Error fetching report {report_id}: {e}")
+            return None
+
+    def _section_documents(self, report_id, kind=None, index=None):
+        query = self.db.collection("intel_reports").document(report_id).collection("sections")
+        if kind is not None:
+            query = query.where("kind", "==", kind)
+        if index is not None:
+            query = query.where("index", "==", index)
+        for doc in query.order_by("__name__").stream():
+            yield doc.to_dict()
+
+    def iter_report_sections(self, report_id, kind=None):
+        """Lazily yields (index, kind, markdown) for a report's sections, decompressing one at a time."""
+        if not self.db:
+            return
+        try:
+            yield from assemble_sections(self._section_documents(report_id, kind=kind))
+        except Exception as e:
+            logger.error(f"Error reading sections of report {report_id}: {e}")
+
+    def get_report_section(self, report_id, index):
+        """Fetches and decompresses a single section; None if it does not exist."""
+        if not self.db:
+            return None
+        try:
+            for _, _, text in assemble_sections(self._section_documents(report_id, index=index)):
+                return text
+        except Exception as e:
+            logger.error(f"Error reading section {index} of report {report_id}: {e}")
+        return None
+
+    def load_report_content(self, report_id):
+        """
+        Reassembles a report as (markdown, customer_content). Reports saved before
+        sectioned storage keep their bodies on the header and are returned as-is.
+        """
+        header = self.get_report(report_id)
+        if header is None:
+            return None, None
+        if header.get("format") != REPORT_FORMAT:
+            return header.get("content", ""), header.get("customer_content", "")
+        markdown = header.get("title", "")
+        customer_content = ""
+        for _, kind, text in self.iter_report_sections(report_id):
+            if kind == "customer":
+                customer_content = text
+            else:
+                markdown += text
+        return markdown, customer_content
@@ -0,0 +1,179 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger("Ingestion")
+
+PRIORITIES = ("High", "Medium", "Low")
+DEFAULT_MAX_CONTENT_BYTES = 1_000_000
+
+
+class IngestionBusy(Exception):
+    """Raised when every worker is busy and the pending lane is full."""
+
+
+def validate_injection(payload, default_priority="High"):
+    """(injection, None) for a valid submission, else (None, error message)."""
+    if not isinstance(payload, dict):
+        return None, "body must be a JSON object"
+    source, content = payload.get('source'), payload.get('content')
+    if not isinstance(source, str) or not source.strip():
+        return None, "'source' is required"
+    if not isinstance(content, str) or not content.strip():
+        return None, "'content' is required"
+    priority = payload.get('priority') or default_priority
+    if priority not in PRIORITIES:
+        return None, f"'priority' must be one of {', '.join(PRIORITIES)}"
+    return {"source": source.strip(), "content": content, "priority": priority}, None
+
+
+class IngestionService:
+    """
+    Local HTTP endpoint for manual injections that should not wait for the next
+    scheduled cycle. process(injection) runs one injection through the cycle's scope,
+    analysis and status path and returns a JSON-serializable result. Submissions run
+    on a bounded worker pool: at most workers at a time plus max_pending waiting;
+    beyond that the endpoint answers 503 so callers back off.
+    """
+
+    def __init__(self, process, workers=2, max_pending=8, token=None, max_content_bytes=DEFAULT_MAX_CONTENT_BYTES,
+                 request_timeout=180.0):
+        self.process = process
+        self.token = token
+        self.max_content_bytes = max_content_bytes
+        self.request_timeout = request_timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingestion")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self.stats = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0}
+        self.server = None
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def submit(self, injection):
+        """Schedules an injection; raises IngestionBusy when the pool and its pending lane are full."""
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise IngestionBusy("ingestion workers are busy")
+        self._count("accepted")
+        try:
+            return self.executor.submit(self._run, injection)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _run(self, injection):
+        try:
+            result = self.process(injection)
+            self._count("completed")
+            return result
+        except Exception as e:
+            self._count("failed")
+            logger.error(f"Ingestion of {injection['source']} failed: {e}")
+            raise
+        finally:
+            self._slots.release()
+
+    def start(self, host="127.0.0.1", port=8766):
+        """Serves the ingestion endpoint in a background thread."""
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        threading.Thread(target=self.server.serve_forever, name="intel-ingestion", daemon=True).start()
+        logger.info(f"Ingestion endpoint listening on http://{host}:{self.server.server_address[1]}/injections")
+        return self.server
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.executor.shutdown(wait=True)
+
+
+def _make_handler(service):
+    class IngestionHandler(BaseHTTPRequestHandler):
+        """POST /injections[?wait=0] with {"source", "content", "priority"}; GET /status."""
+
+        def _reply(self, code, body):
+            payload = json.dumps(body, default=str).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _authorized(self):
+            if service.token and self.headers.get("X-Control-Token") != service.token:
+                self._reply(401, {"error": "unauthorized"})
+                return False
+            return True
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            if urlparse(self.path).path == "/status":
+                with service._lock:
+                    self._reply(200, dict(service.stats))
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            url = urlparse(self.path)
+            if url.path != "/injections":
+                self._reply(404, {"error": "not found"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > service.max_content_bytes:
+                self._reply(413, {"error": f"body larger than {service.max_content_bytes} bytes"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length) or b"null")
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                self._reply(400, {"error": "body must be valid JSON"})
+                return
+            injection, error = validate_injection(payload)
+            if error:
+                self._reply(400, {"error": error})
+                return
+
+            try:
+                future = service.submit(injection)
+            except IngestionBusy as e:
+                self._reply(503, {"error": str(e)})
+                return
+            if parse_qs(url.query).get("wait", ["1"])[0].lower() in ("0", "false", "no"):
+                self._reply(202, {"accepted": True})
+                return
+            try:
+                self._reply(200, future.result(timeout=service.request_timeout))
+            except FutureTimeout:
+                # The analysis keeps running; its result lands in storage and Slack as usual
+                self._reply(504, {"error": "analysis still running", "accepted": True})
+            except Exception as e:
+                self._reply(500, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            logger.info("Ingestion request: " + format % args)
+
+    return IngestionHandler
+
+
+def create_ingestion_service(config, process, token=None):
+    """The ingestion service described by config 'ingestion' (not yet listening), or None when disabled."""
+    ingestion_config = (config or {}).get('ingestion') or {}
+    if not ingestion_config.get('enabled'):
+        return None
+    return IngestionService(
+        process,
+        workers=ingestion_config.get('workers', 2),
+        max_pending=ingestion_config.get('max_pending', 8),
+        token=token,
+        max_content_bytes=ingestion_config.get('max_content_bytes', DEFAULT_MAX_CONTENT_BYTES),
+        request_timeout=ingestion_config.get('request_timeout_seconds', 180),
+    )
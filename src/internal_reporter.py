@@ -1,7 +1,10 @@
 import logging
 import os
-from jinja2 import Environment, FileSystemLoader
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.json_utils import parse_llm_json
 from src.llm_analyzer import LLMAnalyzer
+from src.notes_utils import NotesAccumulator, iter_note_chunks, structure_notes_locally
 
 logger = logging.getLogger("InternalReporter")
 
@@ -10,17 +13,34 @@ class InternalReporter:
         self.config = config
         self.analyzer = LLMAnalyzer(config) # Reuse LLM logic
         self.template_dir = "templates"
+        # jinja2 is only needed by the reporter job, not by every import of this module
+        from jinja2 import Environment, FileSystemLoader
         self.env = Environment(loader=FileSystemLoader(self.template_dir))
 
+        reporter_config = config.get('reporter') or {}
+        self.chunk_chars = int(reporter_config.get('chunk_chars', 6000))
+        self.max_workers = max(int(reporter_config.get('max_workers', 4)), 1)
+        self.max_items = int(reporter_config.get('max_items_per_section', 50))
+
     def generate_report(self, raw_notes):
         """
         Takes raw text notes and returns a polished HTML report.
         """
+        return self._generate_from_lines(raw_notes.splitlines())
+
+    def generate_report_from_file(self, notes_path):
+        """
+        Streams a notes file line by line so memory stays bounded regardless of file size.
+        """
+        with open(notes_path, "r", encoding="utf-8") as f:
+            return self._generate_from_lines(f)
+
+    def _generate_from_lines(self, lines):
         logger.info("Generating internal report from raw notes...")
-        
-        # 1. Use LLM to structure the data
-        structured_data = self._process_notes_with_llm(raw_notes)
-        
+
+        # 1. Use LLM to structure the data, chunk by chunk
+        structured_data = self._process_notes_with_llm(lines)
+
         if not structured_data:
             logger.error("Failed to process notes with LLM.")
             return "<p>Error generating report.</p>"
@@ -39,30 +59,100 @@ class InternalReporter:
             logger.error(f"Template rendering failed: {e}")
             return "<p>Error rendering report template.</p>"
 
-    def _process_notes_with_llm(self, notes):
+    def _process_notes_with_llm(self, lines):
+        """
+        Structures the notes in bounded chunks (in parallel), merges and deduplicates
+        the items locally, then asks the LLM for a single executive summary.
+        """
+        accumulator = NotesAccumulator(max_items=self.max_items)
+        chunk_count = 0
+
+        # Keep at most 2x max_workers chunks in flight and merge in submission order,
+        # so memory does not grow with the size of the notes file.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = deque()
+            for chunk in iter_note_chunks(lines, self.chunk_chars):
+                chunk_count += 1
+                in_flight.append(executor.submit(self._structure_chunk, chunk))
+                if len(in_flight) >= self.max_workers * 2:
+                    accumulator.add(in_flight.popleft().result())
+            while in_flight:
+                accumulator.add(in_flight.popleft().result())
+
+        if chunk_count == 0:
+            logger.warning("No note content to process.")
+            return None
+
+        logger.info(
+            f"Structured {chunk_count} note chunk(s) into {accumulator.total_items()} unique items "
+            f"({accumulator.dropped} dropped over the {self.max_items}-item section limit)."
+        )
+
+        structured = dict(accumulator.sections)
+        structured['executive_summary'] = self._summarize_sections(accumulator.sections)
+        return structured
+
+    def _structure_chunk(self, chunk):
         prompt = f"""
         You are an Executive Assistant for the Logiwa Integration Team.
         Process the following raw engineering notes into a structured JSON for a Weekly Report.
-        
+
         RAW NOTES:
-        {notes}
-        
+        {chunk}
+
         Task:
-        1. Write a professional 'executive_summary' (2-3 sentences).
-        2. Categorize items into 'completed', 'in_progress', and 'risks'.
-        3. Polish the language of each item to be business-professional.
-        
+        1. Categorize items into 'completed', 'in_progress', and 'risks'.
+        2. Polish the language of each item to be business-professional.
+
         Output JSON format:
         {{
-            "executive_summary": "...",
             "completed": ["Item 1", "Item 2"],
             "in_progress": ["Item 3"],
             "risks": ["Risk 1"]
         }}
         """
-        
+        result = self._call_llm_json(prompt)
+        if not isinstance(result, dict):
+            logger.warning("LLM structuring failed for a notes chunk; using keyword fallback.")
+            return structure_notes_locally(chunk)
+        return result
+
+    def _summarize_sections(self, sections):
+        completed = sections.get('completed', [])
+        in_progress = sections.get('in_progress', [])
+        risks = sections.get('risks', [])
+        bullet = lambda items: "\n".join(f"- {item}" for item in items) or "- None"
+
+        prompt = f"""
+        You are an Executive Assistant for the Logiwa Integration Team.
+        Write a professional 'executive_summary' (2-3 sentences) for this week's report.
+
+        COMPLETED:
+        {bullet(completed)}
+
+        IN PROGRESS:
+        {bullet(in_progress)}
+
+        RISKS:
+        {bullet(risks)}
+
+        Output JSON format:
+        {{
+            "executive_summary": "..."
+        }}
+        """
+        result = self._call_llm_json(prompt)
+        if isinstance(result, dict) and result.get('executive_summary'):
+            return result['executive_summary']
+
+        logger.warning("Executive summary generation failed; using a counts-based summary.")
+        return (
+            f"This week the team completed {len(completed)} item(s), has {len(in_progress)} "
+            f"item(s) in progress and is tracking {len(risks)} risk(s)."
+        )
+
+    def _call_llm_json(self, prompt):
         # Reusing the analyzer's provider logic for simplicity, though we might want a dedicated method in LLMAnalyzer
-        # Here we duplicate the calling logic slightly for the specific prompt.
         try:
             if not self.analyzer.client:
                 return None
@@ -80,9 +170,8 @@ class InternalReporter:
                 response = model.generate_content(prompt)
                 response_text = response.text
 
-            import json
-            return json.loads(response_text)
-            
+            return parse_llm_json(response_text)
+
         except Exception as e:
             logger.error(f"LLM Processing of notes failed: {e}")
             return None
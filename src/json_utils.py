@@ -0,0 +1,161 @@
+import json
+import re
+
+MAX_SCAN_CHARS = 200_000
+
+_FENCE_PATTERN = re.compile(r"```[a-zA-Z]*")
+_SMART_DOUBLE_QUOTES = "“”„‟″"
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove markdown code fences (```json ... ```) and stray bold markers."""
+    return _FENCE_PATTERN.sub("", text).replace("***", "")
+
+
+def iter_json_candidates(text: str, max_chars: int = MAX_SCAN_CHARS):
+    """
+    Yield top-level balanced {...} spans in order, in a single linear pass.
+    Braces inside JSON strings (including escaped quotes) are ignored.
+    """
+    text = text[:max_chars]
+    depth = 0
+    start = -1
+    in_string = False
+    escaped = False
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            # Quotes outside an object are prose, not JSON strings
+            in_string = depth > 0
+        elif char == "{":
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield text[start:index + 1]
+
+
+def extract_json_object(text: str, max_chars: int = MAX_SCAN_CHARS):
+    """Return the first complete balanced {...} span in text, or None."""
+    for candidate in iter_json_candidates(text or "", max_chars):
+        return candidate
+    return None
+
+
+def normalize_smart_quotes(text: str) -> str:
+    """
+    Replace typographic double quotes used as JSON string delimiters with ASCII quotes.
+    Smart quotes that appear inside a properly quoted string are kept as content.
+    """
+    out = []
+    in_string = False
+    opened_by_smart = False
+    escaped = False
+
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"' or (opened_by_smart and char in _SMART_DOUBLE_QUOTES):
+                in_string = False
+                char = '"'
+            out.append(char)
+            continue
+
+        if char == '"' or char in _SMART_DOUBLE_QUOTES:
+            in_string = True
+            opened_by_smart = char != '"'
+            char = '"'
+        out.append(char)
+    return "".join(out)
+
+
+def remove_trailing_commas(text: str) -> str:
+    """Drop commas that directly precede a closing } or ] (outside strings)."""
+    out = []
+    pending_comma = None
+    in_string = False
+    escaped = False
+
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            out.append(char)
+            continue
+
+        if pending_comma is not None:
+            if char.isspace():
+                pending_comma.append(char)
+                continue
+            if char not in "}]":
+                out.append(",")
+            out.extend(pending_comma)
+            pending_comma = None
+
+        if char == ",":
+            pending_comma = []
+            continue
+        if char == '"':
+            in_string = True
+        out.append(char)
+
+    if pending_comma is not None:
+        out.append(",")
+        out.extend(pending_comma)
+    return "".join(out)
+
+
+def repair_json_text(text: str) -> str:
+    """Apply local fixes for common LLM JSON defects."""
+    return remove_trailing_commas(normalize_smart_quotes(strip_code_fences(text)))
+
+
+def _loads_object(candidate: str):
+    try:
+        value = json.loads(candidate)
+    except (json.JSONDecodeError, ValueError):
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def parse_llm_json(text: str, max_chars: int = MAX_SCAN_CHARS):
+    """
+    Extract and decode the first valid JSON object from an LLM reply.
+    Tries the reply as-is first, then a locally repaired copy. Returns a dict or None.
+    """
+    if not text:
+        return None
+
+    for candidate in iter_json_candidates(text, max_chars):
+        result = _loads_object(candidate)
+        if result is not None:
+            return result
+
+    # Repair from the first brace on so quotes in leading prose cannot shift string state
+    start = text.find("{")
+    if start < 0:
+        return None
+    repaired = repair_json_text(text[start:start + max_chars])
+    for candidate in iter_json_candidates(repaired, max_chars):
+        result = _loads_object(candidate)
+        if result is not None:
+            return result
+    return None
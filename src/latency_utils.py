@@ -0,0 +1,41 @@
+import math
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """Thread-safe rolling window of call latencies (seconds) with percentile lookups."""
+
+    def __init__(self, window: int = 100):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(float(seconds))
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+    def samples(self) -> list:
+        """The recorded samples, oldest first."""
+        with self._lock:
+            return list(self._samples)
+
+    def percentile(self, pct: float, default=None):
+        """Nearest-rank percentile (pct in 0-100) of the recorded samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return default
+        pct = min(max(float(pct), 0.0), 100.0)
+        rank = max(math.ceil(pct / 100.0 * len(samples)), 1)
+        return samples[rank - 1]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+        }
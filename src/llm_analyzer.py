@@ -1,36 +1,230 @@
 import logging
 import os
-from openai import OpenAI
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import requests
-import google.generativeai as genai
+from src.analysis_schema import (
+    ANALYSIS_SCHEMA,
+    TRIAGE_SCHEMA,
+    gemini_response_schema,
+    openai_response_format,
+    validate_analysis,
+    validate_triage,
+)
+from src.deadline import Deadline
+from src.json_utils import parse_llm_json
+from src.latency_utils import LatencyTracker
 
 logger = logging.getLogger("LLMAnalyzer")
 
+
+def _openai_client(api_key):
+    # Provider SDKs take most of the import time, so they load on first use
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+def _gemini_client(api_key):
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai
+
+
+class HedgedCallError(Exception):
+    """A failed hedged call; hedge_tried tells whether the hedge tier was called as well."""
+
+    def __init__(self, error, hedge_tried):
+        super().__init__(str(error))
+        self.hedge_tried = hedge_tried
+
+
+# A schema rejection names the structured-output parameter it rejects...
+SCHEMA_FIELDS = ("response_format", "response_schema", "json_schema", "response_mime_type")
+# ...and says why; unrelated "not supported" errors (model, region, feature) name no such field
+SCHEMA_REJECTIONS = ("not supported", "unsupported", "does not support", "unknown field", "invalid")
+
+
+def _is_schema_rejection(error) -> bool:
+    """True when a provider error says the model does not support schema-constrained output."""
+    text = str(error).lower()
+    if not any(field in text for field in SCHEMA_FIELDS):
+        return False
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return status == 400 or any(reason in text for reason in SCHEMA_REJECTIONS)
+
+
+# Characters of an update's text the analysis prompt includes; triage sees the same by default
+ANALYSIS_MAX_CHARS = 6000
+
+# Default cascade triage model per llm_provider
+TRIAGE_MODELS = {"gemini": "gemini-1.5-flash-8b-latest", "openai": "gpt-4o-mini"}
+MODEL_PREFIXES = {"gemini": ("gemini",), "openai": ("gpt-", "chatgpt-", "o1", "o3", "o4")}
+
+
+def triage_model_for(provider, configured=None):
+    """
+    The cascade triage model: the configured one unless it evidently belongs to another
+    provider (then, with a warning, the provider's default from TRIAGE_MODELS).
+    """
+    default = TRIAGE_MODELS.get(provider)
+    if not configured:
+        return default
+    owner = next((name for name, prefixes in MODEL_PREFIXES.items() if configured.lower().startswith(prefixes)), None)
+    if owner not in (None, provider) and default:
+        logger.warning(
+            f"llm_cascade.triage_model {configured} is a {owner} model but llm_provider is {provider}; "
+            f"triaging with {default} instead."
+        )
+        return default
+    return configured
+
+
 class LLMAnalyzer:
     def __init__(self, config):
         self.provider = config.get('llm_provider', 'openai')
         self.model = config.get('llm_model', 'gpt-4-turbo-preview')
         self.allow_pollinations_fallback = config.get('allow_pollinations_fallback', False)
+        # Ask providers for schema-constrained JSON; free-text JSON remains the fallback
+        self.structured_output = config.get('llm_structured_output', True)
+        self._structured_unsupported = set()
+        self.parse_stats = {}
+        # Per-request timeout; the cycle deadline (bound per cycle) shortens it when time runs out
+        self.timeout_seconds = float(config.get('llm_timeout_seconds', 90))
+        self.deadline = Deadline()
+
+        # Optional hedging: when a tier is slower than its usual latency percentile,
+        # race the same prompt against the next healthy tier.
+        hedging = config.get('llm_hedging') or {}
+        self.hedging_enabled = bool(hedging.get('enabled', False))
+        self.hedge_percentile = float(hedging.get('latency_percentile', 90))
+        self.hedge_min_samples = int(hedging.get('min_samples', 5))
+        self.hedge_default_delay = float(hedging.get('default_delay_seconds', 20))
+        self.hedge_unhealthy_cooldown = float(hedging.get('unhealthy_cooldown_seconds', 300))
+        self.tier_latency = {}
+        self.hedge_stats = {}
+        self._unhealthy_until = {}
+        self._stats_lock = threading.Lock()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-hedge")
+
+        # Optional two-stage cascade: a small model triages, the configured model analyzes
+        cascade = config.get('llm_cascade') or {}
+        self.cascade_enabled = bool(cascade.get('enabled', False))
+        self.triage_model = triage_model_for(self.provider, cascade.get('triage_model'))
+        self.triage_max_chars = int(cascade.get('triage_max_chars', ANALYSIS_MAX_CHARS))
+        self.cascade_min_negative_confidence = float(cascade.get('min_negative_confidence', 0.7))
+        self.cascade_stats = {"triaged": 0, "escalated": 0, "triage_failures": 0}
+        self.stage_latency = {"triage": LatencyTracker(), "analysis": LatencyTracker()}
         
+        # The SDK client is built on first access to self.client (see below)
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._api_key = None
         if self.provider == 'openai':
-            api_key = os.getenv("OPENAI_API_KEY")
-            if api_key:
-                self.client = OpenAI(api_key=api_key)
-            else:
+            self._api_key = os.getenv("OPENAI_API_KEY")
+            if not self._api_key:
                 logger.error("No OpenAI API Key found.")
-                self.client = None
         elif self.provider == 'gemini':
-            api_key = os.getenv("GOOGLE_API_KEY")
-            if api_key:
-                genai.configure(api_key=api_key)
-                self.client = genai
-            else:
+            self._api_key = os.getenv("GOOGLE_API_KEY")
+            if not self._api_key:
                 logger.error("No Google API Key found.")
-                self.client = None
-        else:
-            self.client = None
-        
+
+    @property
+    def client(self):
+        """OpenAI client or configured genai module, or None without an API key."""
+        if self._client is None and self._api_key:
+            with self._client_lock:
+                if self._client is None:
+                    factory = _openai_client if self.provider == 'openai' else _gemini_client
+                    self._client = factory(self._api_key)
+        return self._client
+
     def analyze(self, content, base_url, freshness=30, scopes=None):
+        """
+        Analyze one update. With the cascade enabled, a small triage model screens the
+        update first and only relevant (or uncertain) ones reach the detailed analysis.
+        """
+        if self.cascade_enabled and self.client:
+            triage = self._triage(content, base_url, freshness, scopes)
+            if triage and not self._should_escalate(triage, truncated=len(content) > self.triage_max_chars):
+                return {
+                    "summary": "Filtered by triage (not relevant)",
+                    "impact_level": triage["impact_level"],
+                    "type": "Info",
+                    "is_relevant": False,
+                    "triage": triage,
+                }
+            with self._stats_lock:
+                self.cascade_stats["escalated"] += 1
+
+        started = time.monotonic()
+        result = self._analyze_detailed(content, base_url, freshness, scopes)
+        self.stage_latency["analysis"].record(time.monotonic() - started)
+        return result
+
+    def _triage(self, content, base_url, freshness, scopes):
+        """Cheap relevance/impact screen. Returns the validated verdict, or None on failure."""
+        import datetime
+        from src.date_utils import freshness_to_days
+
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+        scope_rule = f"\n        - It must relate to one of: {', '.join(scopes)}." if scopes else ""
+        prompt = f"""
+        You screen integration release notes for Logiwa WMS. Answer with JSON only.
+        TODAY'S DATE: {today}
+        SOURCE: {base_url}
+
+        TEXT:
+        {content[:self.triage_max_chars]}
+
+        An update is relevant only if:
+        - It affects WMS, Shipping, or Ecommerce integrations.
+        - It is dated within {freshness_to_days(freshness)} days of TODAY'S DATE (future dates allowed).{scope_rule}
+
+        Output JSON format:
+        {{"is_relevant": true, "impact_level": "High/Medium/Low", "confidence": 0.0}}
+        """
+
+        started = time.monotonic()
+        with self._stats_lock:
+            self.cascade_stats["triaged"] += 1
+        try:
+            response_text = self._call_tier(
+                {"provider": self.provider, "model": self.triage_model}, 0, prompt,
+                schema=TRIAGE_SCHEMA, schema_name="update_triage",
+            )
+            verdict, errors = validate_triage(parse_llm_json(response_text))
+            if verdict is None or "missing required field 'is_relevant'" in errors:
+                raise Exception(f"Unusable triage reply: {response_text[:100]}")
+            return verdict
+        except Exception as e:
+            logger.warning(f"Triage on {self.triage_model} failed ({e}); escalating to full analysis.")
+            with self._stats_lock:
+                self.cascade_stats["triage_failures"] += 1
+            return None
+        finally:
+            self.stage_latency["triage"].record(time.monotonic() - started)
+
+    def _should_escalate(self, triage, truncated=False):
+        # A negative verdict on part of the text the analysis would read is not trusted
+        if triage["is_relevant"] or truncated:
+            return True
+        # Negative verdicts below the confidence threshold still get the strong model
+        return triage["confidence"] < self.cascade_min_negative_confidence
+
+    def log_cascade_stats(self):
+        """Log escalation rate and per-stage latency so cascade thresholds can be tuned."""
+        stats = self.cascade_stats
+        triaged = stats["triaged"] or 1
+        logger.info(
+            f"Cascade [{self.triage_model} -> {self.model}]: {stats['triaged']} triaged, "
+            f"{stats['escalated']} escalated ({stats['escalated'] / triaged:.0%}), "
+            f"{stats['triage_failures']} triage failures; "
+            f"triage latency {self.stage_latency['triage'].summary()}, "
+            f"analysis latency {self.stage_latency['analysis'].summary()}"
+        )
+
+    def _analyze_detailed(self, content, base_url, freshness=30, scopes=None):
         import datetime
         from src.date_utils import freshness_to_days, is_within_review_window, resolve_release_date
 
@@ -51,7 +245,7 @@ class LLMAnalyzer:
         BASE URL: {base_url}
         
         TEXT:
-        {content[:6000]} # Increased context limit
+        {content[:ANALYSIS_MAX_CHARS]}
         
         Your analysis must be detailed and professional.
         
@@ -117,62 +311,36 @@ class LLMAnalyzer:
                     logger.error("No LLM providers available (Pollinations fallback disabled).")
                     return {"summary": "No LLM Client", "impact_level": "Low", "type": "Error", "is_relevant": False}
 
-            max_retries = len(fallbacks)
-            retry_count = 0
-            import time
+            tier_index = 0
 
-            while retry_count < max_retries:
-                current = fallbacks[retry_count]
-                current_provider = current['provider']
+            while tier_index < len(fallbacks):
+                if self.deadline.expired():
+                    logger.warning("Cycle deadline reached; not trying further LLM tiers.")
+                    break
+                current = fallbacks[tier_index]
                 current_model = current['model']
-                
+                hedge_index = self._next_healthy_tier(fallbacks, tier_index) if self.hedging_enabled else None
+
                 try:
-                    if current_provider == 'pollinations':
-                        logger.info(f"Tier {retry_count+1}: Calling Pollinations.ai ({current_model})...")
-                        resp = requests.post(
-                            "https://text.pollinations.ai/openai/chat/completions",
-                            headers={"Content-Type": "application/json"},
-                            json={
-                                "model": current_model,
-                                "messages": [{"role": "user", "content": prompt}],
-                                "temperature": 0.1
-                            },
-                            timeout=30
-                        )
-                        if resp.status_code == 200:
-                            data = resp.json()
-                            if isinstance(data, dict) and 'choices' in data:
-                                response_text = data['choices'][0]['message']['content']
-                            else:
-                                response_text = resp.text
-                            if response_text: break
-                        else:
-                            raise Exception(f"Pollinations Error: {resp.status_code}")
-
-                    elif current_provider == 'openai':
-                        response = self.client.chat.completions.create(
-                            model=current_model, 
-                            messages=[{"role": "user", "content": prompt}],
-                            response_format={ "type": "json_object" }
+                    if hedge_index is not None:
+                        response_text = self._call_hedged(
+                            current, tier_index, fallbacks[hedge_index], hedge_index, prompt
                         )
-                        response_text = response.choices[0].message.content
-                        break
-                        
-                    elif current_provider == 'gemini':
-                        logger.info(f"Tier {retry_count+1}: Attempting Gemini with model: {current_model}")
-                        model = self.client.GenerativeModel(current_model)
-                        response = model.generate_content(prompt)
-                        response_text = response.text
-                        break
-                
+                    else:
+                        response_text = self._call_tier_for_json(current, tier_index, prompt)
+                    break
+
                 except Exception as e:
                     error_str = str(e)
-                    retry_count += 1
-                    if retry_count < max_retries:
+                    self._mark_unhealthy(current_model)
+                    # Skip the hedge tier only if it was actually called (a fast failure never hedges)
+                    tried_index = hedge_index if getattr(e, "hedge_tried", False) else tier_index
+                    tier_index = tried_index + 1
+                    if tier_index < len(fallbacks):
                         # "Beklemeden" fallback for 429/404
                         wait_time = 2 if ("429" in error_str or "quota" in error_str.lower() or "404" in error_str) else 5
-                        logger.warning(f"Error on {current_model}: {e}. Switching to Tier {retry_count+1} in {wait_time}s...")
-                        time.sleep(wait_time)
+                        logger.warning(f"Error on {current_model}: {e}. Switching to Tier {tier_index+1} in {wait_time}s...")
+                        self.deadline.sleep(wait_time)
                     else:
                         logger.error(f"All tiers failed. Final error: {e}")
 
@@ -184,36 +352,31 @@ class LLMAnalyzer:
                     "is_relevant": False
                  }
 
-            import json
-            import re
-            
-            # Robust JSON extraction: find first '{' and last '}'
-            match = re.search(r'(\{.*\})', response_text, re.DOTALL)
-            if match:
-                cleaned_text = match.group(1).strip()
-            else:
-                cleaned_text = response_text.replace("```json", "").replace("```", "").replace("***", "").strip()
-
-            if not cleaned_text.startswith("{"): 
-                 logger.warning(f"Invalid JSON response structure: {cleaned_text[:100]}...")
-                 return {"summary": "Invalid LLM Response Format", "impact_level": "Low", "type": "Error", "is_relevant": False}
-                 
-            try:
-                result = json.loads(cleaned_text)
-                if result.get("is_relevant"):
-                    result["release_date"] = resolve_release_date(result)
-                if result.get("is_relevant") and not is_within_review_window(
-                    result.get("release_date"), freshness_days
-                ):
-                    logger.info(
-                        f"Rejected stale release date {result.get('release_date')} "
-                        f"(>{freshness_days} days old)"
-                    )
-                    result["is_relevant"] = False
-                return result
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON Decode Error: {e}. Raw: {cleaned_text[:200]}")
-                return {"summary": "JSON Parsing Error", "impact_level": "Low", "type": "Error", "is_relevant": False}
+            # Linear-time extraction of the first JSON object, with local repair of
+            # code fences, smart quotes and trailing commas before giving up on the reply.
+            parsed = parse_llm_json(response_text)
+            if parsed is None:
+                logger.warning(f"Invalid JSON response structure: {response_text[:100]}...")
+                return {"summary": "Invalid LLM Response Format", "impact_level": "Low", "type": "Error", "is_relevant": False}
+
+            result, schema_errors = validate_analysis(parsed)
+            if result is None:
+                logger.warning(f"LLM response missing its verdict: {'; '.join(schema_errors)}")
+                return {"summary": "Invalid LLM Response Format", "impact_level": "Low", "type": "Error", "is_relevant": False}
+            if schema_errors:
+                logger.warning(f"LLM response schema issues (repaired with defaults): {'; '.join(schema_errors)}")
+
+            if result.get("is_relevant"):
+                result["release_date"] = resolve_release_date(result)
+            if result.get("is_relevant") and not is_within_review_window(
+                result.get("release_date"), freshness_days
+            ):
+                logger.info(
+                    f"Rejected stale release date {result.get('release_date')} "
+                    f"(>{freshness_days} days old)"
+                )
+                result["is_relevant"] = False
+            return result
             
         except Exception as e:
             logger.error(f"LLM Analysis failed: {e}")
@@ -223,6 +386,209 @@ class LLMAnalyzer:
                 "type": "Error",
                 "is_relevant": False
             }
+    def _call_tier(self, tier, tier_index, prompt, schema=ANALYSIS_SCHEMA, schema_name="update_analysis"):
+        """Run the prompt on a single fallback tier and return the raw response text."""
+        current_provider = tier['provider']
+        current_model = tier['model']
+        started = time.monotonic()
+
+        if current_provider == 'pollinations':
+            logger.info(f"Tier {tier_index+1}: Calling Pollinations.ai ({current_model})...")
+            resp = requests.post(
+                "https://text.pollinations.ai/openai/chat/completions",
+                headers={"Content-Type": "application/json"},
+                json={
+                    "model": current_model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": 0.1
+                },
+                timeout=self.deadline.timeout(min(30, self.timeout_seconds))
+            )
+            if resp.status_code != 200:
+                raise Exception(f"Pollinations Error: {resp.status_code}")
+            data = resp.json()
+            if isinstance(data, dict) and 'choices' in data:
+                response_text = data['choices'][0]['message']['content']
+            else:
+                response_text = resp.text
+
+            self._record_output("free_text", response_text)
+
+        elif current_provider == 'openai':
+            response_text = self._call_openai(current_model, prompt, schema, schema_name)
+
+        elif current_provider == 'gemini':
+            logger.info(f"Tier {tier_index+1}: Attempting Gemini with model: {current_model}")
+            response_text = self._call_gemini(current_model, prompt, schema)
+
+        else:
+            raise Exception(f"Unknown provider: {current_provider}")
+
+        if not response_text:
+            raise Exception(f"Empty response from {current_model}")
+        self._latency_for(current_model).record(time.monotonic() - started)
+        return response_text
+
+    def _call_openai(self, model_name, prompt, schema, schema_name):
+        structured = self.structured_output and model_name not in self._structured_unsupported
+        response_format = openai_response_format(schema, schema_name) if structured else { "type": "json_object" }
+        try:
+            response = self.client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                response_format=response_format,
+                timeout=self.deadline.timeout(self.timeout_seconds),
+            )
+        except Exception as e:
+            if not structured or not _is_schema_rejection(e):
+                raise
+            logger.warning(f"{model_name} rejected JSON schema output ({e}); falling back to JSON mode.")
+            self._structured_unsupported.add(model_name)
+            return self._call_openai(model_name, prompt, schema, schema_name)
+
+        response_text = response.choices[0].message.content
+        self._record_output("structured" if structured else "json_mode", response_text)
+        return response_text
+
+    def _call_gemini(self, model_name, prompt, schema):
+        structured = self.structured_output and model_name not in self._structured_unsupported
+        generation_config = None
+        if structured:
+            generation_config = self.client.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=gemini_response_schema(schema),
+            )
+        try:
+            model = self.client.GenerativeModel(model_name)
+            response = model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                request_options={"timeout": self.deadline.timeout(self.timeout_seconds)},
+            )
+        except Exception as e:
+            if not structured or not _is_schema_rejection(e):
+                raise
+            logger.warning(f"{model_name} rejected response_schema ({e}); falling back to free-text JSON.")
+            self._structured_unsupported.add(model_name)
+            return self._call_gemini(model_name, prompt, schema)
+
+        response_text = response.text
+        self._record_output("structured" if structured else "free_text", response_text)
+        return response_text
+
+    def _record_output(self, mode, response_text):
+        """Count replies per output mode and how many of them failed to parse as JSON."""
+        failed = parse_llm_json(response_text or "") is None
+        with self._stats_lock:
+            stats = self.parse_stats.setdefault(mode, {"responses": 0, "failures": 0})
+            stats["responses"] += 1
+            stats["failures"] += int(failed)
+
+    def log_parse_stats(self):
+        """Log the JSON parse-failure rate per output mode (structured vs free text)."""
+        for mode, stats in sorted(self.parse_stats.items()):
+            rate = stats["failures"] / stats["responses"] if stats["responses"] else 0.0
+            logger.info(
+                f"LLM output [{mode}]: {stats['responses']} responses, "
+                f"{stats['failures']} parse failures ({rate:.1%})"
+            )
+
+    def _latency_for(self, model):
+        with self._stats_lock:
+            if model not in self.tier_latency:
+                self.tier_latency[model] = LatencyTracker()
+            return self.tier_latency[model]
+
+    def _mark_unhealthy(self, model):
+        with self._stats_lock:
+            self._unhealthy_until[model] = time.monotonic() + self.hedge_unhealthy_cooldown
+
+    def _next_healthy_tier(self, fallbacks, tier_index):
+        """Index of the first tier after tier_index that has not failed recently, or None."""
+        now = time.monotonic()
+        for index in range(tier_index + 1, len(fallbacks)):
+            model = fallbacks[index]['model']
+            if model == fallbacks[tier_index]['model']:
+                continue
+            if self._unhealthy_until.get(model, 0) <= now:
+                return index
+        return None
+
+    def _hedge_delay(self, model):
+        tracker = self._latency_for(model)
+        if tracker.count < self.hedge_min_samples:
+            return self.hedge_default_delay
+        return tracker.percentile(self.hedge_percentile, self.hedge_default_delay)
+
+    def _call_tier_for_json(self, tier, tier_index, prompt):
+        """_call_tier, raising (so the next tier is tried) when the reply is not a usable analysis."""
+        response_text = self._call_tier(tier, tier_index, prompt)
+        analysis, errors = validate_analysis(parse_llm_json(response_text))
+        if analysis is None:
+            raise Exception(f"Unusable response from {tier['model']}: {'; '.join(errors)}")
+        return response_text
+
+    def _call_hedged(self, primary, primary_index, hedge, hedge_index, prompt):
+        """
+        Send the prompt to the primary tier; if it has not answered within its latency
+        percentile, send it to the hedge tier too and return the first valid JSON reply.
+        Raises a HedgedCallError when every called tier failed.
+        """
+        primary_model = primary['model']
+        self._count_hedge(primary_model, "requests")
+
+        futures = {self._hedge_executor.submit(self._call_tier_for_json, primary, primary_index, prompt): "primary"}
+        done, _ = wait(futures, timeout=self._hedge_delay(primary_model))
+
+        if not done:
+            logger.info(f"{primary_model} slower than p{self.hedge_percentile:g}; hedging to {hedge['model']}.")
+            self._count_hedge(primary_model, "hedged")
+            futures[self._hedge_executor.submit(self._call_tier_for_json, hedge, hedge_index, prompt)] = "hedge"
+
+        last_error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response_text = future.result()
+                except Exception as e:
+                    last_error = e
+                    if futures[future] == "hedge":
+                        self._mark_unhealthy(hedge['model'])
+                    continue
+                # The loser keeps running in its worker thread (SDK calls cannot be
+                # interrupted); cancel it if it has not started and ignore its result.
+                for other in pending:
+                    other.cancel()
+                if futures[future] == "hedge":
+                    self._count_hedge(primary_model, "won_by_hedge")
+                    logger.info(f"Hedge tier {hedge['model']} answered before {primary_model}.")
+                return response_text
+
+        raise HedgedCallError(
+            last_error or Exception(f"No response from {primary_model}"), hedge_tried="hedge" in futures.values(),
+        ) from last_error
+
+    def _count_hedge(self, model, field):
+        # Hedged calls run on several threads at once
+        with self._stats_lock:
+            stats = self.hedge_stats.setdefault(model, {"requests": 0, "hedged": 0, "won_by_hedge": 0})
+            stats[field] += 1
+
+    def log_hedge_stats(self):
+        """Log per-model hedge rate and how often the hedge tier won."""
+        with self._stats_lock:
+            hedge_stats = {model: dict(stats) for model, stats in self.hedge_stats.items()}
+        for model, stats in sorted(hedge_stats.items()):
+            requests_count = stats["requests"] or 1
+            logger.info(
+                f"Hedging [{model}]: {stats['requests']} requests, "
+                f"hedge rate {stats['hedged'] / requests_count:.0%}, "
+                f"won by hedge {stats['won_by_hedge']} ({stats['won_by_hedge'] / requests_count:.0%}), "
+                f"latency {self._latency_for(model).summary()}"
+            )
+
     def generate_customer_notes(self, technical_details):
         """
         Translates complex technical integration updates into polished,
@@ -256,6 +622,8 @@ class LLMAnalyzer:
         return self._generate_text(prompt) or "Professional notes could not be generated at this time."
 
     def _generate_text(self, prompt):
+        # Runs while partial results are flushed, so it may use the deadline's reserve
+        timeout = self.deadline.timeout(self.timeout_seconds, final=True)
         if not self.client:
             logger.error("No LLM client available for text generation.")
             return None
@@ -265,12 +633,13 @@ class LLMAnalyzer:
                 response = self.client.chat.completions.create(
                     model=self.model,
                     messages=[{"role": "user", "content": prompt}],
+                    timeout=timeout,
                 )
                 return response.choices[0].message.content
 
             if self.provider == "gemini":
                 model = self.client.GenerativeModel(self.model)
-                response = model.generate_content(prompt)
+                response = model.generate_content(prompt, request_options={"timeout": timeout})
                 return response.text
         except Exception as e:
             logger.error(f"Primary text generation failed ({self.provider}): {e}")
@@ -278,16 +647,17 @@ class LLMAnalyzer:
         # Best-effort fallback to the alternate configured provider.
         try:
             if self.provider != "openai" and os.getenv("OPENAI_API_KEY"):
-                fallback = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                fallback = _openai_client(os.getenv("OPENAI_API_KEY"))
                 response = fallback.chat.completions.create(
                     model="gpt-4o-mini",
                     messages=[{"role": "user", "content": prompt}],
+                    timeout=timeout,
                 )
                 return response.choices[0].message.content
             if self.provider != "gemini" and os.getenv("GOOGLE_API_KEY"):
-                genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+                genai = _gemini_client(os.getenv("GOOGLE_API_KEY"))
                 model = genai.GenerativeModel("gemini-flash-latest")
-                return model.generate_content(prompt).text
+                return model.generate_content(prompt, request_options={"timeout": timeout}).text
         except Exception as e:
             logger.error(f"Fallback text generation failed: {e}")
 
@@ -0,0 +1,424 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from src.firebase_manager import DEFAULT_PAGE_SIZE, SERVER_TIMESTAMP, FirebaseManager
+from src.report_utils import section_document_id
+
+logger = logging.getLogger("LocalStore")
+
+DEFAULT_SQLITE_PATH = os.path.join("data", "local_store.db")
+# Default journal_path: derived from the database path (see default_journal_path)
+_JOURNAL_NEXT_TO_DB = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (collection, doc_id)
+);
+CREATE INDEX IF NOT EXISTS idx_documents_update_time ON documents (collection, update_time);
+"""
+
+_PENDING = "json_extract(data, '$.status') = 'Pending'"
+# Datetimes are stored as ISO strings, so creation order sorts lexicographically
+_TIMESTAMP_KEY = "COALESCE(json_extract(data, '$.timestamp.__datetime__'), json_extract(data, '$.timestamp'), '')"
+
+
+def _is_server_timestamp(value) -> bool:
+    if value is SERVER_TIMESTAMP:
+        return True
+    # firestore.SERVER_TIMESTAMP is a Sentinel; matched structurally so this module
+    # does not need the Firestore SDK.
+    return type(value).__name__ == "Sentinel" and "server timestamp" in str(getattr(value, "description", ""))
+
+
+def _resolve_values(value, now):
+    """Replace server-timestamp sentinels with the commit time."""
+    if _is_server_timestamp(value):
+        return now
+    if isinstance(value, dict):
+        return {key: _resolve_values(item, now) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve_values(item, now) for item in value]
+    return value
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, bytes):
+        return {"__bytes__": value.hex()}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if set(value) == {"__datetime__"}:
+            return datetime.fromisoformat(value["__datetime__"])
+        if set(value) == {"__bytes__"}:
+            return bytes.fromhex(value["__bytes__"])
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def default_journal_path(path):
+    """Write journal of a SQLite store, next to its database so it never mixes with Firestore's journal."""
+    if path == ":memory:":
+        return None
+    root, _ = os.path.splitext(path)
+    return f"{root}.pending_writes.jsonl"
+
+
+class SQLiteFirebaseManager(FirebaseManager):
+    """
+    Drop-in local stand-in for FirebaseManager backed by a single SQLite file.
+    Documents are stored as JSON per (collection, doc_id); server timestamps resolve
+    to the commit time and write-behind flushes commit in one transaction.
+    """
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, write_behind=False, max_pending_writes=200,
+                 max_write_age_seconds=30, journal_path=_JOURNAL_NEXT_TO_DB):
+        self.path = path
+        if journal_path is _JOURNAL_NEXT_TO_DB:
+            journal_path = default_journal_path(path)
+        self._conn_lock = threading.RLock()
+        self._last_update_time = 0.0
+        super().__init__(
+            write_behind=write_behind,
+            max_pending_writes=max_pending_writes,
+            max_write_age_seconds=max_write_age_seconds,
+            journal_path=journal_path,
+        )
+
+    def _initialize(self):
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.executescript(_SCHEMA)
+        logger.info(f"Local SQLite store initialized at {self.path}.")
+
+    # --- Low-level document access -------------------------------------------------
+
+    def _get_document(self, collection, doc_id):
+        with self._conn_lock:
+            row = self.db.execute(
+                "SELECT data FROM documents WHERE collection = ? AND doc_id = ?",
+                (collection, doc_id),
+            ).fetchone()
+        return _decode(json.loads(row[0])) if row else None
+
+    def _fetch_page(self, collection, size, condition="1", sort_key="''", cursor=None):
+        """One keyset page ordered by (sort_key, rowid); cursor is the last row of the previous page."""
+        sql = (
+            f"SELECT {sort_key}, rowid, doc_id, data FROM documents "
+            f"WHERE collection = ? AND {condition}"
+        )
+        params = [collection]
+        if cursor is not None:
+            sql += f" AND ({sort_key} > ? OR ({sort_key} = ? AND rowid > ?))"
+            params += [cursor[0], cursor[0], cursor[1]]
+        sql += f" ORDER BY {sort_key}, rowid LIMIT ?"
+        params.append(size)
+        with self._conn_lock:
+            return self.db.execute(sql, params).fetchall()
+
+    def _paginate_rows(self, collection, page_size, limit=None, condition="1", sort_key="''", first_page=None):
+        page_size = max(int(page_size), 1)
+        yielded = 0
+        cursor = None
+        page = first_page
+        while limit is None or yielded < limit:
+            size = page_size if limit is None else min(page_size, limit - yielded)
+            if page is None:
+                page = self._fetch_page(collection, size, condition, sort_key, cursor)
+            for key, rowid, doc_id, data in page:
+                if limit is not None and yielded >= limit:
+                    return
+                yielded += 1
+                yield doc_id, _decode(json.loads(data))
+            if len(page) < size:
+                return
+            key, rowid = page[-1][:2]
+            cursor = (key, rowid)
+            page = None
+
+    def _next_update_time(self):
+        # Strictly increasing, so two writes in the same clock tick still look like a change
+        self._last_update_time = max(time.time(), self._last_update_time + 1e-6)
+        return self._last_update_time
+
+    def _put(self, collection, doc_id, data):
+        # Upsert keeps the original rowid, so streams stay in creation order
+        self.db.execute(
+            "INSERT INTO documents (collection, doc_id, data, update_time) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (collection, doc_id) DO UPDATE SET data = excluded.data, update_time = excluded.update_time",
+            (collection, doc_id, json.dumps(_encode(data)), self._next_update_time()),
+        )
+
+    def _apply_update(self, collection, doc_id, data, now, merge_create=False):
+        """Firestore update() semantics (doc must exist) unless merge_create (set(merge=True))."""
+        existing = self._get_document(collection, doc_id)
+        if existing is None and not merge_create:
+            raise KeyError(f"No document to update: {collection}/{doc_id}")
+        self._put(collection, doc_id, {**(existing or {}), **_resolve_values(data, now)})
+
+    def add_document(self, collection, data, doc_id=None):
+        """Create a document (Firestore add()/set()); returns its id."""
+        doc_id = doc_id or uuid.uuid4().hex[:20]
+        now = datetime.now(timezone.utc)
+        with self._conn_lock, self.db:
+            self._put(collection, doc_id, _resolve_values(data, now))
+        return doc_id
+
+    # --- FirebaseManager interface ---------------------------------------------
+
+    def get_monitored_urls(self):
+        return list(self.iter_monitored_urls())
+
+    def iter_monitored_urls(self, page_size=DEFAULT_PAGE_SIZE):
+        for doc_id, data in self._paginate_rows("monitored_urls", page_size):
+            yield self._url_from_doc(doc_id, data)
+
+    def refresh_monitored_urls(self):
+        with self._conn_lock:
+            current = dict(self.db.execute(
+                "SELECT doc_id, update_time FROM documents WHERE collection = 'monitored_urls'"
+            ).fetchall())
+        removed = [doc_id for doc_id in self._url_snapshot if doc_id not in current]
+        changed = [
+            doc_id for doc_id, update_time in current.items()
+            if doc_id not in self._url_snapshot or self._url_snapshot[doc_id][0] != update_time
+        ]
+        for doc_id in removed:
+            del self._url_snapshot[doc_id]
+        for doc_id in changed:
+            data = self._get_document("monitored_urls", doc_id)
+            if data is not None:
+                self._url_snapshot[doc_id] = (current[doc_id], self._url_from_doc(doc_id, data))
+        if changed or removed:
+            self.snapshot_version += 1
+        return [entry for _, entry in self._url_snapshot.values()]
+
+    def get_system_config(self):
+        return self._get_document("config", "system") or {}
+
+    def update_system_config(self, config_data):
+        now = datetime.now(timezone.utc)
+        with self._conn_lock, self.db:
+            self._apply_update("config", "system", config_data, now, merge_create=True)
+        logger.info("System configuration updated in local store.")
+
+    def update_url_status(self, url_id, status_data):
+        self._update("monitored_urls", url_id, status_data)
+
+    def update_url_hash(self, url_id, content_hash):
+        self._update("monitored_urls", url_id, {"last_hash": content_hash})
+
+    def _first_injection_page(self, page_size=DEFAULT_PAGE_SIZE, limit=None):
+        size = page_size if limit is None else min(page_size, limit)
+        if size <= 0:
+            return []
+        return self._fetch_page("manual_injections", size, _PENDING, _TIMESTAMP_KEY)
+
+    def iter_manual_injections(self, page_size=DEFAULT_PAGE_SIZE, limit=None, first_page=None):
+        if limit is not None and limit <= 0:
+            return
+        rows = self._paginate_rows("manual_injections", page_size, limit, _PENDING, _TIMESTAMP_KEY, first_page)
+        for doc_id, data in rows:
+            yield {
+                "id": doc_id,
+                "source": data.get("source"),
+                "content": data.get("content"),
+                "priority": data.get("priority"),
+            }
+
+    def add_manual_injection(self, source, content, priority=None, status="Pending"):
+        return self.add_document("manual_injections", {
+            "source": source,
+            "content": content,
+            "priority": priority,
+            "status": status,
+            "timestamp": SERVER_TIMESTAMP,
+        })
+
+    def add_manual_injections(self, injections, status="Pending"):
+        now = datetime.now(timezone.utc)
+        with self._conn_lock, self.db:
+            for injection in injections:
+                data = {key: value for key, value in injection.items() if key != "id"}
+                self._put("manual_injections", injection["id"], _resolve_values(
+                    {**data, "status": status, "timestamp": SERVER_TIMESTAMP}, now,
+                ))
+        return len(injections)
+
+    def get_manual_injection_statuses(self, injection_ids):
+        if not injection_ids:
+            return {}
+        placeholders = ", ".join("?" * len(injection_ids))
+        with self._conn_lock:
+            rows = self.db.execute(
+                "SELECT doc_id, json_extract(data, '$.status') FROM documents "
+                f"WHERE collection = 'manual_injections' AND doc_id IN ({placeholders})",
+                list(injection_ids),
+            ).fetchall()
+        return dict(rows)
+
+    def set_manual_injection_status(self, injection_id, status):
+        try:
+            with self._conn_lock, self.db:
+                self._apply_update("manual_injections", injection_id, {"status": status}, datetime.now(timezone.utc))
+        except Exception as e:
+            logger.error(f"Error updating manual injection status: {e}")
+
+    def requeue_manual_injections(self, status, older_than=None):
+        now = datetime.now(timezone.utc)
+        with self._conn_lock, self.db:
+            rows = self.db.execute(
+                "SELECT doc_id, data FROM documents WHERE collection = 'manual_injections' "
+                "AND json_extract(data, '$.status') = ?",
+                (status,),
+            ).fetchall()
+            requeued = 0
+            for doc_id, data in rows:
+                timestamp = _decode(json.loads(data)).get("timestamp")
+                if older_than is None or (timestamp is not None and timestamp < older_than):
+                    self._apply_update("manual_injections", doc_id, {"status": "Pending"}, now)
+                    requeued += 1
+        return requeued
+
+    def mark_manual_injection_processed(self, injection_id):
+        self._update("manual_injections", injection_id, {
+            "status": "Processed",
+            "processed_at": SERVER_TIMESTAMP,
+        })
+
+    def load_checkpoint_events(self, name="current"):
+        return self._load_collection(f"cycle_checkpoints/{name}/events")
+
+    def append_checkpoint_event(self, sequence, event, name="current"):
+        with self._conn_lock, self.db:
+            self._put(f"cycle_checkpoints/{name}/events", f"{sequence:06d}", event)
+
+    def clear_checkpoint_events(self, name="current"):
+        self._delete_collection(f"cycle_checkpoints/{name}/events")
+
+    def load_post_processing_jobs(self):
+        return self._load_collection("post_processing_jobs")
+
+    def save_post_processing_jobs(self, jobs):
+        with self._conn_lock, self.db:
+            for job in jobs:
+                self._put("post_processing_jobs", job["key"], job)
+
+    def delete_post_processing_jobs(self, keys):
+        with self._conn_lock, self.db:
+            self.db.executemany(
+                "DELETE FROM documents WHERE collection = 'post_processing_jobs' AND doc_id = ?", [(key,) for key in keys],
+            )
+
+    def save_relevance_sample(self, sample_id, sample):
+        with self._conn_lock, self.db:
+            self._put("relevance_samples", sample_id, sample)
+
+    def load_relevance_samples(self):
+        return self._load_collection("relevance_samples")
+
+    def save_shard_result(self, run_id, shard_index, result):
+        with self._conn_lock, self.db:
+            self._put(f"cycle_shards/{run_id}/results", f"{shard_index:04d}", result)
+
+    def load_shard_results(self, run_id):
+        return self._load_collection(f"cycle_shards/{run_id}/results")
+
+    def clear_shard_results(self, run_id):
+        self._delete_collection(f"cycle_shards/{run_id}/results")
+
+    def _load_collection(self, collection):
+        return [data for _, data in self._paginate_rows(collection, DEFAULT_PAGE_SIZE, sort_key="doc_id")]
+
+    def _delete_collection(self, collection):
+        with self._conn_lock, self.db:
+            self.db.execute("DELETE FROM documents WHERE collection = ?", (collection,))
+
+    def record_cycle_run(self):
+        self.update_system_config({"last_run": SERVER_TIMESTAMP})
+
+    def save_report(self, report_data, report_id=None, sections=None):
+        report_id = report_id or uuid.uuid4().hex[:20]
+        now = datetime.now(timezone.utc)
+        with self._conn_lock, self.db:
+            for section in sections or []:
+                self._put(f"intel_reports/{report_id}/sections", section_document_id(section), section)
+            self._put("intel_reports", report_id, _resolve_values({**report_data, "timestamp": SERVER_TIMESTAMP}, now))
+        logger.info(f"Intelligence report saved to local store ({len(sections or [])} section documents).")
+        return report_id
+
+    def update_report(self, report_id, header_data, sections=None):
+        now = datetime.now(timezone.utc)
+        try:
+            with self._conn_lock, self.db:
+                for section in sections or []:
+                    self._put(f"intel_reports/{report_id}/sections", section_document_id(section), section)
+                self._apply_update("intel_reports", report_id, header_data, now, merge_create=True)
+        except Exception as e:
+            logger.error(f"Error updating report {report_id} in local store: {e}")
+            return False
+        logger.info(f"Report {report_id} updated ({len(sections or [])} section documents added).")
+        return True
+
+    def get_report(self, report_id):
+        return self._get_document("intel_reports", report_id)
+
+    def _section_documents(self, report_id, kind=None, index=None):
+        collection = f"intel_reports/{report_id}/sections"
+        for _, data in self._paginate_rows(collection, DEFAULT_PAGE_SIZE, sort_key="doc_id"):
+            if (kind is None or data.get("kind") == kind) and (index is None or data.get("index") == index):
+                yield data
+
+    def _update(self, collection, doc_id, data):
+        if self.write_behind:
+            self._buffer_update(collection, doc_id, data)
+            return
+        try:
+            now = datetime.now(timezone.utc)
+            with self._conn_lock, self.db:
+                self._apply_update(collection, doc_id, data, now)
+        except Exception as e:
+            logger.error(f"Error updating {collection}/{doc_id} in local store: {e}")
+
+    def _commit_chunk(self, chunk):
+        """Commit a write-behind chunk in a single transaction; missing documents are skipped."""
+        now = datetime.now(timezone.utc)
+        written = 0
+        try:
+            with self._conn_lock, self.db:
+                for (collection, doc_id), data in chunk:
+                    try:
+                        self._apply_update(collection, doc_id, data, now)
+                        written += 1
+                    except KeyError as e:
+                        logger.error(f"Error updating {collection}/{doc_id} in local store: {e}")
+        except sqlite3.Error as e:
+            # The transaction rolled back (e.g. database locked): the whole chunk is retried
+            logger.error(f"Error committing {len(chunk)} buffered updates to local store: {e}")
+            return 0, list(chunk)
+        return written, []
+
+    def close(self):
+        self.flush()
+        with self._conn_lock:
+            self.db.close()
@@ -0,0 +1,95 @@
+import re
+
+NOTE_SECTIONS = ("completed", "in_progress", "risks")
+
+COMPLETED_HINTS = ("finished", "completed", "done", "shipped", "released", "merged", "fixed")
+RISK_HINTS = ("risk", "bug", "blocker", "blocked", "issue", "concern", "approval", "confusing", "fails")
+
+
+def iter_note_chunks(lines, max_chars: int = 6000):
+    """
+    Group an iterable of note lines into chunks of at most max_chars characters.
+    Lines are never split unless a single line is longer than max_chars.
+    Only one chunk is held in memory at a time.
+    """
+    max_chars = max(int(max_chars), 1)
+    buffer: list[str] = []
+    size = 0
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if not line.strip():
+            continue
+
+        while len(line) > max_chars:
+            if buffer:
+                yield "\n".join(buffer)
+                buffer, size = [], 0
+            yield line[:max_chars]
+            line = line[max_chars:]
+
+        if buffer and size + len(line) + 1 > max_chars:
+            yield "\n".join(buffer)
+            buffer, size = [], 0
+        buffer.append(line)
+        size += len(line) + 1
+
+    if buffer:
+        yield "\n".join(buffer)
+
+
+def normalize_note_key(item) -> str:
+    """Case/punctuation-insensitive key used to deduplicate note items."""
+    text = re.sub(r"[^a-z0-9 ]+", " ", str(item or "").lower())
+    return " ".join(text.split())
+
+
+def classify_note_line(line: str) -> str:
+    """Keyword fallback for a single note line when the LLM is unavailable."""
+    text = line.lower()
+    if any(hint in text for hint in RISK_HINTS):
+        return "risks"
+    if any(hint in text for hint in COMPLETED_HINTS):
+        return "completed"
+    return "in_progress"
+
+
+def structure_notes_locally(chunk: str) -> dict:
+    """Best-effort structuring of a notes chunk without an LLM call."""
+    structured = {section: [] for section in NOTE_SECTIONS}
+    for line in chunk.splitlines():
+        item = line.strip().lstrip("-*• ").strip()
+        if item:
+            structured[classify_note_line(item)].append(item)
+    return structured
+
+
+class NotesAccumulator:
+    """
+    Merges structured chunk results into bounded, deduplicated section lists.
+    Memory is capped by max_items per section, not by the size of the notes.
+    """
+
+    def __init__(self, max_items: int = 50):
+        self.max_items = max_items
+        self.sections = {section: [] for section in NOTE_SECTIONS}
+        self._seen = {section: set() for section in NOTE_SECTIONS}
+        self.dropped = 0
+
+    def add(self, structured: dict):
+        for section in NOTE_SECTIONS:
+            items = structured.get(section) or []
+            if isinstance(items, str):
+                items = [items]
+            for item in items:
+                key = normalize_note_key(item)
+                if not key or key in self._seen[section]:
+                    continue
+                if len(self.sections[section]) >= self.max_items:
+                    self.dropped += 1
+                    continue
+                self._seen[section].add(key)
+                self.sections[section].append(str(item).strip())
+
+    def total_items(self) -> int:
+        return sum(len(items) for items in self.sections.values())
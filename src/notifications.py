@@ -22,9 +22,10 @@ class Notifier:
         self.recipients = self.config['email']['recipients']
 
     def send_slack_alert(self, alert):
+        """Posts one alert; returns True when Slack accepted it, False on failure, None when skipped."""
         if not self.config['slack']['enabled'] or not self.slack_webhook:
             logger.warning("Slack notification skipped (Disabled or missing WebhookURL)")
-            return
+            return None
 
         impact = normalize_impact_level(alert.get("impact_level"))
         color = "#FF0000" if impact == "High" else "#FFA500"
@@ -68,16 +69,17 @@ class Notifier:
             response = requests.post(self.slack_webhook, json=payload, timeout=10)
             if response.status_code == 200 and response.text == "ok":
                 logger.info(f"Sent Slack alert for {alert['source']}")
-            else:
-                logger.error(f"Slack rejected the message for {alert['source']}. Status: {response.status_code}, Response: {response.text}")
+                return True
+            logger.error(f"Slack rejected the message for {alert['source']}. Status: {response.status_code}, Response: {response.text}")
         except Exception as e:
             logger.error(f"Failed to send Slack alert: {e}")
+        return False
 
     def send_digest_email(self, alerts):
-        """Send scheduled digest for Action Required and Needs Review items."""
+        """Send scheduled digest for Action Required and Needs Review items (same return values as _send_email)."""
         if not self.config['email']['enabled'] or not self.sender_email:
             logger.warning("Email notification skipped (Disabled or missing credentials)")
-            return
+            return None
 
         subject = f"📊 Logiwa Integration Intelligence Digest ({len(alerts)} items)"
         
@@ -107,11 +109,11 @@ class Notifier:
         </div>
         """
 
-        self._send_email(subject, body, self.recipients)
+        return self._send_email(subject, body, self.recipients)
 
     def send_weekly_email(self, alerts):
         """Backward-compatible alias for digest email."""
-        self.send_digest_email(alerts)
+        return self.send_digest_email(alerts)
 
     def send_internal_report_email(self, html_content):
          if not self.config['email']['enabled']:
@@ -119,6 +121,7 @@ class Notifier:
          self._send_email("🗓️ Internal Integration Progress Update", html_content, self.recipients)
 
     def _send_email(self, subject, html_body, recipients):
+        """Returns True once the SMTP server accepted the message, False on any failure."""
         msg = MIMEMultipart()
         msg['From'] = self.sender_email
         msg['To'] = ", ".join(recipients)
@@ -132,5 +135,7 @@ class Notifier:
             server.send_message(msg)
             server.quit()
             logger.info(f"Sent email to {recipients}")
+            return True
         except Exception as e:
             logger.error(f"Failed to send email: {e}")
+            return False
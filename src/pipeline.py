@@ -0,0 +1,177 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger("Pipeline")
+
+# End-of-stream marker passed between stages
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step. fn(item) returns the item for the next stage, or None to drop it.
+    Ordered stages run on a single worker and see items in input order; unordered
+    stages run fn on `workers` threads and may complete out of order.
+    """
+
+    def __init__(self, name, fn, workers=1, ordered=False):
+        self.name = name
+        self.fn = fn
+        self.workers = 1 if ordered else max(int(workers), 1)
+        self.ordered = ordered
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+        self._lock = threading.Lock()
+
+    def _sample_depth(self, depth):
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+            self._depth_total += depth
+            self._depth_samples += 1
+
+    def _run(self, item):
+        started = time.monotonic()
+        try:
+            result = self.fn(item)
+        except Exception as e:
+            # One bad item must not stall the stream; it is dropped like a filtered item
+            logger.error(f"Stage '{self.name}' failed on an item: {e}")
+            result = None
+            with self._lock:
+                self.errors += 1
+        with self._lock:
+            self.busy_seconds += time.monotonic() - started
+            self.processed += 1
+            if result is None:
+                self.dropped += 1
+        return result
+
+    def stats(self, elapsed):
+        with self._lock:
+            avg_depth = self._depth_total / self._depth_samples if self._depth_samples else 0.0
+            return {
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "workers": self.workers,
+                "throughput": self.processed / elapsed if elapsed > 0 else 0.0,
+                "busy_seconds": self.busy_seconds,
+                "max_queue_depth": self.max_depth,
+                "avg_queue_depth": avg_depth,
+            }
+
+
+class StagedPipeline:
+    """
+    Runs items through stages connected by bounded queues. A full queue blocks the
+    stage feeding it, so at most ~queue_size items wait between any two stages. Every
+    item carries its input sequence number; dropped items travel on as placeholders
+    so ordered stages can restore input order behind parallel ones. An ordered
+    stage's reorder buffer would grow behind one slow item, so the feeder also stops
+    once max_in_flight items are between input and output (by default what the
+    queues and workers hold): memory stays flat however long the input is.
+    """
+
+    def __init__(self, stages, queue_size=8, max_in_flight=None):
+        self.stages = stages
+        self.queue_size = max(int(queue_size), 1)
+        self.max_in_flight = max_in_flight or (
+            self.queue_size * (len(stages) + 1) + sum(stage.workers for stage in stages)
+        )
+        self.elapsed = 0.0
+
+    def run(self, items):
+        """Feeds items (any iterable, consumed lazily) through all stages; returns the outputs in input order."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = []
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage, queues[index], queues[index + 1], remaining),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        started = time.monotonic()
+        window = threading.Semaphore(self.max_in_flight)
+        feeder = threading.Thread(
+            target=self._feed, args=(items, queues[0], window), name="pipeline-feed", daemon=True,
+        )
+        feeder.start()
+
+        outputs = {}
+        while True:
+            entry = queues[-1].get()
+            if entry is _DONE:
+                break
+            window.release()
+            sequence, item = entry
+            if item is not None:
+                outputs[sequence] = item
+
+        feeder.join()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.monotonic() - started
+        return [outputs[sequence] for sequence in sorted(outputs)]
+
+    def _feed(self, items, output, window):
+        try:
+            for sequence, item in enumerate(items):
+                # Released when the item (or its placeholder) leaves the last stage
+                window.acquire()
+                output.put((sequence, item))
+        except Exception as e:
+            logger.error(f"Pipeline input failed: {e}")
+        finally:
+            output.put(_DONE)
+
+    def _worker(self, stage, source, output, remaining):
+        pending = {}
+        next_sequence = 0
+        while True:
+            stage._sample_depth(source.qsize())
+            entry = source.get()
+            if entry is _DONE:
+                # Let sibling workers see the marker; the last one out forwards it downstream
+                source.put(_DONE)
+                with stage._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    output.put(_DONE)
+                return
+
+            sequence, item = entry
+            if not stage.ordered:
+                output.put((sequence, stage._run(item) if item is not None else None))
+                continue
+
+            # Reorder buffer: hold early arrivals until the next expected sequence shows up
+            pending[sequence] = item
+            while next_sequence in pending:
+                item = pending.pop(next_sequence)
+                output.put((next_sequence, stage._run(item) if item is not None else None))
+                next_sequence += 1
+
+    def log_stats(self):
+        for stage in self.stages:
+            stats = stage.stats(self.elapsed)
+            logger.info(
+                f"Stage {stage.name}: {stats['processed']} items ({stats['dropped']} dropped, "
+                f"{stats['errors']} errors) on {stats['workers']} worker(s), "
+                f"{stats['throughput']:.2f} items/s, busy {stats['busy_seconds']:.1f}s, "
+                f"queue depth avg {stats['avg_queue_depth']:.1f} / max {stats['max_queue_depth']}"
+            )
+        logger.info(f"Pipeline finished in {self.elapsed:.1f}s.")
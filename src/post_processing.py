@@ -0,0 +1,272 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger("PostProcessing")
+
+DEFAULT_QUEUE_PATH = os.path.join("data", "post_processing.db")
+# Finished jobs are kept this long so a resumed cycle does not enqueue them again
+DONE_RETENTION_SECONDS = 7 * 24 * 3600
+JOB_COLUMNS = ("kind", "key", "payload", "status", "attempts", "available_at", "updated_at", "error")
+
+
+class StorageJobStore:
+    """Queue snapshot kept in the configured storage backend (Firestore or SQLite), so it survives a lost CI container."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def load(self):
+        return self.storage.load_post_processing_jobs()
+
+    def save(self, jobs):
+        self.storage.save_post_processing_jobs(jobs)
+
+    def delete(self, keys):
+        self.storage.delete_post_processing_jobs(keys)
+
+
+class PostProcessingQueue:
+    """
+    Durable local work queue (SQLite) for the slow steps after analysis: customer
+    notes, the digest email and the Slack fan-out. Jobs survive a crash and are picked
+    up by the next run; a job whose handler raises is retried with exponential backoff
+    until max_attempts. A key makes enqueueing idempotent (e.g. one digest per report).
+    With a store, jobs changed by this run are saved to it on close and stored jobs
+    are restored on open (restore=False only saves), so a run on a fresh machine
+    picks up what the last one left queued.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, workers=2, max_attempts=3, retry_seconds=30.0, clock=time.time,
+                 store=None, restore=True):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_seconds = float(retry_seconds)
+        self.clock = clock
+        self.store = store
+        self.handlers = {}
+        self.completed = 0
+        self.failed = 0
+        self._threads = []
+        self._stopping = False
+        self._condition = threading.Condition()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, key TEXT UNIQUE, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+            "available_at REAL NOT NULL, updated_at REAL NOT NULL, error TEXT)"
+        )
+        now = self.clock()
+        self.opened_at = now
+        if store is not None and restore:
+            self._restore(store)
+        # Jobs claimed by a run that died are handed out again
+        recovered = self.db.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'").rowcount
+        self.db.execute("DELETE FROM jobs WHERE status = 'done' AND updated_at < ?", (now - DONE_RETENTION_SECONDS,))
+        if recovered:
+            logger.info(f"Recovered {recovered} post-processing jobs interrupted by a previous run.")
+
+    def _restore(self, store):
+        """Adds the store's jobs missing locally; finished ones past the retention are deleted from it."""
+        try:
+            jobs = store.load()
+        except Exception as e:
+            logger.error(f"Could not load queued post-processing jobs, starting without them: {e}")
+            return
+        expired, restored = [], 0
+        for job in jobs:
+            if job.get('status') in ('done', 'failed') and job.get('updated_at', 0) < self.clock() - DONE_RETENTION_SECONDS:
+                expired.append(job['key'])
+                continue
+            restored += self.db.execute(
+                f"INSERT OR IGNORE INTO jobs ({', '.join(JOB_COLUMNS)}) VALUES ({', '.join('?' * len(JOB_COLUMNS))})",
+                tuple(job.get(column) for column in JOB_COLUMNS),
+            ).rowcount
+        if expired:
+            try:
+                store.delete(expired)
+            except Exception as e:
+                logger.warning(f"Could not prune {len(expired)} finished post-processing jobs from storage: {e}")
+        if restored:
+            logger.info(f"Restored {restored} post-processing jobs from storage.")
+
+    def _save(self):
+        """Saves the jobs this run enqueued or changed to the store; finished ones without their payload."""
+        rows = self.db.execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE updated_at >= ?", (self.opened_at,),
+        ).fetchall()
+        jobs = [dict(zip(JOB_COLUMNS, row)) for row in rows]
+        for job in jobs:
+            if job['status'] in ('done', 'failed'):
+                # Kept as a marker so the key stays deduplicated
+                job['payload'] = "{}"
+        try:
+            self.store.save(jobs)
+        except Exception as e:
+            logger.error(f"Could not save {len(jobs)} post-processing jobs to storage: {e}")
+
+    def register(self, kind, handler):
+        """handler(payload) runs a job of kind; raising marks the attempt failed."""
+        self.handlers[kind] = handler
+
+    def enqueue(self, kind, payload, key=None) -> bool:
+        """Queues a job; False when a job with the same key was already queued (or done)."""
+        now = self.clock()
+        # Unkeyed jobs get a unique key, which identifies them in the store
+        key = key or f"{kind}:{uuid.uuid4().hex}"
+        with self._condition:
+            inserted = self.db.execute(
+                "INSERT OR IGNORE INTO jobs (kind, key, payload, available_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, json.dumps(payload, default=str), now, now),
+            ).rowcount
+            self._condition.notify()
+        return bool(inserted)
+
+    def status(self, key):
+        """The status ('pending', 'running', 'done', 'failed') of the job with key, or None."""
+        with self._condition:
+            row = self.db.execute("SELECT status FROM jobs WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def counts(self):
+        with self._condition:
+            return dict(self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def _claim(self):
+        """Next due job with a registered handler, marked running; None if there is none."""
+        kinds = list(self.handlers)
+        if not kinds:
+            return None
+        row = self.db.execute(
+            f"SELECT id, kind, payload, attempts FROM jobs WHERE status = 'pending' AND available_at <= ? "
+            f"AND kind IN ({', '.join('?' * len(kinds))}) ORDER BY id LIMIT 1",
+            (self.clock(), *kinds),
+        ).fetchone()
+        if row:
+            self.db.execute("UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?", (self.clock(), row[0]))
+        return row
+
+    def _finish(self, job_id, attempts, error=None):
+        now = self.clock()
+        with self._condition:
+            if error is None:
+                self.db.execute("UPDATE jobs SET status = 'done', updated_at = ?, error = NULL WHERE id = ?", (now, job_id))
+                self.completed += 1
+            elif attempts >= self.max_attempts:
+                self.db.execute(
+                    "UPDATE jobs SET status = 'failed', attempts = ?, updated_at = ?, error = ? WHERE id = ?",
+                    (attempts, now, error, job_id),
+                )
+                self.failed += 1
+            else:
+                self.db.execute(
+                    "UPDATE jobs SET status = 'pending', attempts = ?, available_at = ?, updated_at = ?, error = ? "
+                    "WHERE id = ?",
+                    (attempts, now + self.retry_seconds * 2 ** (attempts - 1), now, error, job_id),
+                )
+            self._condition.notify_all()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                job = None
+                while not self._stopping:
+                    job = self._claim()
+                    if job:
+                        break
+                    # Woken by enqueue/finish; the timeout picks up retries coming due
+                    self._condition.wait(1.0)
+                if job is None:
+                    return
+            job_id, kind, payload, attempts = job
+            try:
+                self.handlers[kind](json.loads(payload))
+            except Exception as e:
+                logger.error(f"Post-processing job {kind} #{job_id} failed (attempt {attempts + 1}): {e}")
+                self._finish(job_id, attempts + 1, error=str(e))
+            else:
+                self._finish(job_id, attempts + 1)
+
+    def start(self):
+        """Starts the worker threads; jobs left over from earlier runs are processed too."""
+        with self._condition:
+            self._stopping = False
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"post-processing-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _outstanding(self):
+        kinds = list(self.handlers)
+        if not kinds:
+            return 0
+        return self.db.execute(
+            f"SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'running') AND kind IN ({', '.join('?' * len(kinds))})",
+            kinds,
+        ).fetchone()[0]
+
+    def drain(self, timeout=None) -> int:
+        """Waits until every runnable job finished (or timeout); returns the jobs still outstanding."""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                outstanding = self._outstanding()
+                if not outstanding or (end is not None and time.monotonic() >= end):
+                    return outstanding
+                wait = 1.0 if end is None else min(1.0, max(end - time.monotonic(), 0.0))
+                self._condition.wait(wait)
+
+    def stop(self):
+        """Stops the workers after their current job; queued jobs stay for the next run."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def close(self):
+        self.stop()
+        with self._condition:
+            if self.store is not None:
+                self._save()
+            self.db.close()
+
+    def log_summary(self):
+        counts = self.counts()
+        logger.info(
+            f"Post-processing: {self.completed} jobs completed, {self.failed} failed this run; "
+            f"{counts.get('pending', 0)} pending for the next run."
+        )
+
+
+def create_post_queue(config, storage=None, restore=True):
+    """
+    The post-processing queue described by config 'post_processing', or None when disabled.
+    With store "storage" (the default) it is snapshotted to the storage backend;
+    restore=False (e.g. for shards) saves leftover jobs without taking over stored ones.
+    """
+    queue_config = (config or {}).get('post_processing') or {}
+    if not queue_config.get('enabled'):
+        return None
+    store = None
+    if queue_config.get('store', 'storage') != 'local' and storage is not None:
+        store = StorageJobStore(storage)
+    return PostProcessingQueue(
+        path=queue_config.get('path') or DEFAULT_QUEUE_PATH,
+        workers=queue_config.get('workers', 2),
+        max_attempts=queue_config.get('max_attempts', 3),
+        retry_seconds=queue_config.get('retry_seconds', 30),
+        store=store,
+        restore=restore,
+    )
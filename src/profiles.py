@@ -0,0 +1,118 @@
+import logging
+import threading
+
+logger = logging.getLogger("Profiles")
+
+DEFAULT_PROFILE = "default"
+
+
+def _merge(base, override):
+    merged = dict(base or {})
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class Profile:
+    """
+    One team's view of the intelligence cycle: the sources it follows (by category
+    or name), its scope focus, freshness windows and notification targets. All
+    profiles share one fetch per page; analyses are shared between profiles whose
+    scopes and freshness are identical.
+    """
+
+    def __init__(self, name=DEFAULT_PROFILE, categories=None, sources=None, scopes=None, freshness=None,
+                 manual_freshness=None, manual_injections=True, notifications=None):
+        self.name = name
+        self.categories = set(categories or ())
+        self.sources = set(sources or ())
+        self.scopes = list(scopes or ())
+        self.freshness = freshness
+        self.manual_freshness = manual_freshness
+        self.manual_injections = manual_injections
+        self.notifications = notifications or {}
+
+    def applies_to(self, update) -> bool:
+        if update.get('is_manual_injection'):
+            return bool(self.manual_injections)
+        if self.categories and update.get('category', 'General') not in self.categories:
+            return False
+        return not self.sources or update.get('source') in self.sources
+
+    def freshness_for(self, sys_config, is_manual) -> str:
+        """The profile's freshness window, falling back to the dashboard's system config."""
+        if is_manual:
+            return self.manual_freshness or sys_config.get('manual_intelligence_freshness', '3 Months')
+        return self.freshness or sys_config.get('intelligence_freshness', '1 Month')
+
+    def notifier_config(self, config):
+        """The app config with this profile's notification overrides merged in."""
+        return {**config, "notifications": _merge(config.get('notifications'), self.notifications)}
+
+
+def load_profiles(config):
+    """
+    Profiles from config 'profiles'; a single default profile using the top-level
+    notifications when none are configured.
+    """
+    entries = (config or {}).get('profiles') or []
+    if not entries:
+        return [Profile()]
+    profiles = []
+    for entry in entries:
+        if not entry.get('name'):
+            raise ValueError("Every profile needs a name")
+        profiles.append(Profile(
+            name=entry['name'],
+            categories=entry.get('categories'),
+            sources=entry.get('sources'),
+            scopes=entry.get('scopes'),
+            freshness=entry.get('freshness'),
+            manual_freshness=entry.get('manual_freshness'),
+            manual_injections=entry.get('manual_injections', True),
+            notifications=entry.get('notifications'),
+        ))
+    names = [profile.name for profile in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Profile names must be unique, got {names}")
+    return profiles
+
+
+class AnalysisCache:
+    """
+    LLM analyses of one cycle keyed by (content hash, scopes, freshness days), so
+    profiles asking the same question about the same page share one call.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content_hash, scopes, freshness_days):
+        return content_hash, tuple(sorted(scopes or ())), freshness_days
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return analysis
+
+    def put(self, key, analysis):
+        with self._lock:
+            self._entries[key] = analysis
+
+    def log_stats(self):
+        logger.info(f"Shared analysis cache: {self.hits} hits, {self.misses} misses across profiles.")
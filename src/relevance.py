@@ -0,0 +1,392 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger("Relevance")
+
+DEFAULT_MODEL_PATH = os.path.join("data", "relevance_model.json")
+# The analyzer sends at most this much content to the LLM; samples keep the same view
+MAX_CONTENT_CHARS = 6000
+WORD_PATTERN = re.compile(r"[a-z][a-z0-9]+")
+
+
+def sample_id(update) -> str:
+    """Stored sample id: one verdict per content and scope set (the LLM's question)."""
+    scopes = "|".join(sorted(update.get('scopes') or []))
+    content = (update.get('content') or "")[:MAX_CONTENT_CHARS]
+    return hashlib.sha256(f"{scopes}\n{content}".encode("utf-8")).hexdigest()[:32]
+
+
+def make_sample(update, analysis) -> dict:
+    """A training sample: the content the LLM saw, its category and scopes, and the verdict."""
+    return {
+        "content": (update.get('content') or "")[:MAX_CONTENT_CHARS],
+        "source": update.get('source'),
+        "category": update.get('category', 'General'),
+        "scopes": list(update.get('scopes') or []),
+        "is_relevant": bool(analysis.get('is_relevant')),
+        "impact_level": analysis.get('impact_level'),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def sample_weight(sample) -> float:
+    """How many updates a sample stands for: 1, or 1/audit_rate for an audited would-skip update."""
+    return float(sample.get('weight') or 1.0)
+
+
+def sample_tokens(sample) -> list:
+    """
+    Words and word pairs of the content, plus indicator tokens for the category and
+    each scope: one model learns how relevance differs per category and scope set.
+    """
+    words = WORD_PATTERN.findall((sample.get('content') or "")[:MAX_CONTENT_CHARS].lower())
+    tokens = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    tokens.append(f"category={str(sample.get('category') or 'General').lower()}")
+    tokens.extend(f"scope={scope.lower()}" for scope in sample.get('scopes') or [])
+    return tokens
+
+
+class TfidfVectorizer:
+    """Sublinear TF-IDF over a document-frequency-pruned vocabulary, L2-normalized rows."""
+
+    def __init__(self, min_df=2, max_features=5000, vocabulary=None, idf=None):
+        self.min_df = min_df
+        self.max_features = max_features
+        self.vocabulary = vocabulary or {}
+        self.idf = idf
+
+    def fit(self, documents):
+        import numpy as np
+
+        frequencies = Counter(token for tokens in documents for token in set(tokens))
+        kept = [token for token, count in frequencies.items() if count >= self.min_df]
+        # Most frequent terms first; ties alphabetical so training is reproducible
+        kept = sorted(kept, key=lambda token: (-frequencies[token], token))[:self.max_features]
+        self.vocabulary = {token: index for index, token in enumerate(sorted(kept))}
+        count = len(documents)
+        self.idf = np.array([
+            math.log((1 + count) / (1 + frequencies[token])) + 1.0 for token in sorted(kept)
+        ])
+        return self
+
+    def transform(self, documents):
+        import numpy as np
+
+        matrix = np.zeros((len(documents), len(self.vocabulary)))
+        for row, tokens in enumerate(documents):
+            for token, count in Counter(tokens).items():
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    matrix[row, column] = (1.0 + math.log(count)) * self.idf[column]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1.0)
+
+
+class LogisticRegression:
+    """L2-regularized logistic regression fit by full-batch gradient descent, classes weighted equally."""
+
+    def __init__(self, l2=1e-4, learning_rate=2.0, iterations=1500, weights=None, bias=0.0):
+        self.l2 = l2
+        self.learning_rate = learning_rate
+        self.iterations = iterations
+        self.weights = weights
+        self.bias = bias
+
+    def fit(self, matrix, labels, weights=None):
+        import numpy as np
+
+        labels = np.asarray(labels, dtype=float)
+        weights = np.ones(len(labels)) if weights is None else np.asarray(weights, dtype=float)
+        total, positives = weights.sum(), (weights * labels).sum()
+        # Balanced class weights: the rarer class (usually relevant) counts as much as the other
+        sample_weights = weights * np.where(
+            labels == 1, total / (2 * max(positives, 1e-9)), total / (2 * max(total - positives, 1e-9)),
+        )
+        self.weights = np.zeros(matrix.shape[1])
+        self.bias = 0.0
+        for _ in range(self.iterations):
+            gradient = sample_weights * (self.predict_proba(matrix) - labels)
+            self.weights -= self.learning_rate * (matrix.T @ gradient / len(labels) + self.l2 * self.weights)
+            self.bias -= self.learning_rate * gradient.mean()
+        return self
+
+    def predict_proba(self, matrix):
+        import numpy as np
+
+        return 1.0 / (1.0 + np.exp(-np.clip(matrix @ self.weights + self.bias, -35, 35)))
+
+
+def calibrate_threshold(probabilities, labels, target_recall=0.98, max_threshold=0.5, weights=None):
+    """
+    Skip threshold for held-out scores: the highest one (at most max_threshold) that
+    still sends target_recall of the relevant updates to the LLM. Updates scoring
+    below it are skipped. Returns (threshold, metrics at that threshold).
+    """
+    weights = weights or [1.0] * len(labels)
+    positives = sorted((p, w) for p, label, w in zip(probabilities, labels, weights) if label)
+    if not positives:
+        return 0.0, threshold_metrics(probabilities, labels, 0.0, weights)
+    allowed = (1.0 - target_recall) * sum(w for _, w in positives) + 1e-9
+    missed, threshold = 0.0, positives[-1][0]
+    for probability, weight in positives:
+        if missed + weight > allowed:
+            threshold = probability
+            break
+        missed += weight
+    threshold = min(float(threshold), max_threshold)
+    return threshold, threshold_metrics(probabilities, labels, threshold, weights)
+
+
+def threshold_metrics(probabilities, labels, threshold, weights=None):
+    """
+    Precision/recall of the 'relevant' prediction (score >= threshold) and how many
+    updates are skipped, each sample counted with its weight (see sample_weight).
+    """
+    weights = weights or [1.0] * len(labels)
+    kept = [(bool(label), w) for p, label, w in zip(probabilities, labels, weights) if p >= threshold]
+    skipped = [(bool(label), w) for p, label, w in zip(probabilities, labels, weights) if p < threshold]
+    kept_total, kept_relevant = sum(w for _, w in kept), sum(w for label, w in kept if label)
+    skipped_total, skipped_relevant = sum(w for _, w in skipped), sum(w for label, w in skipped if label)
+    positives = kept_relevant + skipped_relevant
+    return {
+        "threshold": round(threshold, 4),
+        "samples": len(labels),
+        "precision": round(kept_relevant / kept_total, 4) if kept_total else 0.0,
+        "recall": round(kept_relevant / positives, 4) if positives else 1.0,
+        "skip_rate": round(skipped_total / (kept_total + skipped_total), 4) if labels else 0.0,
+        # Relevant updates the gate would have skipped (the cost of the savings)
+        "missed_relevant": round(skipped_relevant, 2),
+        "skip_precision": round((skipped_total - skipped_relevant) / skipped_total, 4) if skipped_total else 1.0,
+    }
+
+
+class RelevanceModel:
+    """TF-IDF + logistic regression relevance scorer with its calibrated skip threshold."""
+
+    def __init__(self, vectorizer, classifier, threshold=0.0, metrics=None, trained_at=None):
+        self.vectorizer = vectorizer
+        self.classifier = classifier
+        self.threshold = threshold
+        self.metrics = metrics or {}
+        self.trained_at = trained_at
+
+    def scores(self, samples):
+        return [float(p) for p in self.classifier.predict_proba(
+            self.vectorizer.transform([sample_tokens(sample) for sample in samples])
+        )]
+
+    def score(self, sample) -> float:
+        return self.scores([sample])[0]
+
+    def to_dict(self):
+        return {
+            "vocabulary": sorted(self.vectorizer.vocabulary, key=self.vectorizer.vocabulary.get),
+            "idf": [round(float(value), 6) for value in self.vectorizer.idf],
+            "weights": [round(float(value), 6) for value in self.classifier.weights],
+            "bias": float(self.classifier.bias),
+            "threshold": self.threshold,
+            "metrics": self.metrics,
+            "trained_at": self.trained_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        import numpy as np
+
+        vectorizer = TfidfVectorizer(
+            vocabulary={token: index for index, token in enumerate(data["vocabulary"])},
+            idf=np.array(data["idf"]),
+        )
+        classifier = LogisticRegression(weights=np.array(data["weights"]), bias=data["bias"])
+        return cls(vectorizer, classifier, data["threshold"], data.get("metrics"), data.get("trained_at"))
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def in_validation(sample, fraction=0.25) -> bool:
+    """Stable held-out assignment by sample id, so later evaluations exclude the training split."""
+    return int(sample_id(sample)[:8], 16) / 0xFFFFFFFF < fraction
+
+
+def split_samples(samples, validation_fraction=0.25):
+    train = [sample for sample in samples if not in_validation(sample, validation_fraction)]
+    validation = [sample for sample in samples if in_validation(sample, validation_fraction)]
+    return train, validation
+
+
+def train_model(samples, validation_fraction=0.25, target_recall=0.98, max_threshold=0.5, min_samples=40,
+                min_df=2, max_features=5000):
+    """
+    Fits the model on the training split and calibrates its skip threshold on the
+    held-out rest. Raises ValueError when there is too little data of either verdict.
+    """
+    positives = sum(1 for sample in samples if sample.get('is_relevant'))
+    if len(samples) < min_samples or positives < 5 or len(samples) - positives < 5:
+        raise ValueError(
+            f"Need at least {min_samples} samples with 5 of each verdict; have {len(samples)} ({positives} relevant)."
+        )
+    train, validation = split_samples(samples, validation_fraction)
+    if not any(sample.get('is_relevant') for sample in validation):
+        raise ValueError("No relevant sample was held out for calibration; collect more samples.")
+    tokens = [sample_tokens(sample) for sample in train]
+    vectorizer = TfidfVectorizer(min_df=min_df, max_features=max_features).fit(tokens)
+    classifier = LogisticRegression().fit(
+        vectorizer.transform(tokens), [1 if sample.get('is_relevant') else 0 for sample in train],
+        weights=[sample_weight(sample) for sample in train],
+    )
+    model = RelevanceModel(vectorizer, classifier, trained_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+    labels = [bool(sample.get('is_relevant')) for sample in validation]
+    model.threshold, metrics = calibrate_threshold(
+        model.scores(validation), labels, target_recall, max_threshold,
+        weights=[sample_weight(sample) for sample in validation],
+    )
+    model.metrics = {
+        **metrics, "train_samples": len(train), "target_recall": target_recall,
+        "validation_fraction": validation_fraction,
+    }
+    return model
+
+
+def evaluate_model(model, samples):
+    """Metrics of the model's threshold on samples, overall and per category."""
+    scores = model.scores(samples)
+    report = {"overall": threshold_metrics(
+        scores, [bool(s.get('is_relevant')) for s in samples], model.threshold, [sample_weight(s) for s in samples],
+    )}
+    categories = sorted({sample.get('category') or 'General' for sample in samples})
+    for category in categories:
+        rows = [(score, bool(s.get('is_relevant')), sample_weight(s)) for score, s in zip(scores, samples)
+                if (s.get('category') or 'General') == category]
+        report[category] = threshold_metrics(
+            [p for p, _, _ in rows], [label for _, label, _ in rows], model.threshold, [w for _, _, w in rows],
+        )
+    return report
+
+
+class RelevanceGate:
+    """
+    Local pre-LLM relevance screen. Fresh LLM verdicts are stored as training samples
+    (collect_samples); with a trained model, updates scoring below its calibrated
+    threshold are treated as irrelevant without an LLM call. An audit_rate share of
+    those still goes to the LLM: their verdicts are stored with weight 1/audit_rate,
+    so the samples keep representing skipped updates and the model's real miss rate
+    stays measurable. Manual injections are always analyzed, and never used as samples.
+    """
+
+    def __init__(self, storage=None, model=None, collect_samples=True, audit_rate=0.0):
+        self.storage = storage
+        self.model = model
+        self.collect_samples = collect_samples
+        self.audit_rate = audit_rate
+        self.stats = {"screened": 0, "skipped": 0, "audited": 0, "audit_relevant": 0, "samples": 0}
+        self._lock = threading.Lock()
+
+    def score(self, update) -> float:
+        # Cached on the update: needs_llm and analyze both ask about the same update
+        if 'relevance_score' not in update:
+            update['relevance_score'] = self.model.score(update)
+        return update['relevance_score']
+
+    def audited(self, update) -> bool:
+        """Stable per-update audit pick (independent of the in_validation split)."""
+        return int(sample_id(update)[8:16], 16) / 0xFFFFFFFF < self.audit_rate
+
+    def below_threshold(self, update) -> bool:
+        if self.model is None or update.get('is_manual_injection'):
+            return False
+        return self.score(update) < self.model.threshold
+
+    def would_skip(self, update) -> bool:
+        return self.below_threshold(update) and not self.audited(update)
+
+    def screen(self, update):
+        """The stand-in analysis for an update the model is confident is irrelevant, else None."""
+        if self.model is None or update.get('is_manual_injection'):
+            return None
+        below = self.below_threshold(update)
+        audit = below and self.audited(update)
+        with self._lock:
+            self.stats["screened"] += 1
+            self.stats["skipped"] += int(below and not audit)
+            self.stats["audited"] += int(audit)
+        score = self.score(update)
+        if audit:
+            update['relevance_audit'] = True
+            logger.info(f"Auditing {update['source']} with the LLM despite local relevance score {score:.3f}.")
+            return None
+        if not below:
+            return None
+        logger.info(f"Skipping {update['source']}: local relevance score {score:.3f} < {self.model.threshold:.3f}.")
+        return {
+            "summary": "Filtered by the local relevance model (not relevant)",
+            "impact_level": "Low",
+            "type": "Info",
+            "is_relevant": False,
+            "relevance_score": round(score, 4),
+        }
+
+    def record(self, update, analysis):
+        """Stores a fresh LLM verdict as a training sample (not triage-filtered or errored ones)."""
+        if not (self.collect_samples and self.storage) or update.get('is_manual_injection'):
+            return
+        if analysis.get('type') == "Error" or "triage" in analysis:
+            return
+        sample = make_sample(update, analysis)
+        if update.get('relevance_audit'):
+            sample.update({"audit": True, "weight": 1.0 / self.audit_rate, "relevance_score": update['relevance_score']})
+            with self._lock:
+                self.stats["audit_relevant"] += int(sample["is_relevant"])
+        self.storage.save_relevance_sample(sample_id(update), sample)
+        with self._lock:
+            self.stats["samples"] += 1
+
+    def log_summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+        if self.model is not None:
+            logger.info(
+                f"Relevance model: {stats['skipped']} of {stats['screened']} updates skipped below "
+                f"threshold {self.model.threshold:.3f}; {stats['audited']} audited by the LLM, "
+                f"{stats['audit_relevant']} of them relevant; {stats['samples']} new training samples."
+            )
+            if stats["audit_relevant"]:
+                logger.warning(
+                    f"The LLM found {stats['audit_relevant']} audited updates relevant that the relevance model "
+                    f"would have skipped; check `scripts/train_relevance_model.py evaluate` and retrain."
+                )
+        elif stats["samples"]:
+            logger.info(f"Relevance model: no model loaded; {stats['samples']} new training samples.")
+
+
+def create_relevance_gate(config, storage):
+    """The relevance gate described by config 'relevance_model', or None when disabled."""
+    relevance_config = (config or {}).get('relevance_model') or {}
+    if not relevance_config.get('enabled'):
+        return None
+    model = None
+    path = relevance_config.get('path') or DEFAULT_MODEL_PATH
+    if relevance_config.get('skip_irrelevant', True) and os.path.exists(path):
+        try:
+            model = RelevanceModel.load(path)
+            logger.info(f"Loaded relevance model trained {model.trained_at} (skip threshold {model.threshold:.3f}).")
+        except Exception as e:
+            logger.error(f"Could not load relevance model {path}; every update goes to the LLM: {e}")
+    return RelevanceGate(
+        storage, model, collect_samples=relevance_config.get('collect_samples', True),
+        audit_rate=relevance_config.get('audit_rate', 0.05),
+    )
@@ -0,0 +1,146 @@
+import time
+import urllib.parse
+import zlib
+from collections import Counter
+from datetime import datetime
+
+# Firestore rejects documents over 1 MiB; compressed section payloads are split well below it
+MAX_DOCUMENT_BYTES = 1024 * 1024
+MAX_SECTION_BYTES = 512 * 1024
+REPORT_FORMAT = "chunked-zlib"
+SECTION_ENCODING = "zlib"
+
+
+def format_report_title(now=None, heading="Intelligence Discovery Report") -> str:
+    now = now or time.localtime()
+    return (
+        f"# {heading}\n\n"
+        f"**Date:** {time.strftime('%Y-%m-%d %H:%M:%S', now)}\n\n"
+    )
+
+
+def format_alert_section(alert: dict) -> str:
+    """Markdown block for one alert, in the layout the dashboard's report parser expects."""
+    deep_link = alert['url']
+    if alert.get('exact_quote'):
+        deep_link = f"{alert['url']}#:~:text={urllib.parse.quote(alert['exact_quote'])}"
+
+    section = f"## {alert['source']}\n"
+    section += f"**Release Date:** {alert['release_date']} | **Type:** {alert['type']} | **Impact:** {alert['impact_level']}\n"
+    section += f"**Source:** [View Documentation]({deep_link})\n\n"
+    section += f"### Summary\n{alert['summary']}\n\n"
+    section += "### Technical Details\n"
+    for detail in alert.get('details', []):
+        section += f"- {detail}\n"
+    section += f"\n### Logiwa Impact\n{alert.get('logiwa_impact')}\n\n"
+    section += f"### ✅ Recommended Action\n> {alert.get('action_required')}\n\n"
+    section += "---\n\n"
+    return section
+
+
+def compress_section(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 9)
+
+
+def decompress_section(data: bytes) -> str:
+    return zlib.decompress(bytes(data)).decode("utf-8")
+
+
+def build_report_header(name: str, alerts: list, title: str = "", status: str = "Ready", profile: str = None) -> dict:
+    """Small summary document listed by the dashboard; section bodies live in the subcollection."""
+    header = {
+        "name": name,
+        "status": status,
+        "format": REPORT_FORMAT,
+        "title": title,
+        "alert_count": len(alerts),
+        "sources": sorted({alert['source'] for alert in alerts}),
+        "impact_counts": dict(Counter(alert.get('impact_level', 'Low') for alert in alerts)),
+        "status_counts": dict(Counter(alert.get('resolved_status', 'Unknown') for alert in alerts)),
+    }
+    if profile:
+        header["profile"] = profile
+    return header
+
+
+def build_report_sections(alert_sections: list, customer_content: str = "", alerts: list = None,
+                          max_section_bytes: int = MAX_SECTION_BYTES) -> list:
+    """
+    Compresses each alert section (and the customer notes) into section documents.
+    A payload larger than max_section_bytes is split into numbered parts.
+    Documents are returned in read order.
+    """
+    alerts = alerts or [{}] * len(alert_sections)
+    entries = [
+        ("alert", text, {"source": alert.get('source'), "impact_level": alert.get('impact_level')})
+        for text, alert in zip(alert_sections, alerts)
+    ]
+    if customer_content:
+        entries.append(("customer", customer_content, {}))
+
+    documents = []
+    for index, (kind, text, extra) in enumerate(entries):
+        documents.extend(_section_documents(index, kind, text, extra, max_section_bytes))
+    return documents
+
+
+def build_customer_sections(customer_content: str, index: int, max_section_bytes: int = MAX_SECTION_BYTES) -> list:
+    """Section documents for customer notes added to a saved report after its index alert sections."""
+    return list(_section_documents(index, "customer", customer_content, {}, max_section_bytes))
+
+
+def _section_documents(index, kind, text, extra, max_section_bytes):
+    payload = compress_section(text)
+    parts = [payload[start:start + max_section_bytes] for start in range(0, len(payload), max_section_bytes)]
+    for part, chunk in enumerate(parts):
+        yield {
+            "index": index,
+            "part": part,
+            "part_count": len(parts),
+            "kind": kind,
+            "encoding": SECTION_ENCODING,
+            "raw_size": len(text.encode("utf-8")),
+            "data": chunk,
+            **extra,
+        }
+
+
+def section_document_id(section: dict) -> str:
+    # Zero-padded so document-id order is read order
+    return f"{section['index']:05d}-{section['part']:03d}"
+
+
+def assemble_sections(documents, kind=None):
+    """
+    Yields (index, kind, text) from section documents in read order, joining split
+    parts. Works on a lazy iterable, holding only one section's parts at a time.
+    """
+    current = None
+    parts = []
+    for doc in documents:
+        if kind and doc.get('kind') != kind:
+            continue
+        if current is not None and doc['index'] != current['index']:
+            yield current['index'], current['kind'], decompress_section(b"".join(parts))
+            parts = []
+        current = doc
+        parts.append(bytes(doc['data']))
+    if current is not None:
+        yield current['index'], current['kind'], decompress_section(b"".join(parts))
+
+
+def estimate_document_size(value) -> int:
+    """Approximate Firestore storage size of a document's data, per the documented sizing rules."""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, datetime)):
+        return 8
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_document_size(str(key)) + estimate_document_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_document_size(item) for item in value)
+    return 16
@@ -0,0 +1,132 @@
+import heapq
+import logging
+import threading
+import time
+
+logger = logging.getLogger("Scheduling")
+
+# Rough prompt size on top of the page content (instructions, scopes, schema)
+PROMPT_OVERHEAD_TOKENS = 1500
+CHARS_PER_TOKEN = 4
+IMPACT_RATE_ALPHA = 0.3
+
+
+def estimate_tokens(update, overhead=PROMPT_OVERHEAD_TOKENS) -> int:
+    """Token estimate for analyzing an update; providers bill by tokens but report them inconsistently."""
+    return len(update.get('content') or "") // CHARS_PER_TOKEN + overhead
+
+
+def next_impact_rate(previous, analysis, alpha=IMPACT_RATE_ALPHA) -> float:
+    """
+    Moving average of how often a source's changes turn out to be relevant
+    High/Medium findings; recent analyses weigh alpha, older history 1 - alpha.
+    """
+    impactful = bool(analysis.get('is_relevant')) and analysis.get('impact_level') in ("High", "Medium")
+    if previous is None:
+        return 1.0 if impactful else 0.0
+    return round((1 - alpha) * float(previous) + alpha * (1.0 if impactful else 0.0), 4)
+
+
+class CycleBudget:
+    """
+    Per-cycle limits on LLM calls, estimated tokens and wall time. admit() reserves
+    an update's calls before they are made; once any limit is reached every further
+    update is refused and stays deferred for the next cycle.
+    """
+
+    def __init__(self, max_calls=None, max_tokens=None, max_seconds=None, clock=time.monotonic):
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.clock = clock
+        self.started = clock()
+        self.calls = 0
+        self.tokens = 0
+        self.exhausted_by = None
+        self._lock = threading.Lock()
+
+    def elapsed(self):
+        return self.clock() - self.started
+
+    def admit(self, tokens=0, calls=1) -> bool:
+        with self._lock:
+            if self.exhausted_by is None:
+                if self.max_calls is not None and self.calls + calls > self.max_calls:
+                    self.exhausted_by = "calls"
+                elif self.max_tokens is not None and self.calls and self.tokens + tokens > self.max_tokens:
+                    # The first call is always admitted, however large the update
+                    self.exhausted_by = "tokens"
+                elif self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+                    self.exhausted_by = "time"
+            if self.exhausted_by:
+                return False
+            self.calls += calls
+            self.tokens += tokens
+            return True
+
+    def summary(self):
+        with self._lock:
+            limits = f"{self.calls}/{self.max_calls or '-'} calls, {self.tokens}/{self.max_tokens or '-'} tokens"
+            state = f"exhausted by {self.exhausted_by}" if self.exhausted_by else "not exhausted"
+        return f"{limits}, {self.elapsed():.0f}/{self.max_seconds or '-'}s ({state})"
+
+
+class UpdateScheduler:
+    """
+    Orders a cycle's candidate updates by priority: the source category weight scaled
+    by the source's historical impact rate, or the priority set on a manual injection.
+    Equal priorities keep their input order.
+    """
+
+    def __init__(self, budget=None, category_weights=None, injection_weights=None, default_weight=1.0,
+                 prompt_overhead_tokens=PROMPT_OVERHEAD_TOKENS):
+        self.budget = budget
+        self.category_weights = category_weights or {}
+        self.injection_weights = injection_weights or {}
+        self.default_weight = float(default_weight)
+        self.prompt_overhead_tokens = prompt_overhead_tokens
+
+    def priority(self, update) -> float:
+        if update.get('is_manual_injection'):
+            level = update.get('priority') or "Medium"
+            return float(self.injection_weights.get(level, self.default_weight))
+        weight = float(self.category_weights.get(update.get('category', 'General'), self.default_weight))
+        # Sources with no history yet rank as if half their changes mattered
+        rate = update.get('impact_rate')
+        return weight * (1.0 + (0.5 if rate is None else float(rate)))
+
+    def order(self, updates):
+        """Yields updates highest priority first (a heap, so input order breaks ties)."""
+        heap = [(-self.priority(update), sequence, update) for sequence, update in enumerate(updates)]
+        heapq.heapify(heap)
+        while heap:
+            yield heapq.heappop(heap)[2]
+
+    def admit(self, update, calls=1) -> bool:
+        """Reserves budget for calls analyses of update (one per distinct profile question); False once spent."""
+        if self.budget is None:
+            return True
+        return self.budget.admit(estimate_tokens(update, self.prompt_overhead_tokens) * calls, calls)
+
+    def log_summary(self):
+        if self.budget:
+            logger.info(f"Cycle budget: {self.budget.summary()}.")
+
+
+def create_scheduler(config):
+    """The update scheduler described by config 'cycle_budget', or None when disabled."""
+    budget_config = (config or {}).get('cycle_budget') or {}
+    if not budget_config.get('enabled'):
+        return None
+    budget = CycleBudget(
+        max_calls=budget_config.get('max_llm_calls'),
+        max_tokens=budget_config.get('max_tokens'),
+        max_seconds=budget_config.get('max_seconds'),
+    )
+    return UpdateScheduler(
+        budget,
+        category_weights=budget_config.get('category_weights'),
+        injection_weights=budget_config.get('injection_weights'),
+        default_weight=budget_config.get('default_weight', 1.0),
+        prompt_overhead_tokens=budget_config.get('prompt_overhead_tokens', PROMPT_OVERHEAD_TOKENS),
+    )
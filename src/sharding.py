@@ -0,0 +1,105 @@
+import bisect
+import hashlib
+import json
+import os
+import time
+
+from src.profiles import DEFAULT_PROFILE
+from src.report_utils import compress_section, decompress_section
+
+
+def parse_shard(value: str) -> tuple:
+    """Parses "i/N" (0 <= i < N) into (i, N)."""
+    try:
+        index, count = (int(part) for part in value.split("/", 1))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Shard must look like i/N, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must satisfy 0 <= i < N, got {value!r}")
+    return index, count
+
+
+def _point(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring over shards 0..N-1 with virtual nodes. Going from N to N+1
+    shards only moves the keys the new shard takes over (about 1/(N+1) of them).
+    """
+
+    def __init__(self, shard_count: int, vnodes: int = 128):
+        self.shard_count = shard_count
+        ring = sorted(
+            (_point(f"shard-{shard}#{vnode}"), shard)
+            for shard in range(shard_count)
+            for vnode in range(vnodes)
+        )
+        self._points = [point for point, _ in ring]
+        self._shards = [shard for _, shard in ring]
+
+    def shard_for(self, key: str) -> int:
+        position = bisect.bisect(self._points, _point(key)) % len(self._points)
+        return self._shards[position]
+
+
+def source_key(source: dict) -> str:
+    # Firestore document id when present, so renaming a source does not move it
+    return str(source.get("id") or source.get("url") or source.get("name"))
+
+
+def select_shard(items, index: int, count: int, key=source_key):
+    """Yields the items (sources or manual injections) owned by shard index of count."""
+    if count <= 1:
+        yield from items
+        return
+    ring = HashRing(count)
+    for item in items:
+        if ring.shard_for(key(item)) == index:
+            yield item
+
+
+def default_run_id() -> str:
+    """Shared by all shard jobs of one CI pipeline; falls back to the UTC date for local runs."""
+    return (
+        os.getenv("GITHUB_RUN_ID")
+        or os.getenv("CI_PIPELINE_ID")
+        or time.strftime("%Y%m%d", time.gmtime())
+    )
+
+
+def encode_shard_result(index: int, count: int, profiles: dict) -> dict:
+    """Stores a shard's {profile: (alerts, sections)} compressed for the merge step."""
+    payload = json.dumps({
+        "profiles": {
+            name: {"alerts": alerts, "sections": sections}
+            for name, (alerts, sections) in profiles.items()
+        }
+    })
+    return {
+        "shard": index,
+        "shard_count": count,
+        "alert_count": sum(len(alerts) for alerts, _ in profiles.values()),
+        "encoding": "zlib",
+        "data": compress_section(payload),
+    }
+
+
+def merge_shard_results(results: list, count: int) -> tuple:
+    """
+    Combines per-shard results in shard order into ({profile: (alerts, sections)}, missing_shards).
+    Duplicate results for a shard (a retried job) keep the last one.
+    """
+    by_shard = {result["shard"]: result for result in results if result.get("shard_count") == count}
+    profiles = {}
+    for shard in sorted(by_shard):
+        payload = json.loads(decompress_section(by_shard[shard]["data"]))
+        # Results stored before profiles existed hold a single alert set
+        shard_profiles = payload.get("profiles") or {DEFAULT_PROFILE: payload}
+        for name, result in shard_profiles.items():
+            alerts, sections = profiles.setdefault(name, ([], []))
+            alerts.extend(result["alerts"])
+            sections.extend(result["sections"])
+    missing = [shard for shard in range(count) if shard not in by_shard]
+    return profiles, missing
@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from src.latency_utils import LatencyTracker
+
+logger = logging.getLogger("SourceHealth")
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+QUARANTINED = "quarantined"
+MAX_ERROR_MESSAGE = 300
+
+
+def classify_error(error) -> str:
+    """Short error class stored in a source's health: timeout, connection, http_<status>, ..."""
+    if isinstance(error, requests.Timeout):
+        return "timeout"
+    if isinstance(error, requests.ConnectionError):
+        return "connection"
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return f"http_{error.response.status_code}"
+    if isinstance(error, requests.TooManyRedirects):
+        return "redirects"
+    return "error"
+
+
+def _milliseconds(value):
+    return None if value is None else int(value)
+
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class SourceHealthTracker:
+    """
+    Per-cycle fetch health of monitored sources: latency percentiles over the last
+    latency_window fetches, the last error class and consecutive failures, kept in a
+    `health` field on each monitored_urls entry. After quarantine_after consecutive
+    failures a source is skipped until its re-probe is due; every failed re-probe
+    doubles the interval (probe_interval_hours, at most max_probe_interval_hours).
+    One successful fetch clears the quarantine.
+    """
+
+    def __init__(self, quarantine_after=3, probe_interval_hours=6.0, max_probe_interval_hours=168.0,
+                 latency_window=20, clock=time.time):
+        self.quarantine_after = quarantine_after
+        self.probe_interval_hours = float(probe_interval_hours)
+        self.max_probe_interval_hours = float(max_probe_interval_hours)
+        self.latency_window = latency_window
+        self.clock = clock
+        self.updates = {}
+        self.skipped = []
+        self._lock = threading.Lock()
+
+    def now(self):
+        return datetime.fromtimestamp(self.clock(), timezone.utc)
+
+    @staticmethod
+    def stored(source):
+        """The source's stored health; a source whose URL was edited since starts over."""
+        health = source.get('health') or {}
+        return health if health.get('url') in (None, source.get('url')) else {}
+
+    def quarantined(self, source) -> bool:
+        """True while a quarantined source's next re-probe is not yet due."""
+        health = self.stored(source)
+        until = _parse_time(health.get('quarantined_until'))
+        return health.get('state') == QUARANTINED and until is not None and self.now() < until
+
+    def admit(self, sources):
+        """The sources to fetch this cycle; quarantined ones are skipped (and logged) until their re-probe."""
+        admitted = []
+        for source in sources:
+            if self.quarantined(source):
+                health = self.stored(source)
+                logger.info(
+                    f"Skipping quarantined source {source['name']} ({health.get('last_error')}, "
+                    f"{health.get('consecutive_failures')} failures); re-probe after {health.get('quarantined_until')}."
+                )
+                self.skipped.append(source['name'])
+            else:
+                admitted.append(source)
+        return admitted
+
+    def record(self, source, seconds, error=None, message=None):
+        """Records one fetch of source (error: its class, None on success); returns the new health."""
+        previous = self.stored(source)
+        now = self.now()
+        latencies = LatencyTracker(window=self.latency_window)
+        for sample in previous.get('latency_samples') or []:
+            latencies.record(sample)
+        if error is None:
+            latencies.record(round(seconds * 1000))
+
+        health = {
+            "url": source.get('url'),
+            "last_checked": now.isoformat(timespec="seconds"),
+            "last_success": previous.get('last_success'),
+            "checks": int(previous.get('checks') or 0) + 1,
+            "failures": int(previous.get('failures') or 0) + (1 if error else 0),
+            "latency_samples": [int(sample) for sample in latencies.samples()],
+            "latency_ms": {
+                "p50": _milliseconds(latencies.percentile(50)),
+                "p95": _milliseconds(latencies.percentile(95)),
+            },
+        }
+        if error is None:
+            health.update({
+                "state": HEALTHY, "consecutive_failures": 0, "last_success": health["last_checked"],
+                "last_error": None, "last_error_message": None, "quarantined_until": None,
+                "probe_interval_hours": None,
+            })
+        else:
+            failures = int(previous.get('consecutive_failures') or 0) + 1
+            health.update({
+                "state": DEGRADED, "consecutive_failures": failures, "last_error": error,
+                "last_error_message": (message or "")[:MAX_ERROR_MESSAGE] or None,
+                "quarantined_until": None, "probe_interval_hours": None,
+            })
+            if failures >= self.quarantine_after:
+                hours = min(
+                    self.probe_interval_hours * 2 ** (failures - self.quarantine_after), self.max_probe_interval_hours,
+                )
+                health.update({
+                    "state": QUARANTINED,
+                    "probe_interval_hours": hours,
+                    "quarantined_until": (now + timedelta(hours=hours)).isoformat(timespec="seconds"),
+                })
+                logger.warning(
+                    f"Quarantining {source['name']} after {failures} consecutive failures ({error}); "
+                    f"re-probe in {hours:g}h."
+                )
+        if source.get('id'):
+            with self._lock:
+                self.updates[source['id']] = health
+        return health
+
+    def flush(self, storage):
+        """Writes the cycle's health records next to their monitored_urls entries."""
+        with self._lock:
+            updates, self.updates = self.updates, {}
+        for source_id, health in updates.items():
+            storage.update_url_status(source_id, {"health": health})
+
+    def log_summary(self):
+        with self._lock:
+            states = [health["state"] for health in self.updates.values()]
+        logger.info(
+            f"Source health: {states.count(HEALTHY)} healthy, {states.count(DEGRADED)} degraded, "
+            f"{states.count(QUARANTINED)} quarantined; {len(self.skipped)} skipped in quarantine."
+        )
+
+
+def create_source_health(config):
+    """The source health tracker described by config 'source_health', or None when disabled."""
+    health_config = (config or {}).get('source_health') or {}
+    if not health_config.get('enabled'):
+        return None
+    return SourceHealthTracker(
+        quarantine_after=health_config.get('quarantine_after', 3),
+        probe_interval_hours=health_config.get('probe_interval_hours', 6),
+        max_probe_interval_hours=health_config.get('max_probe_interval_hours', 168),
+        latency_window=health_config.get('latency_window', 20),
+    )
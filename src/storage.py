@@ -0,0 +1,38 @@
+import logging
+import os
+
+from src.firebase_manager import FirebaseManager
+
+logger = logging.getLogger("Storage")
+
+
+def create_storage(config=None):
+    """
+    Returns the shared persistence backend for this process.
+    'firestore' (default) or 'sqlite', chosen by INTEL_STORAGE_BACKEND or config storage.backend.
+    """
+    config = config or {}
+    storage_config = config.get('storage') or {}
+    firestore_config = config.get('firestore') or {}
+    backend = (os.getenv("INTEL_STORAGE_BACKEND") or storage_config.get('backend') or 'firestore').lower()
+
+    options = {
+        "write_behind": firestore_config.get('write_behind', True),
+        "max_pending_writes": firestore_config.get('max_pending_writes', 200),
+        "max_write_age_seconds": firestore_config.get('max_write_age_seconds', 30),
+    }
+
+    if backend == 'sqlite':
+        from src.local_store import DEFAULT_SQLITE_PATH, SQLiteFirebaseManager
+        path = os.getenv("INTEL_SQLITE_PATH") or storage_config.get('sqlite_path') or DEFAULT_SQLITE_PATH
+        logger.info(f"Using local SQLite storage backend at {path}.")
+        return SQLiteFirebaseManager.shared(path=path, **options)
+
+    if backend != 'firestore':
+        logger.warning(f"Unknown storage backend '{backend}', falling back to Firestore.")
+
+    if firestore_config.get('async_writes'):
+        # Writes go through the AsyncClient in the background; the sync manager serves reads
+        from src.async_firebase_manager import BackgroundFirebaseManager
+        return BackgroundFirebaseManager(FirebaseManager.shared(**{**options, "write_behind": False}))
+    return FirebaseManager.shared(**options)
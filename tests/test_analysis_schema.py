@@ -0,0 +1,84 @@
+from src.analysis_schema import (
+    ANALYSIS_SCHEMA,
+    compile_schema,
+    gemini_response_schema,
+    openai_response_format,
+    validate_analysis,
+    validate_triage,
+)
+
+
+def test_validate_analysis_coerces_and_fills_defaults():
+    result, errors = validate_analysis({
+        "summary": "OAuth change",
+        "details": "Single detail",
+        "impact_level": "High (Breaking)",
+        "type": "Breaking Change",
+        "is_relevant": "true",
+        "release_date": 20260901,
+    })
+    assert errors == []
+    assert result["details"] == ["Single detail"]
+    assert result["impact_level"] == "High"
+    assert result["is_relevant"] is True
+    assert result["release_date"] == "20260901"
+    assert result["action_required"] == "Monitoring"
+    assert result["exact_quote"] == ""
+
+
+def test_validate_analysis_reports_missing_and_invalid_fields():
+    result, errors = validate_analysis({"summary": "x", "is_relevant": True, "details": {"nested": True}})
+    assert result["details"] == []
+    assert result["impact_level"] == "Low"
+    assert any("details" in error for error in errors)
+    assert any("type" in error for error in errors)
+
+
+def test_validate_analysis_needs_the_verdict():
+    # Without is_relevant or summary there is no analysis to default into; the caller retries
+    result, errors = validate_analysis({"summary": "x", "is_relevant": {"nested": True}, "impact_level": "High"})
+    assert result is None and any("is_relevant" in error for error in errors)
+    result, errors = validate_analysis({"is_relevant": True, "impact_level": "High", "type": "Info"})
+    assert result is None and errors == ["missing required field 'summary'"]
+
+
+def test_validate_analysis_rejects_non_objects():
+    assert validate_analysis(["not", "an", "object"]) == (None, ["result is not a JSON object"])
+
+
+def test_compile_schema_enum():
+    validate = compile_schema({
+        "properties": {"level": {"type": "string", "enum": ["Gold", "Silver"], "default": "Silver"}},
+    })
+    assert validate({"level": "gold medal"})[0]["level"] == "Gold"
+    assert validate({"level": "bronze"})[0]["level"] == "Silver"
+
+
+def test_provider_schemas_share_one_definition():
+    gemini = gemini_response_schema(ANALYSIS_SCHEMA)
+    assert set(gemini["properties"]) == set(ANALYSIS_SCHEMA["properties"])
+    assert "default" not in gemini["properties"]["details"]
+    assert gemini["properties"]["impact_level"]["enum"] == ["High", "Medium", "Low"]
+
+    openai_format = openai_response_format(ANALYSIS_SCHEMA, "update_analysis")
+    strict = openai_format["json_schema"]["schema"]
+    assert openai_format["type"] == "json_schema"
+    assert strict["additionalProperties"] is False
+    assert set(strict["required"]) == set(ANALYSIS_SCHEMA["properties"])
+    # The shared definition itself is never mutated
+    assert "additionalProperties" not in ANALYSIS_SCHEMA
+    assert "default" in ANALYSIS_SCHEMA["properties"]["details"]
+
+
+def test_validate_triage():
+    result, errors = validate_triage({"is_relevant": "no", "impact_level": "low", "confidence": "85%"})
+    assert errors == []
+    assert result == {"is_relevant": False, "impact_level": "Low", "confidence": 0.85}
+
+    result, errors = validate_triage({"is_relevant": False, "confidence": 7})
+    assert result["confidence"] == 1.0
+    assert result["impact_level"] == "Low"
+    assert any("impact_level" in error for error in errors)
+
+    # A missing verdict defaults to relevant so the update is escalated, not dropped
+    assert validate_triage({})[0]["is_relevant"] is True
@@ -0,0 +1,60 @@
+import asyncio
+
+from src.async_firebase_manager import BackgroundFirebaseManager
+from src.local_store import SQLiteFirebaseManager
+
+
+class FakeWriter:
+    """Stands in for AsyncFirebaseManager; the first write to each URL is the slowest."""
+
+    def __init__(self):
+        self.writes = []
+        self.failing = set()
+
+    async def update_url_hash(self, url_id, content_hash):
+        await asyncio.sleep(0.05 if content_hash.endswith("1") else 0)
+        if url_id in self.failing:
+            raise RuntimeError("unavailable")
+        self.writes.append((url_id, content_hash))
+
+    async def update_report(self, report_id, header_data, sections=None):
+        if report_id in self.failing:
+            raise RuntimeError("unavailable")
+        return True
+
+
+def _manager(tmp_path):
+    reader = SQLiteFirebaseManager(path=str(tmp_path / "store.db"), journal_path=str(tmp_path / "journal.jsonl"))
+    return BackgroundFirebaseManager(reader, writer=FakeWriter()), reader
+
+
+def test_writes_to_one_document_keep_submission_order(tmp_path):
+    manager, _ = _manager(tmp_path)
+    for version in (1, 2, 3):
+        manager.update_url_hash("a", f"h{version}")
+        manager.update_url_hash("b", f"h{version}")
+    assert manager.flush() == 0
+    writes = manager._async.writes
+    assert [h for url, h in writes if url == "a"] == ["h1", "h2", "h3"]
+    assert [h for url, h in writes if url == "b"] == ["h1", "h2", "h3"]
+    assert manager._tails == {}
+
+
+def test_failed_writes_are_reported_and_retried_through_the_journal(tmp_path):
+    manager, reader = _manager(tmp_path)
+    url_id = reader.add_document("monitored_urls", {"name": "UPS", "url": "https://u"})
+    manager._async.failing.add(url_id)
+    manager.update_url_hash(url_id, "h2")
+    manager.update_url_hash("ok", "h2")
+    assert manager.flush() == 1
+    # Retried by the reader's write-behind flush
+    assert reader._get_document("monitored_urls", url_id)["last_hash"] == "h2"
+    assert not (tmp_path / "journal.jsonl").exists()
+
+
+def test_update_report_returns_false_when_the_patch_fails(tmp_path):
+    manager, _ = _manager(tmp_path)
+    assert manager.update_report("r1", {"status": "Ready"}) is True
+    manager._async.failing.add("r2")
+    assert manager.update_report("r2", {"status": "Ready"}) is False
+    assert manager.flush() == 0
@@ -0,0 +1,77 @@
+from bs4 import BeautifulSoup
+
+from src.backfill import chunk_lines, detail_links, entry_id, find_next_page, segment_entries, walk_pages
+from src.fetcher import Fetcher
+
+CHANGELOG = """
+<html><body>
+<nav><a href="/">Home</a></nav>
+<h1>Changelog</h1>
+<p>Everything that changed.</p>
+<article><h2>Orders API v3</h2><p>New fulfillment fields.</p><a href="/changelog/orders-v3">Read more</a></article>
+<article><h2>Webhooks retry</h2><p>Retries back off exponentially.</p></article>
+<article><h2>Labels sunset</h2><p>The v1 label endpoint is removed.</p><a href="#top">Top</a></article>
+<div class="pagination"><a href="/changelog?page=2">Older posts</a></div>
+</body></html>
+"""
+
+
+class PagedFetcher(Fetcher):
+    """Serves canned pages instead of fetching them."""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+        self.fetched = []
+
+    def fetch_soup(self, url):
+        self.fetched.append(url)
+        html = self.pages.get(url)
+        return BeautifulSoup(html, "html.parser") if html else None
+
+
+def test_segment_entries_splits_at_the_repeated_heading_level():
+    entries = segment_entries(BeautifulSoup(CHANGELOG, "html.parser"))
+    assert [entry["title"] for entry in entries] == ["Orders API v3", "Webhooks retry", "Labels sunset"]
+    assert entries[0]["text"] == "Orders API v3\nNew fulfillment fields.\nRead more"
+    assert entries[0]["links"] == ["/changelog/orders-v3"]
+
+
+def test_segment_entries_without_headings_chunks_whole_lines():
+    soup = BeautifulSoup("<body><p>one</p><p>two</p><p>three</p></body>", "html.parser")
+    assert [entry["text"] for entry in segment_entries(soup, max_chars=8)] == ["one\ntwo", "three"]
+    assert list(chunk_lines(["a" * 10], 4)) == ["aaaa"]
+
+
+def test_find_next_page_and_detail_links():
+    soup = BeautifulSoup(CHANGELOG, "html.parser")
+    assert find_next_page(soup, "https://x.example/changelog") == "https://x.example/changelog?page=2"
+    rel = BeautifulSoup('<link rel="next" href="?page=3"><a href="/">Next</a>', "html.parser")
+    assert find_next_page(rel, "https://x.example/changelog?page=2") == "https://x.example/changelog?page=3"
+    assert find_next_page(BeautifulSoup("<a href='/a'>Docs</a>", "html.parser"), "https://x.example/") is None
+
+    entry = {"links": ["#top", "mailto:team@x.example", "/changelog/orders-v3", "/changelog/orders-v3#fields", "/a"]}
+    assert detail_links(entry, "https://x.example/changelog") == [
+        "https://x.example/changelog/orders-v3", "https://x.example/a",
+    ]
+
+
+def test_walk_pages_follows_pagination_until_a_repeat():
+    fetcher = PagedFetcher({
+        "https://x.example/changelog": CHANGELOG,
+        "https://x.example/changelog?page=2": (
+            "<body><h2>Old one</h2><p>a</p><h2>Old two</h2><p>b</p><a href='/changelog'>Older</a></body>"
+        ),
+    })
+    source = {"name": "X", "url": "https://x.example/changelog"}
+    pages = list(walk_pages(fetcher, source))
+    assert [url for url, _, _ in pages] == ["https://x.example/changelog", "https://x.example/changelog?page=2"]
+    assert [entry["title"] for entry in pages[1][2]] == ["Old one", "Old two"]
+    # The page text is what a cycle hashes: navigation stripped
+    assert "Home" not in pages[0][1]
+    assert len(list(walk_pages(fetcher, source, max_pages=1))) == 1
+
+
+def test_entry_id_ignores_whitespace():
+    assert entry_id("Orders  API\nv3") == entry_id("Orders API v3")
+    assert entry_id("Orders API v3").startswith("bf-")
@@ -0,0 +1,40 @@
+import json
+
+from src.bulk_import import ImportProgress, batched, injection_id, iter_injections
+
+
+def test_injection_id_ignores_whitespace_differences():
+    assert injection_id("New  label\\nAPI") != injection_id("New label API")
+    assert injection_id("New  label\nAPI ") == injection_id("New label API")
+    assert injection_id("New label API").startswith("imp-")
+
+
+def test_jsonl_import_skips_invalid_rows_and_repeats(tmp_path):
+    path = tmp_path / "changelog.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"source": "UPS", "content": "Label API v2", "priority": "High"}),
+        "{not json",
+        json.dumps({"source": "UPS", "content": ""}),
+        "",
+        json.dumps({"source": "UPS again", "content": "Label  API v2"}),
+        json.dumps({"source": "FedEx", "content": "Rates API sunset"}),
+    ]))
+    progress = ImportProgress()
+    injections = list(iter_injections(str(path), stats=progress))
+    assert [(i["source"], i["priority"]) for i in injections] == [("UPS", "High"), ("FedEx", "Low")]
+    assert injections[0]["id"] == injection_id("Label API v2")
+    assert injections[0]["imported_from"] == "changelog.jsonl"
+    assert (progress.counts["read"], progress.counts["invalid"], progress.counts["duplicates"]) == (5, 2, 1)
+
+
+def test_csv_import_handles_multiline_content(tmp_path):
+    path = tmp_path / "changelog.csv"
+    path.write_text('source,content,priority\nShopify,"Orders API\nnew field",Medium\nAmazon,Reports API,\n')
+    injections = list(iter_injections(str(path)))
+    assert [(i["source"], i["content"], i["priority"]) for i in injections] == [
+        ("Shopify", "Orders API\nnew field", "Medium"), ("Amazon", "Reports API", "Low"),
+    ]
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,73 @@
+from src.checkpoint import CycleCheckpoint, LocalCheckpointStore, StorageCheckpointStore
+from src.local_store import SQLiteFirebaseManager
+
+
+def _update(url_id, new_hash):
+    return {"id": url_id, "source": url_id.upper(), "url": f"https://{url_id}", "content": "c", "new_hash": new_hash}
+
+
+def _interrupted_cycle(store):
+    checkpoint = CycleCheckpoint(store)
+    assert checkpoint.begin("# Report 1\n\n") is False
+    checkpoint.record_analysis(_update("a", "h1"), {"summary": "A", "is_relevant": True})
+    checkpoint.record_pending(_update("a", "h1"), {"summary": "A"}, {"source": "A"})
+    checkpoint.record_notified(_update("a", "h1"), {"source": "A"}, "## A\n")
+    checkpoint.record_analysis(_update("b", "h2"), {"summary": "B", "is_relevant": False})
+    checkpoint.record_pending(_update("c", "h4"), {"summary": "C"}, {"source": "C"})
+    checkpoint.set("customer_notes", "notes")
+    return checkpoint.cycle_id
+
+
+def _assert_resumes(store, cycle_id):
+    resumed = CycleCheckpoint(store)
+    assert resumed.begin("# Report 2\n\n") is True
+    assert resumed.cycle_id == cycle_id
+    assert resumed.report_title == "# Report 1\n\n"
+    assert resumed.cached_analysis(_update("b", "h2")) == {"summary": "B", "is_relevant": False}
+    # Changed content is analyzed again
+    assert resumed.cached_analysis(_update("b", "h3")) is None
+    assert resumed.notified(_update("a", "h1")) == ({"source": "A"}, "## A\n")
+    assert resumed.notified(_update("b", "h2")) is None
+    assert resumed.completed_notifications() == ([{"source": "A"}], ["## A\n"])
+    # Alerted but never notified: replayed on resume, with the update fields notify needs
+    [(update, analysis, alert)] = resumed.pending_notifications()
+    assert update == {"id": "c", "source": "C", "url": "https://c", "new_hash": "h4"}
+    assert (analysis, alert) == ({"summary": "C"}, {"source": "C"})
+    assert resumed.get("customer_notes") == "notes"
+
+    resumed.complete()
+    fresh = CycleCheckpoint(store)
+    assert fresh.begin("# Report 3\n\n") is False
+    assert fresh.cycle_id != cycle_id
+    assert fresh.cached_analysis(_update("b", "h2")) is None
+
+
+def test_local_checkpoint_resumes_interrupted_cycle(tmp_path):
+    store = LocalCheckpointStore(str(tmp_path / "checkpoint.jsonl"))
+    cycle_id = _interrupted_cycle(store)
+    # A crash mid-write leaves a torn last line
+    with open(store.path, "a", encoding="utf-8") as handle:
+        handle.write('{"event": "analysis", "key"')
+    # The torn line is cut off on load, so an entry journaled after the restart is kept
+    restarted = CycleCheckpoint(store)
+    assert restarted.begin("# Report 2\n\n") is True
+    restarted.record_analysis(_update("d", "h5"), {"summary": "D", "is_relevant": False})
+    reloaded = CycleCheckpoint(store)
+    assert reloaded.begin("# Report 2\n\n") is True
+    assert reloaded.cached_analysis(_update("d", "h5")) == {"summary": "D", "is_relevant": False}
+    _assert_resumes(store, cycle_id)
+
+
+def test_storage_checkpoint_resumes_interrupted_cycle(tmp_path):
+    storage = SQLiteFirebaseManager(path=str(tmp_path / "store.db"), journal_path=str(tmp_path / "journal.jsonl"))
+    cycle_id = _interrupted_cycle(StorageCheckpointStore(storage))
+    _assert_resumes(StorageCheckpointStore(storage), cycle_id)
+
+
+def test_manual_injections_are_keyed_by_content(tmp_path):
+    checkpoint = CycleCheckpoint(LocalCheckpointStore(str(tmp_path / "checkpoint.jsonl")))
+    checkpoint.begin("# Report\n\n")
+    injection = {"id": "m1", "content": "pasted", "is_manual_injection": True}
+    checkpoint.record_analysis(injection, {"summary": "M"})
+    assert checkpoint.cached_analysis(dict(injection)) == {"summary": "M"}
+    assert checkpoint.cached_analysis({**injection, "content": "edited"}) is None
@@ -0,0 +1,274 @@
+import datetime
+import json
+import random
+import time
+
+import pytest
+
+import monitor_agent
+from src.deadline import Deadline
+from src.local_store import SQLiteFirebaseManager
+
+
+class NoWaitDeadline(Deadline):
+    """Skips the rate-limit sleeps."""
+
+    def sleep(self, seconds):
+        return not self.expired()
+
+
+class FakeFetcher:
+    """Every source changed once: its content ends with the source number."""
+
+    def check_source(self, source, force=False, pages=None, health=None):
+        time.sleep(random.random() * 0.005)
+        new_hash = f"h-{source['name']}"
+        if source.get('last_hash') == new_hash:
+            return None
+        return {
+            "id": source['id'], "source": source['name'], "url": source['url'], "category": source.get('category'),
+            "content": f"changelog {source['name']}", "new_hash": new_hash,
+        }
+
+    def check_sources(self, sources, force=False, pages=None, health=None):
+        return [update for update in map(self.check_source, sources) if update]
+
+
+class FakeAnalyzer:
+    """Deterministic analysis from the content's last digit: every fourth update is irrelevant."""
+
+    hedging_enabled = False
+    cascade_enabled = False
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze(self, content, base_url, freshness=30, scopes=None):
+        time.sleep(random.random() * 0.005)
+        self.calls.append(content)
+        number = int(content[-1])
+        return {
+            "is_relevant": number % 4 != 1,
+            "summary": f"summary of {content}",
+            "details": ["detail"],
+            "impact_level": ["High", "Low", "Medium"][number % 3],
+            "type": "Breaking Change",
+            "release_date": datetime.date.today().isoformat(),
+            "action_required": "Update the integration",
+            "logiwa_impact": "impact",
+            "exact_quote": "quote",
+            "source_url": "",
+        }
+
+    def generate_customer_notes(self, content):
+        return "customer notes"
+
+    def log_parse_stats(self):
+        pass
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def send_slack_alert(self, alert):
+        self.sent.append(("slack", alert['source']))
+        return True
+
+    def send_digest_email(self, alerts):
+        self.sent.append(("digest", [alert['source'] for alert in alerts]))
+        return True
+
+
+def _store(tmp_path, sources=10, injections=3):
+    store = SQLiteFirebaseManager(path=str(tmp_path / "intel.db"), journal_path=None)
+    for index in range(sources):
+        store.add_document(
+            "monitored_urls", {"name": f"S{index}", "url": f"https://s{index}.example", "category": "Carriers"},
+            doc_id=f"u{index}",
+        )
+    for index in range(injections):
+        store.add_document(
+            "manual_injections",
+            {"source": f"M{index}", "content": f"pasted {index}", "status": "Pending", "timestamp": index},
+            doc_id=f"m{index}",
+        )
+    return store
+
+
+def _run(config, store, notifier=None, analyzer=None):
+    notifier = notifier or FakeNotifier()
+    monitor_agent.run_cycle(
+        config, store, FakeFetcher(), analyzer or FakeAnalyzer(), notifier, is_manual=False, deadline=NoWaitDeadline(),
+    )
+    return notifier
+
+
+def _state(store):
+    """Source and injection documents (minus write times) and every stored report's sections."""
+    documents = {}
+    for collection in ("monitored_urls", "manual_injections"):
+        for doc_id, data in store._paginate_rows(collection, 100, sort_key="doc_id"):
+            documents[doc_id] = {key: value for key, value in data.items() if key != "processed_at"}
+    reports = [
+        (header["name"], header["alert_count"], [text for _, _, text in store.iter_report_sections(report_id)])
+        for report_id, header in store._paginate_rows("intel_reports", 100)
+    ]
+    return documents, sorted(reports)
+
+
+def test_staged_cycle_matches_the_serial_loop(tmp_path):
+    results = []
+    for enabled in (False, True):
+        store = _store(tmp_path / str(enabled))
+        config = {"pipeline": {"enabled": enabled, "queue_size": 2, "workers": {"fetch": 4, "analyze": 3}}}
+        notifier = _run(config, store)
+        results.append((notifier.sent, _state(store)))
+    serial, staged = results
+    assert staged == serial
+    sent, (documents, reports) = serial
+    # Updates ending in 1, 5 and 9 are irrelevant; Low ones (4, 7) skip Slack but reach the report
+    assert [source for kind, source in sent if kind == "slack"] == ["S0", "S2", "S3", "S6", "S8", "M0", "M2"]
+    assert documents["u4"]["last_hash"] == "h-S4" and documents["m1"]["status"] == "Processed"
+    assert len(reports) == 1 and reports[0][1] == 9
+
+
+def test_concurrent_import_reports_alerts_in_file_order(tmp_path):
+    path = tmp_path / "changelog.jsonl"
+    path.write_text("\n".join(json.dumps({"source": f"I{index}", "content": f"entry {index}"}) for index in range(40)))
+    store = _store(tmp_path, sources=0, injections=0)
+    notifier = FakeNotifier()
+    config = {"bulk_import": {"workers": 4, "batch_size": 7, "rate_limit_seconds": 0}}
+    progress = monitor_agent.import_injections(
+        config, {"storage": store, "analyzer": FakeAnalyzer(), "notifier": notifier}, str(path),
+    )
+    relevant = [f"I{index}" for index in range(40) if index % 10 % 4 != 1]
+    assert (progress.counts["analyzed"], progress.counts["alerts"]) == (40, len(relevant))
+    assert [source for kind, source in notifier.sent if kind == "slack"] == [
+        f"I{index}" for index in range(40) if index % 10 % 4 != 1 and index % 10 % 3 != 1
+    ]
+    _, [(_, alert_count, sections)] = _state(store)
+    # Every alert's section sits at the alert's position, in file order
+    assert alert_count == len(relevant)
+    headings = [section.split("\n", 1)[0] for section in sections if section.startswith("## ")]
+    assert headings == [f"## {source}" for source in relevant]
+
+
+def test_ingested_injection_is_reported_and_digested(tmp_path):
+    store = _store(tmp_path, sources=0, injections=0)
+    notifier = FakeNotifier()
+    clients = {"storage": store, "analyzer": FakeAnalyzer(), "notifier": notifier}
+    result = monitor_agent.ingest_injection({}, clients, {"source": "UPS", "content": "label 0", "priority": "High"})
+    assert result["status"] == "Processed" and result["results"][0]["alert"]["source"] == "UPS"
+    documents, [(name, alert_count, sections)] = _state(store)
+    assert documents[result["id"]]["status"] == "Processed"
+    assert name.startswith("Ingested UPS") and alert_count == 1 and sections[0].startswith("## UPS")
+    assert notifier.sent == [("slack", "UPS"), ("digest", ["UPS"])]
+
+
+def test_failed_ingestion_is_requeued_and_recovered_by_the_next_cycle(tmp_path):
+    class FailingAnalyzer(FakeAnalyzer):
+        def analyze(self, content, base_url, freshness=30, scopes=None):
+            raise RuntimeError("provider down")
+
+    store = _store(tmp_path, sources=1, injections=0)
+    clients = {"storage": store, "analyzer": FailingAnalyzer(), "notifier": FakeNotifier()}
+    with pytest.raises(RuntimeError):
+        monitor_agent.ingest_injection({}, clients, {"source": "UPS", "content": "label 0"})
+    # A daemon that died mid-ingestion long ago, and one ingesting right now
+    stale = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=2)
+    store.add_document("manual_injections", {"source": "FedEx", "content": "rates 2", "status": "Ingesting",
+                                             "timestamp": stale}, doc_id="stale")
+    live = store.add_manual_injection("DHL", "pickup 3", status="Ingesting")
+    notifier = _run({}, store)
+    documents, [(_, alert_count, _)] = _state(store)
+    # Injections run oldest first
+    ups = next(doc_id for doc_id, data in documents.items() if data.get("source") == "UPS")
+    assert {doc_id: data.get("status") for doc_id, data in documents.items()} == {
+        "u0": None, ups: "Processed", "stale": "Processed", live: "Ingesting",
+    }
+    assert alert_count == 3 and [source for kind, source in notifier.sent if kind == "slack"] == ["S0", "FedEx", "UPS"]
+
+
+class RecordingStore(SQLiteFirebaseManager):
+    """Logs journaled alerts and hash writes in the order they happen."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.log = []
+
+    def append_checkpoint_event(self, sequence, event, name="current"):
+        if event["event"] == "pending":
+            self.log.append(("pending", event["update"]["id"], event["update"]["profile"]))
+        super().append_checkpoint_event(sequence, event, name)
+
+    def update_url_hash(self, url_id, content_hash):
+        self.log.append(("hash", url_id, None))
+        super().update_url_hash(url_id, content_hash)
+
+
+def test_profile_fanout_shares_analyses_defers_for_all_and_journals_before_the_hash(tmp_path):
+    store = RecordingStore(path=str(tmp_path / "intel.db"), journal_path=None)
+    for index in range(5):
+        store.add_document(
+            "monitored_urls", {"name": f"S{index}", "url": f"https://s{index}.example", "category": "Carriers"},
+            doc_id=f"u{index}",
+        )
+    analyzer = FakeAnalyzer()
+    config = {
+        # ops and carriers ask the same question; tracking needs a call of its own
+        "profiles": [{"name": "ops"}, {"name": "carriers", "categories": ["Carriers"]},
+                     {"name": "tracking", "scopes": ["Tracking"]}],
+        "cycle_budget": {"enabled": True, "max_llm_calls": 7},
+        "checkpoint": {"enabled": True},
+    }
+    notifier = _run(config, store, analyzer=analyzer)
+
+    hashed = [doc_id for kind, doc_id, _ in store.log if kind == "hash"]
+    # Two calls per update: three updates fit the budget, the rest wait for every profile
+    assert len(hashed) == 3 and len(analyzer.calls) == 6
+    assert sorted(analyzer.calls) == sorted(f"changelog S{doc_id[1]}" for doc_id in hashed for _ in range(2))
+    for doc_id in hashed:
+        position = store.log.index(("hash", doc_id, None))
+        journaled = {profile for kind, logged, profile in store.log[:position] if (kind, logged) == ("pending", doc_id)}
+        assert journaled == (set() if doc_id == "u1" else {"ops", "carriers", "tracking"})
+
+    # The profiles share the notifier, so each update reaches its Slack channel once
+    slack = [source for kind, source in notifier.sent if kind == "slack"]
+    assert sorted(slack) == sorted(f"S{doc_id[1]}" for doc_id in hashed if doc_id[1] in "023")
+    _, reports = _state(store)
+    relevant = sum(1 for doc_id in hashed if doc_id != "u1")
+    assert sorted((name.rsplit("(", 1)[1], count) for name, count, _ in reports) == [
+        ("carriers)", relevant), ("ops)", relevant), ("tracking)", relevant),
+    ]
+
+
+def test_run_job_on_sqlite_with_write_behind_and_post_processing(tmp_path):
+    store = SQLiteFirebaseManager(
+        path=str(tmp_path / "intel.db"), write_behind=True, journal_path=str(tmp_path / "journal.jsonl"),
+    )
+    for index in range(4):
+        store.add_document(
+            "monitored_urls", {"name": f"S{index}", "url": f"https://s{index}.example", "category": "Carriers"},
+            doc_id=f"u{index}",
+        )
+    store.update_system_config({"frequency": "Manual"})
+    config = {"post_processing": {"enabled": True, "path": str(tmp_path / "queue.db"), "retry_seconds": 0}}
+    analyzer, notifier = FakeAnalyzer(), FakeNotifier()
+    clients = {"storage": store, "fetcher": FakeFetcher(), "analyzer": analyzer, "notifier": notifier}
+    monitor_agent.run_job(config, clients, is_manual=False, deadline=NoWaitDeadline())
+
+    # Buffered hash and status writes landed at the end of the job, with resolved server timestamps
+    documents, [(_, alert_count, sections)] = _state(store)
+    assert [documents[f"u{index}"]["last_hash"] for index in range(4)] == ["h-S0", "h-S1", "h-S2", "h-S3"]
+    assert isinstance(store.get_system_config()["last_run"], datetime.datetime)
+    # The report was patched to Ready with the customer notes; Slack and the digest went out from the queue
+    [(report_id, header)] = list(store._paginate_rows("intel_reports", 100))
+    assert header["status"] == "Ready" and store.load_report_content(report_id)[1] == "customer notes"
+    assert alert_count == 3 and sorted(notifier.sent) == [
+        ("digest", ["S0", "S2", "S3"]), ("slack", "S0"), ("slack", "S2"), ("slack", "S3"),
+    ]
+
+    # Nothing changed since: the next cycle fetches, finds no changes and calls no model
+    monitor_agent.run_job(config, clients, is_manual=False, deadline=NoWaitDeadline())
+    assert len(analyzer.calls) == 4 and len(list(store._paginate_rows("intel_reports", 100))) == 1
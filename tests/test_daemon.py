@@ -0,0 +1,82 @@
+import json
+import os
+import urllib.request
+
+import yaml
+
+from src.daemon import IntelligenceDaemon, WatchedFile
+
+
+def _write(path, data, mtime):
+    path.write_text(yaml.safe_dump(data))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def _daemon(tmp_path, calls, builds):
+    _write(tmp_path / "config.yaml", {"llm_model": "a", "notifications": {"slack": True}}, 1_000_000_000)
+    _write(tmp_path / "sources.yaml", {"sources": [{"name": "S", "url": "https://s"}]}, 1_000_000_000)
+
+    def build(config, kind):
+        builds.append(kind)
+        return f"{kind}:{config.get('llm_model')}"
+
+    def cycle(config, clients, sources, is_manual):
+        calls.append((clients["analyzer"], [source["name"] for source in sources], is_manual))
+
+    return IntelligenceDaemon(cycle, build, str(tmp_path / "config.yaml"), str(tmp_path / "sources.yaml"))
+
+
+def test_watched_file_reloads_only_on_mtime_change(tmp_path):
+    path = tmp_path / "config.yaml"
+    loads = []
+    watched = WatchedFile(str(path), lambda p: loads.append(p) or yaml.safe_load(open(p)))
+    _write(path, {"frequency": "Daily"}, 1_000_000_000)
+    assert watched.get() == {"frequency": "Daily"}
+    assert watched.get() == {"frequency": "Daily"}
+    assert len(loads) == 1
+
+    _write(path, {"frequency": "Weekly"}, 2_000_000_000)
+    assert watched.get() == {"frequency": "Weekly"}
+
+    # A broken edit keeps the last good version
+    path.write_text("frequency: [unclosed")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    assert watched.get() == {"frequency": "Weekly"}
+    assert watched.version == 2
+
+
+def test_clients_stay_warm_and_rebuild_only_on_their_config(tmp_path):
+    calls, builds = [], []
+    daemon = _daemon(tmp_path, calls, builds)
+    assert daemon.run_cycle() is True
+    assert daemon.run_cycle(is_manual=True) is True
+    assert sorted(builds) == ["analyzer", "fetcher", "notifier", "storage"]
+
+    _write(tmp_path / "config.yaml", {"llm_model": "b", "notifications": {"slack": True}}, 2_000_000_000)
+    _write(tmp_path / "sources.yaml", {"sources": [{"name": "T", "url": "https://t"}]}, 2_000_000_000)
+    daemon.run_cycle()
+    assert builds[4:] == ["analyzer"]
+    assert calls == [("analyzer:a", ["S"], None), ("analyzer:a", ["S"], True), ("analyzer:b", ["T"], None)]
+    assert daemon.snapshot()["cycles"] == 3
+
+
+def test_control_endpoint_triggers_cycles(tmp_path):
+    calls, builds = [], []
+    daemon = _daemon(tmp_path, calls, builds)
+    server = daemon.start_control_server(port=0, token="secret")
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        request = urllib.request.Request(f"{base}/cycle?manual=1&wait=1", method="POST",
+                                         headers={"X-Control-Token": "secret"})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            status = json.loads(response.read())
+        assert status["cycles"] == 1 and status["last_error"] is None
+        assert calls == [("analyzer:a", ["S"], True)]
+
+        try:
+            urllib.request.urlopen(f"{base}/status", timeout=5)
+            assert False, "missing token must be rejected"
+        except urllib.error.HTTPError as e:
+            assert e.code == 401
+    finally:
+        daemon.stop()
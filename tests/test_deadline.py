@@ -0,0 +1,79 @@
+import os
+import signal
+import threading
+import time
+
+from src.deadline import Deadline, create_deadline
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_unlimited_deadline_keeps_defaults():
+    deadline = Deadline()
+    assert deadline.remaining() is None
+    assert not deadline.expired()
+    assert deadline.timeout(15) == 15
+
+
+def test_timeouts_shrink_to_time_left_before_reserve():
+    clock = FakeClock()
+    deadline = Deadline(100, reserve_seconds=20, clock=clock)
+    assert deadline.timeout(15) == 15
+    clock.now = 75
+    assert deadline.timeout(15) == 5
+    assert deadline.timeout(90, final=True) == 25
+    clock.now = 85
+    assert deadline.expired()
+    assert deadline.timeout(15) == 1.0
+    assert deadline.timeout(90, final=True) == 15
+
+
+def test_sleep_is_cut_short_by_cancel():
+    deadline = Deadline()
+    threading.Timer(0.05, deadline.cancel).start()
+    started = time.monotonic()
+    assert deadline.sleep(5) is False
+    assert time.monotonic() - started < 2
+
+
+def test_sleep_never_runs_past_the_deadline():
+    deadline = Deadline(0.05)
+    started = time.monotonic()
+    assert deadline.sleep(5) is False
+    assert time.monotonic() - started < 2
+
+
+def test_bound_to_restores_previous_deadline():
+    class Client:
+        deadline = None
+
+    client = Client()
+    deadline = Deadline(10)
+    with deadline.bound_to(client):
+        assert client.deadline is deadline
+    assert client.deadline is None
+
+
+def test_sigterm_cancels_instead_of_killing():
+    previous = signal.getsignal(signal.SIGTERM)
+    deadline = Deadline()
+    with deadline.cancel_on_signals():
+        os.kill(os.getpid(), signal.SIGTERM)
+        time.sleep(0.01)
+        assert deadline.cancelled
+    assert signal.getsignal(signal.SIGTERM) is previous
+
+
+def test_create_deadline_from_config_and_env(monkeypatch):
+    monkeypatch.delenv("INTEL_CYCLE_DEADLINE_SECONDS", raising=False)
+    assert create_deadline({}).remaining() is None
+    deadline = create_deadline({"cycle_deadline": {"max_seconds": 600, "reserve_seconds": 60}})
+    assert 530 < deadline.remaining() <= 540
+    monkeypatch.setenv("INTEL_CYCLE_DEADLINE_SECONDS", "120")
+    assert create_deadline({"cycle_deadline": {"max_seconds": 600}}).remaining() <= 120
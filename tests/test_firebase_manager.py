@@ -0,0 +1,146 @@
+import logging
+from types import SimpleNamespace
+
+from src.firebase_manager import MONITORED_URL_FIELDS, FirebaseManager
+from src.local_store import SQLiteFirebaseManager
+
+
+class FakeQuery:
+    """The slice of the Firestore query API the bootstrap reads use, over in-memory documents."""
+
+    def __init__(self, db, name, filters=(), order=None, size=None, after=None, fields=None):
+        self.db, self.name = db, name
+        self.filters, self.order, self.size, self.after, self.fields = filters, order, size, after, fields
+
+    def _with(self, **changes):
+        state = {key: getattr(self, key) for key in ("filters", "order", "size", "after", "fields")}
+        return FakeQuery(self.db, self.name, **{**state, **changes})
+
+    def select(self, fields):
+        return self._with(fields=list(fields))
+
+    def where(self, field, op, value):
+        return self._with(filters=self.filters + ((field, value),))
+
+    def order_by(self, field):
+        return self._with(order=field)
+
+    def limit(self, size):
+        return self._with(size=size)
+
+    def start_after(self, snapshot):
+        return self._with(after=snapshot.id)
+
+    def stream(self):
+        self.db.reads.append((self.name, self.fields))
+        docs = [
+            (doc_id, data) for doc_id, data in self.db.collections[self.name].items()
+            if all(data.get(field) == value for field, value in self.filters)
+        ]
+        if self.order and self.order != "__name__":
+            docs.sort(key=lambda doc: doc[1][self.order])
+        else:
+            docs.sort()
+        if self.after is not None:
+            docs = docs[[doc_id for doc_id, _ in docs].index(self.after) + 1:]
+        for doc_id, data in docs[:self.size]:
+            yield self.db.snapshot(self.name, doc_id, self.fields)
+
+    def document(self, doc_id):
+        return SimpleNamespace(id=doc_id, get=lambda: self.db.snapshot(self.name, doc_id))
+
+
+class FakeFirestore:
+    def __init__(self, collections):
+        self.collections = collections
+        self.update_times = {}
+        self.reads = []
+
+    def collection(self, name):
+        return FakeQuery(self, name)
+
+    def write(self, name, doc_id, data):
+        self.collections[name][doc_id] = data
+        self.update_times[name, doc_id] = self.update_times.get((name, doc_id), 0) + 1
+
+    def snapshot(self, name, doc_id, fields=None):
+        data = self.collections[name].get(doc_id)
+        if data is not None and fields is not None:
+            data = {key: value for key, value in data.items() if key in fields}
+        return SimpleNamespace(
+            id=doc_id, exists=data is not None, update_time=self.update_times.get((name, doc_id), 0),
+            to_dict=lambda: dict(data or {}),
+        )
+
+    def get_all(self, refs, field_paths=None):
+        self.reads.append(("get_all", sorted(ref.id for ref in refs)))
+        return [self.snapshot("monitored_urls", ref.id, field_paths) for ref in refs]
+
+
+class FakeFirebaseManager(FirebaseManager):
+    def __init__(self, db):
+        self.fake_db = db
+        super().__init__(journal_path=None)
+
+    def _initialize(self):
+        self.db = self.fake_db
+
+
+def _firestore():
+    return FakeFirestore({
+        "monitored_urls": {
+            "a": {"name": "A", "url": "https://a", "notes": "not projected"},
+            "b": {"name": "B", "url": "https://b"},
+        },
+        "config": {"system": {"frequency": "Weekly"}},
+        "manual_injections": {
+            f"m{index}": {"source": f"M{index}", "content": "x", "status": status, "timestamp": index}
+            for index, status in enumerate(["Pending", "Processed", "Pending", "Pending"])
+        },
+    })
+
+
+def test_refresh_monitored_urls_rereads_only_changed_documents():
+    db = _firestore()
+    manager = FakeFirebaseManager(db)
+    assert [url["name"] for url in manager.refresh_monitored_urls()] == ["A", "B"]
+    assert db.reads == [("monitored_urls", MONITORED_URL_FIELDS)] and manager.snapshot_version == 1
+
+    # Unchanged: a name-only listing and no document reads
+    db.reads.clear()
+    assert len(manager.refresh_monitored_urls()) == 2
+    assert db.reads == [("monitored_urls", ["__name__"])] and manager.snapshot_version == 1
+
+    db.write("monitored_urls", "a", {"name": "A", "url": "https://a", "last_hash": "new"})
+    db.write("monitored_urls", "c", {"name": "C", "url": "https://c"})
+    del db.collections["monitored_urls"]["b"]
+    db.reads.clear()
+    urls = manager.refresh_monitored_urls()
+    assert db.reads == [("monitored_urls", ["__name__"]), ("get_all", ["a", "c"])]
+    assert sorted((url["name"], url["last_hash"]) for url in urls) == [("A", "new"), ("C", None)]
+    assert manager.snapshot_version == 2
+
+
+def test_bootstrap_cycle_reads_config_urls_and_a_capped_injection_stream():
+    manager = FakeFirebaseManager(_firestore())
+    boot = manager.bootstrap_cycle(injection_page_size=1, max_injections=2)
+    assert boot["system_config"] == {"frequency": "Weekly"}
+    assert [url["id"] for url in boot["monitored_urls"]] == ["a", "b"]
+    assert "notes" not in boot["monitored_urls"][0]
+    # Pending only, oldest first, paged lazily and capped per cycle
+    assert [injection["id"] for injection in boot["manual_injections"]] == ["m0", "m2"]
+
+
+def test_shared_keeps_one_instance_per_backend_and_warns_on_other_options(tmp_path, caplog):
+    path = str(tmp_path / "store.db")
+    try:
+        store = SQLiteFirebaseManager.shared(path=path, journal_path=None)
+        assert SQLiteFirebaseManager.shared(path=path, journal_path=None) is store
+        assert "ignoring" not in caplog.text
+        with caplog.at_level(logging.WARNING, logger="FirebaseManager"):
+            assert SQLiteFirebaseManager.shared(path=path, journal_path=None, write_behind=True) is store
+        assert "ignoring changed options write_behind" in caplog.text
+        # The base class keeps its own instance
+        assert FirebaseManager.__dict__.get("_shared_instance") is not store
+    finally:
+        SQLiteFirebaseManager._shared_instance = None
@@ -0,0 +1,77 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.ingestion import IngestionBusy, IngestionService, create_ingestion_service, validate_injection
+
+
+def _post(service, body, query="", token=None):
+    port = service.server.server_address[1]
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/injections{query}", data=json.dumps(body).encode("utf-8"), method="POST",
+        headers={"X-Control-Token": token} if token else {},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_validate_injection():
+    assert validate_injection({"source": " UPS ", "content": "New label API"}) == (
+        {"source": "UPS", "content": "New label API", "priority": "High"}, None
+    )
+    assert validate_injection({"source": "UPS", "content": " "})[1]
+    assert validate_injection({"source": "UPS", "content": "x", "priority": "Urgent"})[1]
+    assert validate_injection(["not", "an", "object"])[1]
+
+
+def test_endpoint_returns_the_analysis():
+    service = IngestionService(lambda injection: {"id": "abc", "source": injection["source"]}, token="secret")
+    service.start(port=0)
+    try:
+        assert _post(service, {"source": "UPS", "content": "x"}, token="secret") == (200, {"id": "abc", "source": "UPS"})
+        assert _post(service, {"source": "UPS", "content": "x"})[0] == 401
+        assert _post(service, {"source": "UPS"}, token="secret")[0] == 400
+    finally:
+        service.stop()
+    assert service.stats["completed"] == 1
+
+
+def test_pool_is_bounded_and_rejects_overflow():
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def process(injection):
+        started.release()
+        release.wait(5)
+        return {"source": injection["source"]}
+
+    service = IngestionService(process, workers=1, max_pending=1)
+    service.start(port=0)
+    try:
+        running = service.submit({"source": "a", "content": "x"})
+        assert started.acquire(timeout=5)
+        queued = service.submit({"source": "b", "content": "x"})
+        with pytest.raises(IngestionBusy):
+            service.submit({"source": "c", "content": "x"})
+        assert _post(service, {"source": "d", "content": "x"})[0] == 503
+        release.set()
+        assert running.result(timeout=5) == {"source": "a"}
+        assert queued.result(timeout=5) == {"source": "b"}
+        # Slots are freed once submissions finish
+        assert _post(service, {"source": "e", "content": "x"}, query="?wait=0") == (202, {"accepted": True})
+    finally:
+        service.stop()
+    assert service.stats["rejected"] == 2
+
+
+def test_create_ingestion_service():
+    assert create_ingestion_service({}, lambda injection: None) is None
+    service = create_ingestion_service({"ingestion": {"enabled": True, "workers": 3}}, lambda injection: None)
+    assert service.executor._max_workers == 3
+    service.stop()
@@ -0,0 +1,104 @@
+import json
+import random
+import time
+
+from src.json_utils import (
+    extract_json_object,
+    normalize_smart_quotes,
+    parse_llm_json,
+    remove_trailing_commas,
+    repair_json_text,
+)
+
+SAMPLE = {
+    "summary": "Orders API v2 deprecates the {legacy} fulfillment endpoint.",
+    "details": ["Endpoint X is deprecated", "New field \"weight\" added"],
+    "impact_level": "High",
+    "type": "Breaking Change",
+    "release_date": "2026-09-01",
+    "is_relevant": True,
+}
+
+
+def test_extract_first_balanced_object_ignores_braces_in_strings():
+    text = 'Here you go: {"a": "x}y", "b": {"c": 1}} and later {"d": 2}'
+    assert extract_json_object(text) == '{"a": "x}y", "b": {"c": 1}}'
+    assert extract_json_object("no json here") is None
+    assert extract_json_object('{"unterminated": ') is None
+
+
+def test_parse_skips_non_json_brace_prose():
+    text = 'Note {this is prose}. Result:\n{"summary": "ok", "is_relevant": false}'
+    assert parse_llm_json(text) == {"summary": "ok", "is_relevant": False}
+
+
+def test_repairs_code_fences_trailing_commas_and_smart_quotes():
+    fenced = '```json\n{"summary": "ok", "details": ["a", "b",],}\n```'
+    assert parse_llm_json(fenced) == {"summary": "ok", "details": ["a", "b"]}
+
+    smart = '{“summary”: “Shopify’s new webhook”, “is_relevant”: true}'
+    assert parse_llm_json(smart)["is_relevant"] is True
+
+    # Smart quotes inside a correctly quoted string are content, not delimiters
+    assert normalize_smart_quotes('{"q": "say “hi”"}') == '{"q": "say “hi”"}'
+    assert remove_trailing_commas('{"a": "x,}", "b": [1, 2 , ] , }') == '{"a": "x,}", "b": [1, 2  ]  }'
+    assert json.loads(repair_json_text('```{"a": 1,}```')) == {"a": 1}
+
+
+def test_parse_returns_none_for_garbage():
+    assert parse_llm_json("") is None
+    assert parse_llm_json("I could not analyze this page.") is None
+    assert parse_llm_json("[1, 2, 3]") is None
+
+
+def _mutate(text, rng):
+    """Wrap and damage a serialized object the way LLM replies tend to."""
+    if rng.random() < 0.3:
+        text = text.replace('"', "“", 1).replace('"', "”", 1)
+    if rng.random() < 0.4:
+        text = text.replace('"]', '",]')[:-1] + ",}"
+    if rng.random() < 0.5:
+        text = f"```json\n{text}\n```"
+    prefix = rng.choice(["", "Sure! ", "Analysis {draft}:\n", "Result ***\n"])
+    suffix = rng.choice(["", "\nHope this helps.", " {end}", "\n```"])
+    return prefix + text + suffix
+
+
+def test_fuzz_recovers_mutated_objects():
+    rng = random.Random(1234)
+    for _ in range(500):
+        payload = dict(SAMPLE)
+        payload["details"] = [f"detail {rng.randint(0, 999)}" for _ in range(rng.randint(0, 4))]
+        payload["is_relevant"] = rng.random() < 0.5
+        text = _mutate(json.dumps(payload, indent=rng.choice([None, 2])), rng)
+        assert parse_llm_json(text) == payload, text
+
+
+def test_fuzz_random_noise_never_raises():
+    rng = random.Random(99)
+    alphabet = '{}[]",:“”\\ abc123\n`'
+    for _ in range(1000):
+        noise = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        result = parse_llm_json(noise)
+        assert result is None or isinstance(result, dict)
+
+
+def _time_parse(text):
+    start = time.perf_counter()
+    parse_llm_json(text, max_chars=len(text))
+    return time.perf_counter() - start
+
+
+def test_benchmark_scan_is_linear():
+    # Deeply nested, never-closing input is the worst case for backtracking extractors
+    small = "{" * 20_000 + '"x' * 20_000
+    large = "{" * 80_000 + '"x' * 80_000
+    small_time = min(_time_parse(small) for _ in range(3))
+    large_time = min(_time_parse(large) for _ in range(3))
+    assert large_time < 1.0
+    assert large_time < max(small_time, 0.005) * 10
+
+    reply = "prose " * 20_000 + json.dumps(SAMPLE)
+    start = time.perf_counter()
+    assert parse_llm_json(reply, max_chars=len(reply)) == SAMPLE
+    assert time.perf_counter() - start < 0.5
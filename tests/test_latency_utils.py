@@ -0,0 +1,20 @@
+from src.latency_utils import LatencyTracker
+
+
+def test_percentile_nearest_rank():
+    tracker = LatencyTracker()
+    for value in range(1, 11):
+        tracker.record(value)
+    assert tracker.percentile(50) == 5
+    assert tracker.percentile(90) == 9
+    assert tracker.percentile(100) == 10
+    assert tracker.percentile(0) == 1
+
+
+def test_percentile_window_and_default():
+    tracker = LatencyTracker(window=3)
+    assert tracker.percentile(90, default=20.0) == 20.0
+    for value in (100, 1, 2, 3):
+        tracker.record(value)
+    assert tracker.count == 3
+    assert tracker.summary() == {"count": 3, "p50": 2, "p95": 3}
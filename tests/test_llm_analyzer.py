@@ -0,0 +1,170 @@
+import json
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm_analyzer import HedgedCallError, LLMAnalyzer, _is_schema_rejection, triage_model_for
+
+
+class ProviderError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def test_schema_rejection_needs_a_schema_field():
+    assert _is_schema_rejection(
+        Exception("Invalid parameter: 'response_format' of type 'json_schema' is not supported with this model.")
+    )
+    assert _is_schema_rejection(Exception("Unknown field for GenerationConfig: response_schema"))
+    assert _is_schema_rejection(ProviderError("response_mime_type: application/json", status_code=400))
+    # Unrelated "not supported" errors keep structured output on
+    assert not _is_schema_rejection(Exception("404 models/x is not found or not supported for generateContent"))
+    assert not _is_schema_rejection(Exception("User location is not supported for the API use."))
+    assert not _is_schema_rejection(ProviderError("response_format was fine; server overloaded", status_code=503))
+
+
+def test_triage_model_follows_the_provider():
+    assert triage_model_for("gemini") == "gemini-1.5-flash-8b-latest"
+    assert triage_model_for("openai") == "gpt-4o-mini"
+    assert triage_model_for("openai", "gpt-4.1-nano") == "gpt-4.1-nano"
+    # A Gemini model name would be sent to OpenAI
+    assert triage_model_for("openai", "gemini-1.5-flash-8b-latest") == "gpt-4o-mini"
+
+
+class StubOpenAI:
+    """Stands in for the OpenAI client: replies per model and records each prompt."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, response_format, timeout):
+        self.calls.append((model, messages[0]["content"]))
+        reply = self.replies[model]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply)))])
+
+
+ANALYSIS = {
+    "summary": "Label API v2", "details": [], "logiwa_impact": "Labels", "action_required": "Migrate",
+    "impact_level": "High", "type": "Breaking Change", "release_date": date.today().isoformat(),
+    "is_relevant": True, "exact_quote": "Label API", "source_url": "https://ups.example",
+}
+
+
+def _cascade(triage, **cascade):
+    analyzer = LLMAnalyzer({
+        "llm_provider": "openai", "llm_model": "gpt-4-turbo-preview",
+        # A Gemini triage model would be sent to OpenAI; the provider's default is used
+        "llm_cascade": {"enabled": True, "triage_model": "gemini-1.5-flash-8b-latest", **cascade},
+    })
+    analyzer._client = StubOpenAI({"gpt-4o-mini": triage, "gpt-4-turbo-preview": ANALYSIS})
+    return analyzer
+
+
+def test_confident_negative_triage_skips_the_analysis():
+    analyzer = _cascade({"is_relevant": False, "impact_level": "Low", "confidence": 0.9})
+    result = analyzer.analyze("x" * 5000 + "TAIL", "https://ups.example")
+    assert result["is_relevant"] is False and result["summary"] == "Filtered by triage (not relevant)"
+    [(model, prompt)] = analyzer.client.calls
+    # Triage reads as much of the text as the analysis would
+    assert model == "gpt-4o-mini" and "TAIL" in prompt
+    assert analyzer.cascade_stats == {"triaged": 1, "escalated": 0, "triage_failures": 0}
+
+
+def test_uncertain_truncated_or_positive_triage_escalates():
+    for triage, content, cascade in (
+        ({"is_relevant": False, "impact_level": "Low", "confidence": 0.4}, "short", {}),
+        ({"is_relevant": False, "impact_level": "Low", "confidence": 0.9}, "x" * 2000, {"triage_max_chars": 1000}),
+        ({"is_relevant": True, "impact_level": "High", "confidence": 0.9}, "short", {}),
+        ({"unexpected": True}, "short", {}),
+    ):
+        analyzer = _cascade(triage, **cascade)
+        assert analyzer.analyze(content, "https://ups.example")["summary"] == "Label API v2"
+        assert [model for model, _ in analyzer.client.calls] == ["gpt-4o-mini", "gpt-4-turbo-preview"]
+        assert analyzer.cascade_stats["escalated"] == 1
+
+
+class StubGenAI:
+    """Stands in for the configured genai module: per model, a delay and a reply (or an error to raise)."""
+
+    def __init__(self, tiers):
+        self.tiers = tiers
+        self.calls = []
+
+    def GenerationConfig(self, **kwargs):
+        return kwargs
+
+    def GenerativeModel(self, model):
+        def generate_content(prompt, generation_config=None, request_options=None):
+            self.calls.append(model)
+            delay, reply = self.tiers[model]
+            time.sleep(delay)
+            if isinstance(reply, Exception):
+                raise reply
+            return SimpleNamespace(text=json.dumps(reply))
+        return SimpleNamespace(generate_content=generate_content)
+
+
+PRIMARY = {"provider": "gemini", "model": "gemini-1.5-pro-002"}
+HEDGE = {"provider": "gemini", "model": "gemini-1.5-flash-latest"}
+
+
+def _hedging(tiers, **hedging):
+    analyzer = LLMAnalyzer({
+        "llm_provider": "gemini", "llm_model": PRIMARY["model"],
+        "llm_hedging": {"enabled": True, "default_delay_seconds": 0.1, **hedging},
+    })
+    analyzer._client = StubGenAI(tiers)
+    return analyzer
+
+
+def test_primary_answering_before_the_hedge_delay_is_not_hedged():
+    analyzer = _hedging({PRIMARY["model"]: (0, ANALYSIS), HEDGE["model"]: (0, {**ANALYSIS, "summary": "hedge"})})
+    assert analyzer.analyze("Label API v2", "https://ups.example")["summary"] == "Label API v2"
+    assert analyzer.client.calls == [PRIMARY["model"]]
+    assert analyzer.hedge_stats[PRIMARY["model"]] == {"requests": 1, "hedged": 0, "won_by_hedge": 0}
+
+
+def test_slow_primary_is_hedged_and_the_hedge_wins():
+    analyzer = _hedging({PRIMARY["model"]: (0.5, ANALYSIS), HEDGE["model"]: (0, {**ANALYSIS, "summary": "hedge"})})
+    assert analyzer.analyze("Label API v2", "https://ups.example")["summary"] == "hedge"
+    assert analyzer.client.calls == [PRIMARY["model"], HEDGE["model"]]
+    assert analyzer.hedge_stats[PRIMARY["model"]] == {"requests": 1, "hedged": 1, "won_by_hedge": 1}
+
+
+def test_both_tiers_failing_raises_and_marks_the_hedge_unhealthy():
+    analyzer = _hedging({PRIMARY["model"]: (0.3, RuntimeError("primary down")), HEDGE["model"]: (0, RuntimeError("429"))})
+    with pytest.raises(HedgedCallError) as error:
+        analyzer._call_hedged(PRIMARY, 0, HEDGE, 1, "prompt")
+    assert error.value.hedge_tried is True and str(error.value) == "primary down"
+    assert analyzer._unhealthy_until[HEDGE["model"]] > time.monotonic()
+
+    # A primary that fails before the hedge delay never calls the hedge tier
+    analyzer = _hedging({PRIMARY["model"]: (0, RuntimeError("primary down")), HEDGE["model"]: (0, ANALYSIS)})
+    with pytest.raises(HedgedCallError) as error:
+        analyzer._call_hedged(PRIMARY, 0, HEDGE, 1, "prompt")
+    assert error.value.hedge_tried is False and analyzer.client.calls == [PRIMARY["model"]]
+
+
+def test_unhealthy_tier_is_skipped_until_its_cooldown_ends():
+    analyzer = _hedging({}, unhealthy_cooldown_seconds=0.2)
+    tiers = [PRIMARY, HEDGE, {"provider": "gemini", "model": "gemini-1.5-flash-8b-latest"}]
+    assert analyzer._next_healthy_tier(tiers, 0) == 1
+    analyzer._mark_unhealthy(HEDGE["model"])
+    assert analyzer._next_healthy_tier(tiers, 0) == 2
+    time.sleep(0.25)
+    assert analyzer._next_healthy_tier(tiers, 0) == 1
+
+
+def test_reply_without_a_verdict_falls_through_to_the_next_tier():
+    analyzer = _hedging({
+        PRIMARY["model"]: (0, {key: value for key, value in ANALYSIS.items() if key != "is_relevant"}),
+        HEDGE["model"]: (0, {**ANALYSIS, "summary": "next tier"}),
+    }, enabled=False)
+    analyzer.deadline.sleep = lambda seconds: True
+    assert analyzer.analyze("Label API v2", "https://ups.example")["summary"] == "next tier"
+    assert analyzer.client.calls == [PRIMARY["model"], HEDGE["model"]]
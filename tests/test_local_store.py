@@ -0,0 +1,222 @@
+from datetime import datetime, timezone
+
+from src.local_store import SQLiteFirebaseManager
+
+
+def _store(tmp_path, **kwargs):
+    return SQLiteFirebaseManager(
+        path=str(tmp_path / "store.db"),
+        journal_path=str(tmp_path / "pending_writes.jsonl"),
+        **kwargs,
+    )
+
+
+def test_monitored_urls_status_and_hash(tmp_path):
+    store = _store(tmp_path)
+    url_id = store.add_document("monitored_urls", {"name": "Shopify", "url": "https://x", "category": "Marketplaces"})
+    store.update_url_hash(url_id, "abc")
+    store.update_url_status(url_id, {"last_status": "Ready"})
+    store.update_url_hash("missing-doc", "zzz")  # update() semantics: logged, not created
+
+    urls = store.get_monitored_urls()
+    assert len(urls) == 1
+    assert urls[0]["last_hash"] == "abc"
+    assert urls[0]["category"] == "Marketplaces"
+    assert store._get_document("monitored_urls", url_id)["last_status"] == "Ready"
+
+
+def test_system_config_and_server_timestamps(tmp_path):
+    store = _store(tmp_path)
+    assert store.get_system_config() == {}
+    store.update_system_config({"is_paused": False, "frequency": "Daily"})
+    store.record_cycle_run()
+    config = store.get_system_config()
+    assert config["frequency"] == "Daily"
+    assert isinstance(config["last_run"], datetime)
+    assert config["last_run"].tzinfo is not None
+
+
+def test_manual_injections_and_reports(tmp_path):
+    store = _store(tmp_path)
+    first = store.add_document("manual_injections", {"source": "A", "content": "x", "status": "Pending"})
+    store.add_document("manual_injections", {"source": "B", "content": "y", "status": "Processed"})
+    assert [item["id"] for item in store.get_manual_injections()] == [first]
+
+    store.mark_manual_injection_processed(first)
+    assert store.get_manual_injections() == []
+    assert isinstance(store._get_document("manual_injections", first)["processed_at"], datetime)
+
+    report_id = store.save_report({"name": "Intel Report", "content": "# Report", "alert_count": 1})
+    report = store._get_document("intel_reports", report_id)
+    assert report["alert_count"] == 1
+    assert isinstance(report["timestamp"], datetime)
+
+
+def test_write_behind_merges_and_flushes_in_one_transaction(tmp_path):
+    store = _store(tmp_path, write_behind=True, max_pending_writes=100)
+    url_id = store.add_document("monitored_urls", {"name": "FedEx", "url": "https://f"})
+    store.update_url_hash(url_id, "h1")
+    store.update_url_status(url_id, {"last_status": "Needs Review"})
+    assert store.get_monitored_urls()[0]["last_hash"] is None
+    assert len(store._pending) == 1
+
+    store.flush()
+    doc = store._get_document("monitored_urls", url_id)
+    assert doc["last_hash"] == "h1"
+    assert doc["last_status"] == "Needs Review"
+    assert not (tmp_path / "pending_writes.jsonl").exists()
+
+
+def test_write_journal_replays_after_crash(tmp_path):
+    store = _store(tmp_path, write_behind=True, max_pending_writes=100)
+    url_id = store.add_document("monitored_urls", {"name": "FedEx", "url": "https://f"})
+    store.update_url_hash(url_id, "analyzed-hash")
+    # Simulate a crash: the buffer is lost, only the journal survives
+    store._pending = {}
+
+    restarted = _store(tmp_path, write_behind=True)
+    assert restarted._get_document("monitored_urls", url_id)["last_hash"] == "analyzed-hash"
+
+
+def test_failed_flush_keeps_updates_buffered_and_journaled(tmp_path):
+    store = _store(tmp_path, write_behind=True, max_pending_writes=100)
+    url_id = store.add_document("monitored_urls", {"name": "FedEx", "url": "https://f"})
+    store.update_url_hash(url_id, "analyzed-hash")
+    store.update_url_hash("missing-doc", "zzz")
+    commit = store._commit_chunk
+    store._commit_chunk = lambda chunk: (0, list(chunk))  # e.g. the backend is unreachable
+    store.flush()
+    assert set(store._pending) == {("monitored_urls", url_id), ("monitored_urls", "missing-doc")}
+    assert (tmp_path / "pending_writes.jsonl").read_text().count("\n") == 2
+
+    # Back online: the update lands, the missing document is dropped, the journal is spent
+    store._commit_chunk = commit
+    store.flush()
+    assert store._pending == {}
+    assert store._get_document("monitored_urls", url_id)["last_hash"] == "analyzed-hash"
+    assert not (tmp_path / "pending_writes.jsonl").exists()
+
+
+def test_snapshot_refresh_and_bootstrap(tmp_path):
+    store = _store(tmp_path)
+    first = store.add_document("monitored_urls", {"name": "A", "url": "https://a"})
+    second = store.add_document("monitored_urls", {"name": "B", "url": "https://b"})
+    assert len(store.refresh_monitored_urls()) == 2
+    version = store.snapshot_version
+
+    assert len(store.refresh_monitored_urls()) == 2
+    assert store.snapshot_version == version
+
+    store.update_url_hash(first, "new")
+    store.db.execute("DELETE FROM documents WHERE doc_id = ?", (second,))
+    urls = store.refresh_monitored_urls()
+    assert [url["last_hash"] for url in urls] == ["new"]
+    assert store.snapshot_version == version + 1
+
+    boot = store.bootstrap_cycle()
+    assert set(boot) == {"system_config", "monitored_urls", "manual_injections"}
+    assert boot["monitored_urls"][0]["id"] == first
+
+
+def test_manual_injections_stream_fifo_with_cap(tmp_path):
+    store = _store(tmp_path)
+    ids = {}
+    # Inserted out of order; FIFO follows the dashboard timestamp, not insertion order
+    for day in (5, 1, 3, 2, 4):
+        ids[day] = store.add_document("manual_injections", {
+            "source": f"S{day}", "content": "x", "status": "Pending", "timestamp": datetime(2026, 1, day),
+        })
+
+    first_cycle = [item["id"] for item in store.iter_manual_injections(page_size=2, limit=3)]
+    assert first_cycle == [ids[1], ids[2], ids[3]]
+
+    # Marking processed mid-stream does not shift the cursor
+    seen = []
+    for item in store.iter_manual_injections(page_size=1):
+        seen.append(item["id"])
+        store.mark_manual_injection_processed(item["id"])
+        if len(seen) == 3:
+            break
+    assert seen == first_cycle
+
+    # Leftovers carry over to the next cycle, oldest first
+    assert [item["id"] for item in store.get_manual_injections()] == [ids[4], ids[5]]
+    assert list(store.iter_manual_injections(limit=0)) == []
+
+
+def test_monitored_urls_paginate_in_creation_order(tmp_path):
+    store = _store(tmp_path)
+    created = [store.add_document("monitored_urls", {"name": str(i), "url": f"https://{i}"}) for i in range(7)]
+    assert [url["id"] for url in store.iter_monitored_urls(page_size=3)] == created
+    boot = store.bootstrap_cycle(injection_page_size=2, max_injections=1)
+    assert list(boot["manual_injections"]) == []
+
+
+def test_sectioned_report_round_trip(tmp_path):
+    from src.report_utils import REPORT_FORMAT, build_report_sections
+
+    store = _store(tmp_path)
+    texts = [f"## Source {i}\nbody {i}\n\n---\n\n" for i in range(3)]
+    report_id = store.save_report(
+        {"name": "Intel Report", "format": REPORT_FORMAT, "title": "# Report\n\n", "alert_count": 3},
+        sections=build_report_sections(texts, "customer notes"),
+    )
+    header = store.get_report(report_id)
+    assert "content" not in header and isinstance(header["timestamp"], datetime)
+
+    assert store.get_report_section(report_id, 1) == texts[1]
+    assert store.get_report_section(report_id, 9) is None
+    sections = store.iter_report_sections(report_id, kind="alert")
+    assert next(sections) == (0, "alert", texts[0])
+
+    markdown, customer = store.load_report_content(report_id)
+    assert markdown == "# Report\n\n" + "".join(texts)
+    assert customer == "customer notes"
+
+    legacy_id = store.save_report({"name": "Old", "content": "# Old", "customer_content": "old notes"})
+    assert store.load_report_content(legacy_id) == ("# Old", "old notes")
+
+
+def test_update_report_adds_customer_notes_after_save(tmp_path):
+    from src.report_utils import REPORT_FORMAT, build_customer_sections, build_report_sections
+
+    store = _store(tmp_path)
+    texts = ["## A\nbody\n\n", "## B\nbody\n\n"]
+    report_id = store.save_report(
+        {"name": "Intel Report", "format": REPORT_FORMAT, "title": "# Report\n\n", "status": "Processing"},
+        sections=build_report_sections(texts),
+    )
+    assert store.load_report_content(report_id) == ("# Report\n\n" + "".join(texts), "")
+
+    assert store.update_report(report_id, {"status": "Ready"}, sections=build_customer_sections("notes", len(texts)))
+    assert store.get_report(report_id)["status"] == "Ready"
+    assert store.get_report(report_id)["name"] == "Intel Report"
+    assert store.load_report_content(report_id) == ("# Report\n\n" + "".join(texts), "notes")
+
+
+def test_batch_injections_keep_their_ids(tmp_path):
+    store = _store(tmp_path)
+    written = store.add_manual_injections(
+        [{"id": "imp-a", "source": "UPS", "content": "a"}, {"id": "imp-b", "source": "FedEx", "content": "b"}],
+        status="Importing",
+    )
+    assert written == 2
+    store.mark_manual_injection_processed("imp-a")
+    assert store.get_manual_injection_statuses(["imp-a", "imp-b", "imp-c"]) == {"imp-a": "Processed", "imp-b": "Importing"}
+    # Importing injections are not picked up by cycles
+    assert list(store.iter_manual_injections()) == []
+
+
+def test_requeue_manual_injections_by_status_and_age(tmp_path):
+    store = _store(tmp_path)
+    stuck = store.add_manual_injection("UPS", "x", status="Ingesting")
+    store.add_manual_injection("FedEx", "y", status="Processed")
+    assert store.requeue_manual_injections("Ingesting", older_than=datetime(2000, 1, 1, tzinfo=timezone.utc)) == 0
+    assert store.requeue_manual_injections("Ingesting") == 1
+    assert [item["id"] for item in store.get_manual_injections()] == [stuck]
+
+
+def test_sqlite_store_keeps_its_own_write_journal(tmp_path):
+    store = SQLiteFirebaseManager(path=str(tmp_path / "offline.db"), write_behind=True)
+    assert store.journal_path == str(tmp_path / "offline.pending_writes.jsonl")
+    assert SQLiteFirebaseManager(path=":memory:").journal_path is None
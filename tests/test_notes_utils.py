@@ -0,0 +1,37 @@
+from src.notes_utils import (
+    NotesAccumulator,
+    iter_note_chunks,
+    normalize_note_key,
+    structure_notes_locally,
+)
+
+
+def test_iter_note_chunks_respects_limit():
+    lines = [f"- Note number {i} about the FedEx migration" for i in range(200)]
+    chunks = list(iter_note_chunks(iter(lines), max_chars=500))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert sum(chunk.count("\n") + 1 for chunk in chunks) == 200
+
+
+def test_iter_note_chunks_splits_oversized_line_and_skips_blanks():
+    chunks = list(iter_note_chunks(["", "x" * 25, "   ", "short"], max_chars=10))
+    assert chunks == ["x" * 10, "x" * 10, "x" * 5, "short"]
+
+
+def test_notes_accumulator_dedupes_and_caps():
+    acc = NotesAccumulator(max_items=2)
+    acc.add({"completed": ["Finished NetSuite OAuth.", "finished netsuite oauth"], "risks": "Rate limits"})
+    acc.add({"completed": ["Shopify fix", "FedEx load test"], "in_progress": ["FedEx REST migration"]})
+    assert acc.sections["completed"] == ["Finished NetSuite OAuth.", "Shopify fix"]
+    assert acc.sections["risks"] == ["Rate limits"]
+    assert acc.dropped == 1
+    assert normalize_note_key("  Shopify   FIX! ") == "shopify fix"
+
+
+def test_structure_notes_locally():
+    chunk = "- Finished the NetSuite OAuth 2.0 implementation.\n- Found a bug in the Shopify connector.\n- Started FedEx work."
+    structured = structure_notes_locally(chunk)
+    assert structured["completed"] == ["Finished the NetSuite OAuth 2.0 implementation."]
+    assert structured["risks"] == ["Found a bug in the Shopify connector."]
+    assert structured["in_progress"] == ["Started FedEx work."]
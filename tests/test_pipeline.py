@@ -0,0 +1,93 @@
+import random
+import threading
+import time
+
+from src.pipeline import Stage, StagedPipeline
+
+
+def _jitter(value):
+    time.sleep(random.random() * 0.003)
+    return value
+
+
+def test_ordered_stages_restore_input_order_behind_parallel_ones():
+    seen = []
+    pipeline = StagedPipeline([
+        Stage("square", lambda x: _jitter(x * x), workers=4),
+        Stage("drop-odd", lambda x: x if x % 2 == 0 else None, workers=3),
+        Stage("record", lambda x: seen.append(x) or x, ordered=True),
+    ], queue_size=3)
+    result = pipeline.run(range(60))
+    expected = [x * x for x in range(60) if x % 2 == 0]
+    assert seen == expected
+    assert result == expected
+    assert pipeline.stages[1].stats(pipeline.elapsed)["dropped"] == 30
+
+
+def test_backpressure_bounds_items_in_flight():
+    consumed = []
+    finished = []
+    lock = threading.Lock()
+    max_in_flight = [0]
+
+    def produce():
+        for index in range(50):
+            with lock:
+                consumed.append(index)
+                max_in_flight[0] = max(max_in_flight[0], len(consumed) - len(finished))
+            yield index
+
+    def slow(value):
+        time.sleep(0.002)
+        with lock:
+            finished.append(value)
+        return value
+
+    pipeline = StagedPipeline([Stage("fast", lambda x: x, workers=2), Stage("slow", slow)], queue_size=2)
+    assert pipeline.run(produce()) == list(range(50))
+    # Three bounded queues of 2 plus the items held by workers and the feeder
+    assert max_in_flight[0] <= 3 * 2 + 2 + 1 + 1
+
+
+def test_failing_items_are_dropped_and_counted():
+    def explode(value):
+        if value == 3:
+            raise ValueError("boom")
+        return value
+
+    pipeline = StagedPipeline([Stage("explode", explode, workers=2), Stage("keep", lambda x: x, ordered=True)])
+    assert pipeline.run(range(6)) == [0, 1, 2, 4, 5]
+    assert pipeline.stages[0].stats(pipeline.elapsed)["errors"] == 1
+
+
+def test_reorder_buffer_is_bounded_behind_a_slow_item():
+    consumed = []
+    recorded = []
+    lock = threading.Lock()
+    max_in_flight = [0]
+
+    def produce():
+        for index in range(200):
+            with lock:
+                consumed.append(index)
+                max_in_flight[0] = max(max_in_flight[0], len(consumed) - len(recorded))
+            yield index
+
+    def stall_first(value):
+        if value == 0:
+            # Everything behind item 0 piles up in the ordered stage's reorder buffer
+            time.sleep(0.2)
+        return value
+
+    def record(value):
+        with lock:
+            recorded.append(value)
+        return value
+
+    pipeline = StagedPipeline(
+        [Stage("stall", stall_first, workers=4), Stage("record", record, ordered=True)], queue_size=2,
+    )
+    assert pipeline.run(produce()) == list(range(200))
+    assert pipeline.max_in_flight == 2 * 3 + 4 + 1
+    # The feeder stopped at the window instead of draining the input while item 0 stalled
+    assert max_in_flight[0] <= pipeline.max_in_flight + 1
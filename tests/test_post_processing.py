@@ -0,0 +1,109 @@
+import threading
+
+from src.local_store import SQLiteFirebaseManager
+from src.post_processing import PostProcessingQueue, create_post_queue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_jobs_run_on_workers_and_keys_are_idempotent(tmp_path):
+    queue = PostProcessingQueue(str(tmp_path / "queue.db"), workers=2)
+    done = []
+    queue.register("digest", lambda payload: done.append(payload["report"]))
+    assert queue.enqueue("digest", {"report": "r1"}, key="digest:r1")
+    assert not queue.enqueue("digest", {"report": "r1"}, key="digest:r1")
+    queue.enqueue("digest", {"report": "r2"})
+    queue.start()
+    assert queue.drain(timeout=5) == 0
+    queue.close()
+    assert sorted(done) == ["r1", "r2"]
+
+    # Still deduplicated after a restart, since finished jobs are kept
+    reopened = PostProcessingQueue(str(tmp_path / "queue.db"))
+    assert reopened.status("digest:r1") == "done"
+    assert not reopened.enqueue("digest", {"report": "r1"}, key="digest:r1")
+    reopened.close()
+
+
+def test_failed_jobs_back_off_then_give_up(tmp_path):
+    clock = FakeClock()
+    queue = PostProcessingQueue(str(tmp_path / "queue.db"), workers=1, max_attempts=2, retry_seconds=10, clock=clock)
+    attempts = []
+
+    def flaky(payload):
+        attempts.append(clock.now)
+        raise RuntimeError("SMTP down")
+
+    queue.register("digest", flaky)
+    queue.enqueue("digest", {}, key="digest:r1")
+    queue.start()
+    assert queue.drain(timeout=0.5) == 1
+    assert len(attempts) == 1 and queue.status("digest:r1") == "pending"
+    clock.now += 10
+    assert queue.drain(timeout=5) == 0
+    queue.close()
+    assert len(attempts) == 2
+    assert queue.failed == 1
+
+
+def test_jobs_of_a_dead_run_resume_and_unknown_kinds_wait(tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = PostProcessingQueue(path)
+    queue.enqueue("customer_notes", {"report_id": "r1"}, key="customer_notes:r1")
+    queue.enqueue("slack", {"alert": {"source": "UPS"}})
+    # Simulate a crash while a worker held the job
+    queue.db.execute("UPDATE jobs SET status = 'running' WHERE kind = 'customer_notes'")
+    queue.db.close()
+
+    resumed = PostProcessingQueue(path, workers=1)
+    notes = threading.Event()
+    resumed.register("customer_notes", lambda payload: notes.set())
+    resumed.start()
+    # Only kinds with a handler are drained; the Slack job stays queued
+    assert resumed.drain(timeout=5) == 0
+    assert notes.is_set()
+    assert resumed.counts() == {"done": 1, "pending": 1}
+    resumed.close()
+
+
+def test_create_post_queue(tmp_path):
+    assert create_post_queue({}) is None
+    queue = create_post_queue({"post_processing": {"enabled": True, "path": str(tmp_path / "q.db"), "workers": 3}})
+    assert queue.workers == 3
+    queue.close()
+
+
+def test_queued_jobs_move_to_a_fresh_machine_through_storage(tmp_path):
+    storage = SQLiteFirebaseManager(path=str(tmp_path / "store.db"), journal_path=None)
+    first = create_post_queue({"post_processing": {"enabled": True, "path": str(tmp_path / "a.db")}}, storage)
+    first.register("digest", lambda payload: None)
+    first.enqueue("digest", {"report": "r1"}, key="digest:r1")
+    first.enqueue("customer_notes", {"report_id": "r1"}, key="customer_notes:r1")
+    first.start()
+    assert first.drain(timeout=5) == 0
+    first.close()
+
+    # A new container: empty local queue, same storage backend
+    second = create_post_queue({"post_processing": {"enabled": True, "path": str(tmp_path / "b.db")}}, storage)
+    assert second.status("digest:r1") == "done"
+    assert not second.enqueue("digest", {"report": "r1"}, key="digest:r1")
+    notes = []
+    second.register("customer_notes", lambda payload: notes.append(payload["report_id"]))
+    second.start()
+    assert second.drain(timeout=5) == 0
+    second.close()
+    assert notes == ["r1"]
+
+    # Shards save their leftovers but do not take over stored jobs
+    shard = create_post_queue({"post_processing": {"enabled": True, "path": str(tmp_path / "c.db")}}, storage,
+                              restore=False)
+    assert shard.status("customer_notes:r1") is None
+    shard.close()
+    statuses = {job["key"]: job["status"] for job in storage.load_post_processing_jobs()}
+    assert statuses == {"digest:r1": "done", "customer_notes:r1": "done"}
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from src.fetcher import PageShare
+from src.profiles import DEFAULT_PROFILE, AnalysisCache, Profile, load_profiles
+
+
+def test_profile_follows_categories_sources_and_injections():
+    carriers = Profile("carriers", categories=["Carriers"], manual_injections=False)
+    assert carriers.applies_to({"source": "UPS", "category": "Carriers"})
+    assert not carriers.applies_to({"source": "Shopify", "category": "Marketplaces"})
+    assert not carriers.applies_to({"source": "note", "is_manual_injection": True})
+
+    named = Profile("ups", sources=["UPS"])
+    assert named.applies_to({"source": "UPS", "category": "Carriers"})
+    assert not named.applies_to({"source": "FedEx", "category": "Carriers"})
+
+
+def test_profile_freshness_and_notifications_fall_back_to_shared_config():
+    sys_config = {"intelligence_freshness": "1 Month", "manual_intelligence_freshness": "3 Months"}
+    assert Profile().freshness_for(sys_config, is_manual=False) == "1 Month"
+    assert Profile(freshness="2 Weeks").freshness_for(sys_config, is_manual=False) == "2 Weeks"
+    assert Profile(freshness="2 Weeks").freshness_for(sys_config, is_manual=True) == "3 Months"
+
+    config = {"notifications": {"email": {"enabled": True, "recipients": ["all@logiwa.com"]}}}
+    profile = Profile(notifications={"email": {"recipients": ["team@logiwa.com"]}})
+    assert profile.notifier_config(config)["notifications"]["email"] == {
+        "enabled": True, "recipients": ["team@logiwa.com"]
+    }
+    assert config["notifications"]["email"]["recipients"] == ["all@logiwa.com"]
+
+
+def test_load_profiles_defaults_and_validates():
+    assert [profile.name for profile in load_profiles({})] == [DEFAULT_PROFILE]
+    profiles = load_profiles({"profiles": [{"name": "a", "scopes": ["Tracking"]}, {"name": "b"}]})
+    assert [profile.name for profile in profiles] == ["a", "b"]
+    with pytest.raises(ValueError):
+        load_profiles({"profiles": [{"name": "a"}, {"name": "a"}]})
+    with pytest.raises(ValueError):
+        load_profiles({"profiles": [{"scopes": ["Tracking"]}]})
+
+
+def test_analysis_cache_shares_identical_questions():
+    cache = AnalysisCache()
+    key = AnalysisCache.key("hash", ["B", "A"], 30)
+    assert key == AnalysisCache.key("hash", ["A", "B"], 30)
+    assert key != AnalysisCache.key("hash", ["A", "B"], 14)
+    assert cache.get(key) is None
+    cache.put(key, {"is_relevant": True})
+    assert key in cache
+    assert cache.get(key) == {"is_relevant": True}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_page_share_loads_each_shared_page_once():
+    sources = [
+        {"name": "UPS API", "url": "https://ups.example/news"},
+        {"name": "UPS Labels", "url": "https://ups.example/news"},
+        {"name": "UPS Rates", "url": "https://ups.example/news"},
+        {"name": "FedEx", "url": "https://fedex.example/news"},
+    ]
+    pages = PageShare(sources)
+    loads = []
+
+    def load(url):
+        def run():
+            loads.append(url)
+            return {"content": url}
+        return run
+
+    threads = [
+        threading.Thread(target=pages.get, args=((source["url"], None), load(source["url"])))
+        for source in sources
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(loads) == ["https://fedex.example/news", "https://ups.example/news"]
+    assert pages.hits == 2
+    # Released once the last source sharing the page was checked
+    assert pages.pages == {}
@@ -0,0 +1,113 @@
+import random
+
+from src.relevance import (
+    RelevanceGate,
+    RelevanceModel,
+    calibrate_threshold,
+    evaluate_model,
+    sample_id,
+    sample_tokens,
+    train_model,
+)
+
+RELEVANT = ["label endpoint deprecated", "orders api breaking change", "webhook payload field removed",
+            "rate limit lowered for tracking api", "oauth token scope required"]
+IRRELEVANT = ["join our webinar", "new dashboard theme", "customer success story", "holiday office hours",
+              "marketing newsletter signup"]
+
+
+def synthetic_samples(count=160, seed=3):
+    rng = random.Random(seed)
+    samples = []
+    for index in range(count):
+        relevant = index % 3 == 0
+        phrases = rng.sample(RELEVANT if relevant else IRRELEVANT, 2) + rng.sample(RELEVANT + IRRELEVANT, 1)
+        samples.append({
+            "content": f"Release {index}: " + ". ".join(phrases),
+            "category": rng.choice(["Carriers", "Marketplaces"]),
+            "scopes": ["Tracking"],
+            "is_relevant": relevant,
+        })
+    return samples
+
+
+class Storage:
+    def __init__(self):
+        self.samples = {}
+
+    def save_relevance_sample(self, sample_id, sample):
+        self.samples[sample_id] = sample
+
+
+def test_sample_tokens_include_category_and_scopes():
+    tokens = sample_tokens({"content": "Orders API v2", "category": "ERPs", "scopes": ["Create Order"]})
+    assert tokens[:3] == ["orders", "api", "v2"]
+    assert "orders api" in tokens
+    assert {"category=erps", "scope=create order"} <= set(tokens)
+    assert sample_id({"content": "x", "scopes": ["B", "A"]}) == sample_id({"content": "x", "scopes": ["A", "B"]})
+
+
+def test_calibrated_threshold_keeps_target_recall():
+    scores = [0.05, 0.1, 0.2, 0.3, 0.6, 0.9]
+    labels = [False, False, True, False, True, True]
+    threshold, metrics = calibrate_threshold(scores, labels, target_recall=1.0)
+    assert threshold == 0.2
+    assert (metrics["recall"], metrics["skip_rate"], metrics["missed_relevant"]) == (1.0, round(2 / 6, 4), 0)
+    assert metrics["precision"] == 0.75
+    # Trading one relevant miss buys more skips, capped by max_threshold
+    threshold, metrics = calibrate_threshold(scores, labels, target_recall=0.6, max_threshold=0.5)
+    assert threshold == 0.5
+    assert metrics["missed_relevant"] == 1
+    # An audited sample stands for 1/audit_rate updates: missing it costs that much recall
+    threshold, metrics = calibrate_threshold(scores, labels, target_recall=0.6, weights=[1, 1, 10, 1, 1, 1])
+    assert threshold == 0.2
+    assert metrics["recall"] == 1.0
+
+
+def test_trained_model_separates_verdicts_and_round_trips(tmp_path):
+    samples = synthetic_samples()
+    model = train_model(samples, target_recall=1.0)
+    assert model.metrics["recall"] == 1.0
+    assert model.metrics["skip_rate"] > 0.3
+    report = evaluate_model(model, samples)
+    assert set(report) == {"overall", "Carriers", "Marketplaces"}
+    assert report["overall"]["recall"] > 0.95
+
+    path = tmp_path / "model.json"
+    model.save(str(path))
+    loaded = RelevanceModel.load(str(path))
+    assert loaded.threshold == model.threshold
+    assert abs(loaded.score(samples[0]) - model.score(samples[0])) < 1e-4
+
+
+def test_gate_skips_confident_negatives_but_never_injections():
+    model = train_model(synthetic_samples(), target_recall=1.0)
+    storage = Storage()
+    gate = RelevanceGate(storage, model)
+    negative = {"source": "Blog", "content": "Join our webinar. New dashboard theme", "category": "Carriers",
+                "scopes": ["Tracking"]}
+    assert gate.would_skip(negative)
+    assert gate.screen(negative)["is_relevant"] is False
+    assert gate.screen({**negative, "is_manual_injection": True}) is None
+    assert gate.stats == {"screened": 1, "skipped": 1, "audited": 0, "audit_relevant": 0, "samples": 0}
+
+    gate.record(negative, {"is_relevant": False, "impact_level": "Low", "type": "Info"})
+    gate.record(negative, {"is_relevant": False, "type": "Info", "triage": {}})
+    gate.record({**negative, "content": "x"}, {"is_relevant": False, "type": "Error"})
+    assert list(storage.samples) == [sample_id(negative)]
+    assert storage.samples[sample_id(negative)]["category"] == "Carriers"
+
+
+def test_gate_audits_would_skip_updates_and_weights_their_samples():
+    model = train_model(synthetic_samples(), target_recall=1.0)
+    storage = Storage()
+    gate = RelevanceGate(storage, model, audit_rate=1.0)
+    negative = {"source": "Blog", "content": "Join our webinar. New dashboard theme", "category": "Carriers",
+                "scopes": ["Tracking"]}
+    assert not gate.would_skip(negative)
+    assert "relevance_score" in negative
+    assert gate.screen(negative) is None
+    gate.record(negative, {"is_relevant": True, "impact_level": "Medium", "type": "Info"})
+    sample = storage.samples[sample_id(negative)]
+    assert (sample["audit"], sample["weight"]) == (True, 1.0)
+    assert gate.stats["audited"] == 1 and gate.stats["audit_relevant"] == 1 and gate.stats["skipped"] == 0
@@ -0,0 +1,69 @@
+import os
+
+from src.report_utils import (
+    MAX_DOCUMENT_BYTES,
+    assemble_sections,
+    build_report_header,
+    build_report_sections,
+    estimate_document_size,
+    format_alert_section,
+    format_report_title,
+)
+
+
+def _alert(index, details=3):
+    return {
+        "source": f"Source {index % 40}",
+        "url": f"https://docs.example.com/{index}",
+        "summary": f"Change {index} to the Orders API",
+        "details": [f"Detail {n} of change {index}: " + "x" * 200 for n in range(details)],
+        "logiwa_impact": "Order sync needs an update",
+        "action_required": "Update the connector",
+        "impact_level": ["High", "Medium", "Low"][index % 3],
+        "type": "Breaking Change",
+        "release_date": "2026-09-01",
+        "exact_quote": "orders endpoint",
+        "resolved_status": "Action Required",
+    }
+
+
+def test_alert_section_matches_dashboard_layout():
+    section = format_alert_section(_alert(1, details=1))
+    assert section.startswith("## Source 1\n**Release Date:** 2026-09-01 | **Type:** Breaking Change | **Impact:** Medium\n")
+    assert "(https://docs.example.com/1#:~:text=orders%20endpoint)" in section
+    assert "### ✅ Recommended Action\n> Update the connector" in section
+    assert section.endswith("---\n\n")
+
+
+def test_sections_round_trip_in_order():
+    alerts = [_alert(i) for i in range(5)]
+    texts = [format_alert_section(alert) for alert in alerts]
+    documents = build_report_sections(texts, "Customer notes", alerts)
+    assembled = list(assemble_sections(iter(documents)))
+    assert [text for _, kind, text in assembled if kind == "alert"] == texts
+    assert assembled[-1] == (5, "customer", "Customer notes")
+    assert [text for _, _, text in assemble_sections(documents, kind="customer")] == ["Customer notes"]
+
+
+def test_oversized_section_is_split_into_parts():
+    noise = os.urandom(300_000).hex()  # incompressible
+    documents = build_report_sections(["small", noise], max_section_bytes=100_000)
+    assert [doc["part"] for doc in documents if doc["index"] == 1] == list(range(documents[-1]["part_count"]))
+    assert documents[-1]["part_count"] > 1
+    assert [text for _, _, text in assemble_sections(documents)] == ["small", noise]
+
+
+def test_busy_cycle_stays_within_document_budget():
+    alerts = [_alert(i, details=20) for i in range(400)]
+    texts = [format_alert_section(alert) for alert in alerts]
+    raw_report = format_report_title() + "".join(texts)
+    # The old single-document layout would not fit
+    assert estimate_document_size({"content": raw_report}) > MAX_DOCUMENT_BYTES
+
+    header = build_report_header("Intel Report", alerts, title=format_report_title())
+    documents = build_report_sections(texts, "notes " * 200_000, alerts)
+    assert estimate_document_size(header) < 4 * 1024
+    assert header["alert_count"] == 400
+    assert header["impact_counts"] == {"High": 134, "Medium": 133, "Low": 133}
+    assert len(header["sources"]) == 40
+    assert max(estimate_document_size(doc) for doc in documents) < MAX_DOCUMENT_BYTES // 2
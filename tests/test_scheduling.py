@@ -0,0 +1,77 @@
+from src.scheduling import CycleBudget, UpdateScheduler, create_scheduler, estimate_tokens, next_impact_rate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_budget_stops_at_call_limit():
+    budget = CycleBudget(max_calls=2)
+    assert budget.admit() and budget.admit()
+    assert not budget.admit()
+    assert budget.exhausted_by == "calls"
+
+
+def test_budget_token_limit_always_admits_first_call():
+    budget = CycleBudget(max_tokens=100)
+    assert budget.admit(500)
+    assert not budget.admit(1)
+    assert budget.exhausted_by == "tokens"
+
+
+def test_budget_time_limit_stays_exhausted():
+    clock = FakeClock()
+    budget = CycleBudget(max_seconds=60, clock=clock)
+    assert budget.admit()
+    clock.now = 61
+    assert not budget.admit()
+    assert not budget.admit()
+    assert budget.calls == 1
+
+
+def test_scheduler_orders_by_category_impact_and_injection_priority():
+    scheduler = UpdateScheduler(
+        category_weights={"Carriers": 3.0, "General": 1.0},
+        injection_weights={"High": 6.0, "Low": 1.0},
+    )
+    updates = [
+        {"source": "blog", "category": "General", "impact_rate": 0.0},
+        {"source": "ups", "category": "Carriers", "impact_rate": 0.0},
+        {"source": "fedex", "category": "Carriers", "impact_rate": 1.0},
+        {"source": "note", "is_manual_injection": True, "priority": "Low"},
+        {"source": "urgent", "is_manual_injection": True, "priority": "High"},
+        {"source": "unknown", "category": "Other"},
+    ]
+    order = [update["source"] for update in scheduler.order(updates)]
+    assert order == ["fedex", "urgent", "ups", "unknown", "blog", "note"]
+
+
+def test_scheduler_keeps_input_order_for_ties():
+    updates = [{"source": f"s{index}", "category": "General"} for index in range(5)]
+    assert [update["source"] for update in UpdateScheduler().order(updates)] == [f"s{index}" for index in range(5)]
+
+
+def test_scheduler_refuses_overflow():
+    scheduler = UpdateScheduler(CycleBudget(max_calls=1))
+    assert scheduler.admit({"source": "a", "content": "x"})
+    assert not scheduler.admit({"source": "b", "content": "y"})
+    assert UpdateScheduler().admit({"source": "c", "content": "z"})
+
+
+def test_impact_rate_moving_average():
+    high = {"is_relevant": True, "impact_level": "High"}
+    low = {"is_relevant": True, "impact_level": "Low"}
+    assert next_impact_rate(None, high) == 1.0
+    assert next_impact_rate(None, low) == 0.0
+    assert next_impact_rate(1.0, low, alpha=0.25) == 0.75
+
+
+def test_estimate_tokens_and_create_scheduler():
+    assert estimate_tokens({"content": "a" * 400}, overhead=10) == 110
+    assert create_scheduler({}) is None
+    scheduler = create_scheduler({"cycle_budget": {"enabled": True, "max_llm_calls": 3}})
+    assert scheduler.budget.max_calls == 3
@@ -0,0 +1,60 @@
+import pytest
+
+import json
+
+from src.report_utils import compress_section
+from src.sharding import HashRing, encode_shard_result, merge_shard_results, parse_shard, select_shard
+
+SOURCES = [{"id": f"src-{index}", "name": f"Source {index}"} for index in range(2000)]
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for bad in ("4/4", "-1/2", "1", "a/b", "0/0"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_shards_partition_sources_evenly():
+    shards = [list(select_shard(SOURCES, index, 4)) for index in range(4)]
+    assigned = [source["id"] for shard in shards for source in shard]
+    assert sorted(assigned) == sorted(source["id"] for source in SOURCES)
+    assert all(350 < len(shard) < 650 for shard in shards)
+    assert list(select_shard(SOURCES, 0, 1)) == SOURCES
+
+
+def test_adding_a_worker_moves_about_one_share():
+    before, after = HashRing(4), HashRing(5)
+    moved = [source for source in SOURCES if before.shard_for(source["id"]) != after.shard_for(source["id"])]
+    # Only keys claimed by the new shard move, roughly 1/5 of them
+    assert all(after.shard_for(source["id"]) == 4 for source in moved)
+    assert 0.12 < len(moved) / len(SOURCES) < 0.28
+
+
+def test_merge_combines_shards_in_order_and_reports_missing():
+    results = [
+        encode_shard_result(2, 3, {"default": ([{"source": "C"}], ["## C\n"])}),
+        encode_shard_result(0, 3, {"default": ([{"source": "A"}, {"source": "B"}], ["## A\n", "## B\n"])}),
+        encode_shard_result(0, 2, {"default": ([{"source": "stale"}], ["## stale\n"])}),  # other shard count
+    ]
+    profiles, missing = merge_shard_results(results, 3)
+    alerts, sections = profiles["default"]
+    assert [alert["source"] for alert in alerts] == ["A", "B", "C"]
+    assert sections == ["## A\n", "## B\n", "## C\n"]
+    assert missing == [1]
+
+
+def test_merge_keeps_profiles_apart_and_reads_legacy_results():
+    legacy = {
+        "shard": 1, "shard_count": 2, "alert_count": 1, "encoding": "zlib",
+        "data": compress_section(json.dumps({"alerts": [{"source": "old"}], "sections": ["## old\n"]})),
+    }
+    results = [
+        encode_shard_result(0, 2, {"default": ([{"source": "A"}], ["## A\n"]), "carriers": ([{"source": "UPS"}], ["## UPS\n"])}),
+        legacy,
+    ]
+    assert results[0]["alert_count"] == 2
+    profiles, missing = merge_shard_results(results, 2)
+    assert [alert["source"] for alert in profiles["default"][0]] == ["A", "old"]
+    assert profiles["carriers"] == ([{"source": "UPS"}], ["## UPS\n"])
+    assert missing == []
@@ -0,0 +1,74 @@
+import requests
+
+from src.source_health import DEGRADED, HEALTHY, QUARANTINED, SourceHealthTracker, classify_error
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail(tracker, source, error="timeout"):
+    source["health"] = tracker.record(source, 15.0, error, "read timed out")
+    return source["health"]
+
+
+def test_classify_error():
+    response = requests.Response()
+    response.status_code = 403
+    assert classify_error(requests.HTTPError(response=response)) == "http_403"
+    assert classify_error(requests.ReadTimeout()) == "timeout"
+    assert classify_error(requests.ConnectionError()) == "connection"
+    assert classify_error(requests.RequestException()) == "error"
+
+
+def test_repeated_failures_quarantine_with_doubling_reprobe():
+    clock = Clock()
+    tracker = SourceHealthTracker(quarantine_after=2, probe_interval_hours=6, max_probe_interval_hours=20, clock=clock)
+    source = {"id": "u1", "name": "Dead", "url": "https://dead.example"}
+
+    assert fail(tracker, source)["state"] == DEGRADED
+    health = fail(tracker, source)
+    assert (health["state"], health["consecutive_failures"], health["probe_interval_hours"]) == (QUARANTINED, 2, 6)
+    assert tracker.admit([source]) == [] and tracker.skipped == ["Dead"]
+
+    # Re-probe due: a failure doubles the interval (capped), a success clears the quarantine
+    clock.now += 6 * 3600
+    assert tracker.admit([source]) == [source]
+    assert fail(tracker, source)["probe_interval_hours"] == 12
+    clock.now += 12 * 3600
+    assert fail(tracker, source)["probe_interval_hours"] == 20
+    health = tracker.record(source, 0.25)
+    assert (health["state"], health["consecutive_failures"], health["quarantined_until"]) == (HEALTHY, 0, None)
+    assert health["latency_ms"] == {"p50": 250, "p95": 250}
+    assert (health["checks"], health["failures"]) == (5, 4)
+
+
+def test_latency_window_and_flush():
+    tracker = SourceHealthTracker(latency_window=3, clock=Clock())
+    source = {"id": "u1", "name": "Fast", "url": "https://fast.example"}
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        source["health"] = tracker.record(source, seconds)
+    assert source["health"]["latency_samples"] == [200, 300, 400]
+
+    writes = []
+
+    class Storage:
+        def update_url_status(self, source_id, data):
+            writes.append((source_id, data))
+
+    tracker.flush(Storage())
+    assert writes == [("u1", {"health": source["health"]})]
+    assert tracker.updates == {}
+
+
+def test_edited_url_starts_over():
+    tracker = SourceHealthTracker(quarantine_after=1, clock=Clock())
+    source = {"id": "u1", "name": "Moved", "url": "https://old.example"}
+    fail(tracker, source)
+    assert tracker.quarantined(source)
+    source["url"] = "https://new.example"
+    assert not tracker.quarantined(source)
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use only; importing any of them at startup is a cold-start regression
+LAZY_MODULES = ("openai", "google.generativeai", "firebase_admin", "bs4", "jinja2")
+
+
+def _imported_modules(tmp_path, statement):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+def test_monitor_agent_import_skips_heavy_modules(tmp_path):
+    modules = _imported_modules(tmp_path, "import monitor_agent")
+    assert "monitor_agent" in modules
+    for name in LAZY_MODULES:
+        assert name not in modules
+
+
+def test_sqlite_storage_does_not_load_firebase_admin(tmp_path):
+    statement = (
+        "from src.local_store import SQLiteFirebaseManager; "
+        f"SQLiteFirebaseManager(path={str(tmp_path / 'intel.db')!r}, journal_path=None)"
+    )
+    assert "firebase_admin" not in _imported_modules(tmp_path, statement)